@@ -1,80 +1,77 @@
-import subprocess
-import re
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from adbclient import AdbError, get_adb_client
+from cache import TTLCache
+from models import PhoneRecord
 
-def get_local_devices() -> List[Dict]:
+# Full `getprop` dumps by serial; device properties hardly change, so a few minutes is safe
+PROPS_TTL = 600
+props_cache = TTLCache(None, {"props": PROPS_TTL})
+
+def get_device_props(serials: List[str], refresh: bool = False, max_workers: int = 16) -> Dict[str, Dict[str, str]]:
+    """
+    Get every system property of several devices.
+
+    Each device's properties come from one `getprop` dump (a single shell round trip)
+    and are cached by serial; the devices missing from the cache are queried in parallel.
+
+    Args:
+        serials (List[str]): adb serials (USB serials or "ip:port").
+        refresh (bool): Ignore cached dumps and query every device again.
+        max_workers (int): Maximum number of devices queried at the same time.
+
+    Returns:
+        Dict[str, Dict[str, str]]: Properties by serial; devices that could not be queried are left out.
+    """
+    found = {} if refresh else props_cache.get_many("props", serials)
+    missing = [serial for serial in serials if serial not in found]
+    if not missing:
+        return found
+
+    client = get_adb_client()
+
+    def fetch(serial: str):
+        try:
+            return serial, client.getprop_all(serial)
+        except AdbError as e:
+            print(f"Could not read properties of {serial}: {e}")
+            return serial, None
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+        fetched = {serial: props for serial, props in executor.map(fetch, missing) if props}
+    props_cache.set_many("props", fetched)
+    found.update(fetched)
+    return found
+
+def get_local_devices() -> List[PhoneRecord]:
     """
     Get a list of locally connected ADB devices.
     
     Returns:
-        List[Dict]: List of local devices with their details
-        Example format:
-        [
-            {
-                "id": "device_serial",
-                "name": "device_name",
-                "status": "device",
-                "brand": "brand_name",
-                "model": "model_name",
-                "type": "local"
-            }
-        ]
+        List[PhoneRecord]: List of local devices (type "local") with their details
     """
+    client = get_adb_client()
     try:
-        # Run adb devices command
-        result = subprocess.run(["adb", "devices", "-l"], capture_output=True, text=True, check=True)
-        
-        # Parse the output
+        # Ask the adb server for its device list (host:devices-l)
+        serials = [entry["serial"] for entry in client.devices() if entry["state"] == "device"]
+
+        # One getprop dump per device, all devices at once (and cached for later lookups)
+        props = get_device_props(serials)
         devices = []
-        lines = result.stdout.strip().split('\n')[1:]  # Skip the first line (header)
-        
-        for line in lines:
-            if not line.strip():
-                continue
-                
-            parts = line.split()
-            if len(parts) < 2:
-                continue
-                
-            device_id = parts[0]
-            status = parts[1]
-            
-            if status != "device":
-                continue
-                
-            # Get device model and brand
-            try:
-                model_cmd = ["adb", "-s", device_id, "shell", "getprop", "ro.product.model"]
-                brand_cmd = ["adb", "-s", device_id, "shell", "getprop", "ro.product.brand"]
-                
-                model = subprocess.run(model_cmd, capture_output=True, text=True, check=True).stdout.strip()
-                brand = subprocess.run(brand_cmd, capture_output=True, text=True, check=True).stdout.strip()
-                
-                device_info = {
-                    "id": device_id,
-                    "name": f"{brand} {model}",
-                    "status": "active",
-                    "brand": brand,
-                    "model": model,
-                    "type": "local"
-                }
-                devices.append(device_info)
-            except subprocess.CalledProcessError:
+        for device_id in serials:
+            device_props = props.get(device_id)
+            if device_props is None:
                 # If we can't get device info, still add the device with basic info
-                device_info = {
-                    "id": device_id,
-                    "name": device_id,
-                    "status": "active",
-                    "brand": "Unknown",
-                    "model": "Unknown",
-                    "type": "local"
-                }
-                devices.append(device_info)
-                
+                devices.append(PhoneRecord(device_id, device_id, type="local"))
+                continue
+            model = device_props.get("ro.product.model", "Unknown")
+            brand = device_props.get("ro.product.brand", "Unknown")
+            devices.append(PhoneRecord(device_id, f"{brand} {model}", brand=brand, model=model, type="local"))
+
         return devices
         
-    except subprocess.CalledProcessError as e:
-        print(f"Error getting local devices: {e.stderr.decode()}")
+    except AdbError as e:
+        print(f"Error getting local devices: {e}")
         return []
     except Exception as e:
         print(f"Unexpected error getting local devices: {str(e)}")
@@ -0,0 +1,219 @@
+import socketserver
+import threading
+import time
+
+class _AdbStubHandler(socketserver.BaseRequestHandler):
+    """Answers adb host-protocol requests from the owning AdbStubServer's state."""
+
+    def _recv_exactly(self, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("client went away")
+            data += chunk
+        return data
+
+    def _read_request(self) -> str:
+        length = int(self._recv_exactly(4), 16)
+        return self._recv_exactly(length).decode("utf-8")
+
+    def _okay(self, body: str = None):
+        reply = b"OKAY"
+        if body is not None:
+            raw = body.encode("utf-8")
+            reply += f"{len(raw):04x}".encode("ascii") + raw
+        self.request.sendall(reply)
+
+    def _fail(self, message: str):
+        raw = message.encode("utf-8")
+        self.request.sendall(b"FAIL" + f"{len(raw):04x}".encode("ascii") + raw)
+
+    def handle(self):
+        stub = self.server.stub
+        try:
+            service = self._read_request()
+        except (ConnectionError, ValueError, OSError):
+            return  # an idle pooled connection being closed
+        stub.count(service.split(":")[0] + ":" + service.split(":")[1] if ":" in service else service)
+
+        if service == "host:version":
+            self._okay(f"{stub.version:04x}")
+        elif service == "host:devices-l":
+            self._okay(stub.listing())
+        elif service.startswith("host:connect:"):
+            self._okay(stub.connect(service[len("host:connect:"):]))
+        elif service.startswith("host:disconnect:"):
+            self._okay(stub.disconnect(service[len("host:disconnect:"):]))
+        elif service == "host:track-devices-l":
+            self._track(stub)
+        elif service == "host:kill":
+            self._okay()
+            threading.Thread(target=stub.stop, daemon=True).start()
+        elif service.startswith("host:transport:"):
+            serial = service[len("host:transport:"):]
+            if serial not in stub.devices:
+                self._fail(f"device '{serial}' not found")
+                return
+            self._okay()
+            try:
+                request = self._read_request()
+            except (ConnectionError, ValueError, OSError):
+                return
+            if not request.startswith("shell:"):
+                self._fail(f"unsupported service {request}")
+                return
+            self._okay()
+            if stub.shell_latency:
+                time.sleep(stub.shell_latency)
+            self.request.sendall(stub.run_shell(serial, request[len("shell:"):]).encode("utf-8"))
+        else:
+            self._fail(f"unknown host service {service}")
+
+    def _track(self, stub: "AdbStubServer"):
+        self._okay()
+        seen = -1
+        while not stub.stopped:
+            with stub.changed:
+                if stub.generation == seen:
+                    stub.changed.wait(timeout=0.5)
+                if stub.generation == seen:
+                    continue
+                seen = stub.generation
+                listing = stub.listing()
+            raw = listing.encode("utf-8")
+            try:
+                self.request.sendall(f"{len(raw):04x}".encode("ascii") + raw)
+            except OSError:
+                return
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class AdbStubServer:
+    """
+    Local stand-in for the adb server, speaking the adb host protocol over TCP.
+
+    Supports host:version, host:devices-l, host:connect, host:disconnect, host:kill,
+    host:track-devices-l and host:transport followed by shell:. Shell commands are
+    interpreted just enough for this project: `getprop [NAME]`, `echo TEXT` (with $?)
+    and `glogin PASSWORD`, chained with "; ".
+
+    Args:
+        devices (dict[str, dict]): Initially attached devices: serial -> properties (getprop values).
+        shell_latency (float): Artificial delay per shell command, standing in for the device round trip.
+        host (str): Interface to bind to.
+        port (int): Port to bind to; 0 picks a free one.
+    """
+
+    version = 41
+
+    def __init__(self, devices: dict = None, shell_latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.devices = {serial: dict(props) for serial, props in (devices or {}).items()}
+        self.shell_latency = shell_latency
+        self.logged_in = set()
+        self.request_counts = {}
+        self.lock = threading.RLock()
+        self.changed = threading.Condition(self.lock)
+        self.generation = 0
+        self.stopped = False
+        self._server = _ThreadingTCPServer((host, port), _AdbStubHandler)
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> "AdbStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self.stopped:
+            return
+        self.stopped = True
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Device state ---
+
+    def count(self, service: str):
+        with self.lock:
+            self.request_counts[service] = self.request_counts.get(service, 0) + 1
+
+    def _bump(self):
+        self.generation += 1
+        self.changed.notify_all()
+
+    def attach(self, serial: str, props: dict = None):
+        """Plug a device in (wakes device trackers)."""
+        with self.changed:
+            self.devices[serial] = dict(props or {"ro.product.model": "Stub", "ro.product.brand": "stub"})
+            self._bump()
+
+    def detach(self, serial: str):
+        """Unplug a device (wakes device trackers)."""
+        with self.changed:
+            self.devices.pop(serial, None)
+            self.logged_in.discard(serial)
+            self._bump()
+
+    def listing(self) -> str:
+        with self.lock:
+            return "".join(
+                f"{serial}\tdevice product:{props.get('ro.product.name', 'stub')} "
+                f"model:{props.get('ro.product.model', 'Stub')} device:stub transport_id:{index + 1}\n"
+                for index, (serial, props) in enumerate(self.devices.items())
+            )
+
+    def connect(self, address: str) -> str:
+        with self.changed:
+            if address in self.devices:
+                return f"already connected to {address}"
+            self.devices[address] = {"ro.product.model": "Pixel 6", "ro.product.brand": "google", "ro.build.version.release": "12"}
+            self._bump()
+        return f"connected to {address}"
+
+    def disconnect(self, address: str) -> str:
+        with self.changed:
+            if self.devices.pop(address, None) is None:
+                return f"no such device '{address}'"
+            self.logged_in.discard(address)
+            self._bump()
+        return f"disconnected {address}"
+
+    def run_shell(self, serial: str, command: str) -> str:
+        output = []
+        status = 0
+        for part in command.split("; "):
+            name, _, argument = part.strip().partition(" ")
+            if name == "getprop" and not argument:
+                with self.lock:
+                    output.extend(f"[{key}]: [{value}]\n" for key, value in sorted(self.devices.get(serial, {}).items()))
+                status = 0
+            elif name == "getprop":
+                with self.lock:
+                    output.append(self.devices.get(serial, {}).get(argument, "") + "\n")
+                status = 0
+            elif name == "echo":
+                output.append(argument.replace("$?", str(status)) + "\n")
+                status = 0
+            elif name == "glogin":
+                with self.lock:
+                    self.logged_in.add(serial)
+                status = 0
+            elif name == "true":
+                status = 0
+            else:
+                output.append(f"/system/bin/sh: {name}: not found\n")
+                status = 127
+        return "".join(output)
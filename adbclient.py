@@ -0,0 +1,333 @@
+import collections
+import os
+import re
+import select
+import socket
+import subprocess
+import threading
+import uuid
+from typing import Iterator
+
+_PROP_LINE = re.compile(r"^\[([^\]]+)\]: \[(.*)\]$")
+
+class AdbError(Exception):
+    """Raised when the adb server answers FAIL or cannot be reached."""
+
+class AdbClient:
+    """
+    Minimal client for the adb host protocol (the adb server's TCP port, 5037 by default).
+
+    Talks to the server directly instead of spawning an `adb` process per command. Each
+    request is a 4-hex-digit length plus the service name; the server answers OKAY or
+    FAIL. The server closes a connection once its service is done, so sockets cannot be
+    reused; instead the client keeps up to `pool_size` idle connections open ahead of
+    time (refilled on a background thread), so a command never waits for a TCP connect.
+
+    Args:
+        host (str): adb server host.
+        port (int): adb server port.
+        timeout (float): Socket timeout in seconds.
+        pool_size (int): Number of pre-opened idle connections to keep (0 disables the pool).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5037, timeout: float = 10.0, pool_size: int = 4):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._idle = collections.deque()
+        self._refill_needed = threading.Event()
+        self._refill_thread = None
+        # Held while the pool is refilled and while the server is killed
+        self._pool_lock = threading.Lock()
+
+    # --- Sockets ---
+
+    def _new_socket(self) -> socket.socket:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    def _refill(self):
+        while True:
+            self._refill_needed.wait()
+            with self._pool_lock:
+                if not self._refill_needed.is_set():
+                    continue  # kill_server cancelled this refill
+                self._refill_needed.clear()
+                while len(self._idle) < self.pool_size:
+                    try:
+                        self._idle.append(self._new_socket())
+                    except OSError:
+                        break
+
+    def _take_socket(self, use_pool: bool = True) -> tuple[socket.socket, bool]:
+        """Returns (socket, came_from_pool)."""
+        if use_pool and self.pool_size:
+            if self._refill_thread is None:
+                self._refill_thread = threading.Thread(target=self._refill, name="adb-socket-pool", daemon=True)
+                self._refill_thread.start()
+            self._refill_needed.set()
+            try:
+                return self._idle.popleft(), True
+            except IndexError:
+                pass
+        return self._new_socket(), False
+
+    def _drop_pool(self):
+        while self._idle:
+            try:
+                self._idle.popleft().close()
+            except (IndexError, OSError):
+                pass
+
+    # --- Wire format ---
+
+    @staticmethod
+    def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+        data = b""
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("adb server closed the connection")
+            data += chunk
+        return data
+
+    @staticmethod
+    def _recv_all(sock: socket.socket) -> bytes:
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+    def _read_string(self, sock: socket.socket) -> str:
+        length = int(self._recv_exactly(sock, 4), 16)
+        return self._recv_exactly(sock, length).decode("utf-8", errors="replace")
+
+    def _send_request(self, sock: socket.socket, service: str):
+        payload = service.encode("utf-8")
+        sock.sendall(f"{len(payload):04x}".encode("ascii") + payload)
+        status = self._recv_exactly(sock, 4)
+        if status == b"OKAY":
+            return
+        if status == b"FAIL":
+            raise AdbError(f"{service}: {self._read_string(sock)}")
+        raise AdbError(f"{service}: unexpected reply {status!r}")
+
+    def _open(self, service: str, autostart: bool = True, use_pool: bool = True) -> socket.socket:
+        """
+        Opens a connection and requests `service`; returns the socket positioned after OKAY.
+        Starts the adb server once if nothing is listening, like the adb command does.
+        """
+        for attempt in range(2):
+            try:
+                sock, pooled = self._take_socket(use_pool)
+            except ConnectionRefusedError:
+                if attempt or not autostart or not self.start_server():
+                    raise AdbError(f"adb server is not running on {self.host}:{self.port}")
+                continue
+            except OSError as e:
+                raise AdbError(f"cannot reach adb server: {e}")
+            try:
+                self._send_request(sock, service)
+                return sock
+            except AdbError:
+                sock.close()
+                raise
+            except OSError as e:
+                sock.close()
+                if pooled:
+                    # The idle connection went stale (e.g. the server restarted); try a fresh one
+                    self._drop_pool()
+                    continue
+                raise AdbError(f"{service}: {e}")
+        raise AdbError(f"{service}: could not reach adb server")
+
+    def _host_string(self, service: str) -> str:
+        """Runs a host service that answers with one length-prefixed string."""
+        sock = self._open(service)
+        try:
+            return self._read_string(sock)
+        except OSError as e:
+            raise AdbError(f"{service}: {e}")
+        finally:
+            sock.close()
+
+    # --- Host services ---
+
+    def version(self) -> int:
+        """Returns the adb server's protocol version (host:version)."""
+        return int(self._host_string("host:version"), 16)
+
+    def connect(self, address: str) -> str:
+        """
+        Connects the server to a TCP/IP device (host:connect).
+
+        Returns:
+            str: The server's message, e.g. "connected to 1.2.3.4:5555" or "failed to connect to ...".
+        """
+        return self._host_string(f"host:connect:{address}")
+
+    def disconnect(self, address: str) -> str:
+        """Drops a TCP/IP device from the server (host:disconnect)."""
+        return self._host_string(f"host:disconnect:{address}")
+
+    @staticmethod
+    def parse_devices(listing: str) -> list[dict]:
+        """
+        Parses a devices -l listing.
+
+        Returns:
+            list[dict]: One dict per line: {"serial", "state", plus "product"/"model"/"device"/"transport_id" when present}.
+        """
+        devices = []
+        for line in listing.splitlines():
+            parts = line.split()
+            if len(parts) < 2:
+                continue
+            device = {"serial": parts[0], "state": parts[1]}
+            for part in parts[2:]:
+                key, sep, value = part.partition(":")
+                if sep:
+                    device[key] = value
+            devices.append(device)
+        return devices
+
+    def devices(self) -> list[dict]:
+        """Lists the devices known to the server (host:devices-l)."""
+        return self.parse_devices(self._host_string("host:devices-l"))
+
+    def track_devices(self, idle_timeout: float = None) -> Iterator[list[dict] | None]:
+        """
+        Streams the device list every time it changes (host:track-devices-l).
+        The first item is the current list. Close the generator to stop tracking.
+
+        Args:
+            idle_timeout (float): If given, yield None whenever nothing changed for this many
+                                  seconds, so the consumer gets a chance to stop.
+        """
+        sock = self._open("host:track-devices-l")
+        sock.settimeout(None)
+        try:
+            while True:
+                if idle_timeout is not None:
+                    # Wait for the start of the next update only, so a message is never cut in half
+                    readable, _, _ = select.select([sock], [], [], idle_timeout)
+                    if not readable:
+                        yield None
+                        continue
+                yield self.parse_devices(self._read_string(sock))
+        except OSError as e:
+            raise AdbError(f"host:track-devices-l: {e}")
+        finally:
+            sock.close()
+
+    def kill_server(self):
+        """
+        Asks the adb server to exit (host:kill). The pool is emptied and not refilled
+        meanwhile, so no idle connection to the old server outlives it; the next
+        command starts refilling again.
+        """
+        with self._pool_lock:
+            self._refill_needed.clear()
+            self._drop_pool()
+            try:
+                sock = self._open("host:kill", autostart=False, use_pool=False)
+                sock.close()
+            except AdbError:
+                pass  # not running
+            self._drop_pool()
+
+    def start_server(self) -> bool:
+        """
+        Starts the adb server if nothing answers on its port.
+        The server daemon can only be launched by the adb binary, so this is the one command that still spawns it.
+
+        Returns:
+            bool: True if the server is (now) running.
+        """
+        try:
+            socket.create_connection((self.host, self.port), timeout=self.timeout).close()
+            return True
+        except OSError:
+            pass
+        env = dict(os.environ, ANDROID_ADB_SERVER_PORT=str(self.port))
+        try:
+            subprocess.run(["adb", "start-server"], check=True, capture_output=True, text=True, env=env)
+            return True
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Could not start adb server: {e}")
+            return False
+
+    # --- Device services ---
+
+    def shell(self, serial: str, command: str) -> tuple[str, int]:
+        """
+        Runs a shell command on a device (host:transport:<serial> then shell:<command>).
+
+        Returns:
+            tuple[str, int]: (output, exit status). stdout and stderr are merged, as with `adb shell`.
+        """
+        # The shell: service carries no exit status, so the command echoes it after a unique marker
+        marker = f"__rc_{uuid.uuid4().hex[:8]}="
+        sock = self._open(f"host:transport:{serial}")
+        try:
+            self._send_request(sock, f"shell:{command}; echo {marker}$?")
+            output = self._recv_all(sock).decode("utf-8", errors="replace")
+        except OSError as e:
+            raise AdbError(f"shell on {serial}: {e}")
+        finally:
+            sock.close()
+
+        output, _, status = output.rpartition(marker)
+        if not _:
+            return status, -1  # marker missing: the shell died before finishing
+        try:
+            return output, int(status.strip())
+        except ValueError:
+            return output, -1
+
+    def getprop_all(self, serial: str) -> dict[str, str]:
+        """Reads every system property with one `getprop` dump (lines of "[name]: [value]")."""
+        output, _ = self.shell(serial, "getprop")
+        props = {}
+        for line in output.splitlines():
+            match = _PROP_LINE.match(line.strip())
+            if match:
+                props[match.group(1)] = match.group(2)
+        return props
+
+_client: AdbClient | None = None
+
+def get_adb_client() -> AdbClient:
+    """Returns the process-wide adb client (server port from ANDROID_ADB_SERVER_PORT, like adb itself)."""
+    global _client
+    if _client is None:
+        _client = AdbClient(port=int(os.getenv("ANDROID_ADB_SERVER_PORT", "5037")))
+    return _client
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Talk to the adb server over its host protocol (a subset of the adb command).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("devices")
+    connect_parser = subparsers.add_parser("connect")
+    connect_parser.add_argument("address")
+    shell_parser = subparsers.add_parser("shell")
+    shell_parser.add_argument("serial")
+    shell_parser.add_argument("args", nargs="+")
+    args = parser.parse_args()
+
+    client = AdbClient(port=int(os.getenv("ANDROID_ADB_SERVER_PORT", "5037")), pool_size=0)
+    if args.command == "devices":
+        for device in client.devices():
+            print(f"{device['serial']}\t{device['state']}")
+    elif args.command == "connect":
+        print(client.connect(args.address))
+    else:
+        output, status = client.shell(args.serial, " ".join(args.args))
+        print(output, end="")
+        raise SystemExit(status)
@@ -0,0 +1,202 @@
+import threading
+import time
+from adbclient import AdbClient, AdbError, get_adb_client
+
+class Transport:
+    """What the registry knows about one device attached to the adb server."""
+
+    __slots__ = ("address", "state", "login_pwd", "verified_at", "lock")
+
+    def __init__(self, address: str, state: str = "device"):
+        self.address = address
+        self.state = state
+        self.login_pwd = None   # password of the last successful glogin, None if not logged in
+        self.verified_at = 0.0  # monotonic time the transport was last known to work
+        self.lock = threading.Lock()
+
+    @property
+    def logged_in(self) -> bool:
+        return self.login_pwd is not None
+
+class ConnectionRegistry:
+    """
+    Tracks the transports of the adb server and their glogin state, so connecting to a
+    phone that is already attached (e.g. from an earlier menu action) costs nothing.
+
+    A transport used within the last `verify_interval` seconds is trusted as-is. An older
+    one is probed with a `shell echo` round trip; only if that fails is it disconnected,
+    reconnected and logged in again. Devices that disappear from `adb devices` (phone
+    stopped, server restarted) are marked detached on the next refresh.
+
+    Args:
+        client (AdbClient): adb client to use (defaults to the process-wide one).
+        verify_interval (float): Seconds a transport is trusted without a probe.
+    """
+
+    PROBE = "echo geelark-alive"
+
+    def __init__(self, client: AdbClient = None, verify_interval: float = 30.0):
+        self.client = client or get_adb_client()
+        self.verify_interval = verify_interval
+        self._transports = {}
+        self._phones = {}  # cloud phone ID -> address, so a stopped phone's transport can be dropped
+        self._lock = threading.Lock()
+        self.counts = {"connect": 0, "connect_skipped": 0, "login": 0, "login_skipped": 0, "probe": 0, "stale": 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    def _transport(self, address: str) -> Transport:
+        with self._lock:
+            transport = self._transports.get(address)
+            if transport is None:
+                transport = self._transports[address] = Transport(address, state=None)
+            return transport
+
+    def refresh(self) -> dict[str, str]:
+        """
+        Syncs with the adb server's device list (host:devices-l); starts the server if needed.
+
+        Returns:
+            dict[str, str]: serial -> state ("device", "offline", ...) for every attached device.
+        """
+        states = {device["serial"]: device["state"] for device in self.client.devices()}
+        with self._lock:
+            for address, transport in self._transports.items():
+                if address not in states:
+                    transport.state = None  # detached: phone stopped or server restarted
+                    transport.login_pwd = None
+            for address, state in states.items():
+                self._transports.setdefault(address, Transport(address, state)).state = state
+        return states
+
+    def is_alive(self, address: str) -> bool:
+        """Probes a transport with a lightweight shell echo."""
+        self._count("probe")
+        try:
+            output, status = self.client.shell(address, self.PROBE)
+        except AdbError:
+            return False
+        return status == 0 and "geelark-alive" in output
+
+    def _verified(self, transport: Transport) -> bool:
+        """True if the transport is attached and known (or just probed) to work."""
+        if transport.state != "device":
+            return False
+        if time.monotonic() - transport.verified_at < self.verify_interval:
+            return True
+        if self.is_alive(transport.address):
+            transport.verified_at = time.monotonic()
+            return True
+        self._count("stale")
+        return False
+
+    def ensure_connected(self, address: str) -> bool:
+        """
+        Makes sure `address` is attached to the adb server, connecting only if it is not
+        (or its transport went stale). Raises AdbError with the server's message on failure.
+
+        Returns:
+            bool: True if a connect was made, False if the existing transport was reused.
+        """
+        transport = self._transport(address)
+        with transport.lock:
+            if transport.state is None:
+                # Not seen yet: the server may still have it from an earlier session
+                self.refresh()
+            if self._verified(transport):
+                self._count("connect_skipped")
+                return False
+            if transport.state is not None:
+                # Listed but dead (or offline): drop it so the connect starts clean
+                try:
+                    self.client.disconnect(address)
+                except AdbError:
+                    pass
+            transport.login_pwd = None
+            self._count("connect")
+            message = self.client.connect(address)
+            if "connected" not in message.lower() or "failed" in message.lower():
+                transport.state = None
+                raise AdbError(message.rstrip())
+            transport.state = "device"
+            transport.verified_at = time.monotonic()
+            return True
+
+    def ensure_logged_in(self, address: str, password: str) -> bool:
+        """
+        Runs glogin on a connected phone unless it is already logged in with this password.
+        Raises AdbError with the command output on failure.
+
+        Returns:
+            bool: True if glogin was run, False if the existing login was reused.
+        """
+        transport = self._transport(address)
+        with transport.lock:
+            if transport.login_pwd == password and transport.state == "device":
+                self._count("login_skipped")
+                return False
+            self._count("login")
+            output, status = self.client.shell(address, f"glogin {password}")
+            if status != 0:
+                transport.login_pwd = None
+                raise AdbError(output.strip() or f"glogin exited with status {status}")
+            transport.login_pwd = password
+            transport.verified_at = time.monotonic()
+            return True
+
+    def bind(self, phone_id: str, address: str):
+        """Remembers which address a cloud phone is connected on."""
+        with self._lock:
+            self._phones[phone_id] = address
+
+    def forget(self, address: str):
+        """Drops what is known about a transport."""
+        with self._lock:
+            self._transports.pop(address, None)
+
+    def forget_phone(self, phone_id: str):
+        """
+        Disconnects and forgets a stopped cloud phone, so that after its next start it is
+        connected and logged in again even if it comes back on the same address.
+        """
+        with self._lock:
+            address = self._phones.pop(phone_id, None)
+        if address is None:
+            return
+        self.forget(address)
+        try:
+            self.client.disconnect(address)
+        except AdbError:
+            pass
+
+    def clear(self):
+        """Forgets every transport (e.g. after the adb server was killed)."""
+        with self._lock:
+            self._transports.clear()
+            self._phones.clear()
+
+    def transports(self) -> dict[str, dict]:
+        """Snapshot: address -> {"state", "logged_in", "age"} (age = seconds since last verified)."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                address: {
+                    "state": transport.state,
+                    "logged_in": transport.logged_in,
+                    "age": now - transport.verified_at if transport.verified_at else None,
+                }
+                for address, transport in self._transports.items()
+            }
+
+_registry: ConnectionRegistry | None = None
+_registry_lock = threading.Lock()
+
+def get_connection_registry() -> ConnectionRegistry:
+    """Returns the process-wide connection registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ConnectionRegistry()
+        return _registry
@@ -0,0 +1,230 @@
+import atexit
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Environment variable carrying the current run ID to worker processes
+RUN_ENV = "geelark_stats_run"
+
+def _bucket_labels() -> list[str]:
+    return [f"<={bound * 1000:g}ms" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1] * 1000:g}ms"]
+
+def _empty_endpoint() -> dict:
+    return {
+        "calls": 0,
+        "attempts": 0,
+        "retries": 0,
+        "failed_calls": 0,
+        "fail_fast": 0,
+        "latency_total": 0.0,
+        "latency_max": 0.0,
+        "histogram": [0] * (len(LATENCY_BUCKETS) + 1),
+        "http_status": {},
+        "api_code": {},
+        "request_bytes": 0,
+        "response_bytes": 0,
+    }
+
+class ApiStats:
+    """
+    Per-endpoint accounting of Geelark API calls for one process.
+
+    Records a latency histogram per attempt, retries, HTTP status and response
+    `code` distributions, and request/response sizes. The numbers are written to
+    a per-process file in `stats_dir` (at most once per `flush_interval` and at
+    exit), so the CLI can merge the figures of every worker process of a fleet run.
+
+    Snapshots are tagged with a run ID, kept in the geelark_stats_run environment
+    variable so worker processes inherit it; merged() only counts snapshots of the
+    current run, never files left over from earlier runs or other CLI sessions.
+
+    Args:
+        stats_dir (str): Directory holding one JSON snapshot per process.
+        flush_interval (float): Minimum seconds between snapshot writes.
+    """
+
+    def __init__(self, stats_dir: str, flush_interval: float = 1.0):
+        self.stats_dir = stats_dir
+        self.flush_interval = flush_interval
+        self.endpoints = {}
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self._pid = os.getpid()
+        self.run_id = os.environ.get(RUN_ENV) or self._new_run()
+        atexit.register(self.flush)
+
+    @staticmethod
+    def _new_run() -> str:
+        run_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        os.environ[RUN_ENV] = run_id  # inherited by the worker processes started from now on
+        return run_id
+
+    @property
+    def _path(self) -> str:
+        return os.path.join(self.stats_dir, f"{self._pid}.json")
+
+    def _endpoint(self, endpoint: str) -> dict:
+        if os.getpid() != self._pid:
+            # A forked worker inherited the parent's numbers; they are in the parent's snapshot
+            self._pid = os.getpid()
+            self.endpoints = {}
+        return self.endpoints.setdefault(endpoint, _empty_endpoint())
+
+    def record_attempt(self, endpoint: str, latency: float, http_status: int | None, request_bytes: int, response_bytes: int):
+        """
+        Record one HTTP attempt.
+
+        Args:
+            endpoint (str): Endpoint path, e.g. "/phone/status".
+            latency (float): Seconds from sending the request to receiving the response (or the error).
+            http_status (int | None): HTTP status code, or None if no response arrived.
+            request_bytes (int): Size of the request body.
+            response_bytes (int): Size of the response body.
+        """
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if latency <= bound), len(LATENCY_BUCKETS))
+        status_key = str(http_status) if http_status is not None else "no_response"
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats["attempts"] += 1
+            stats["latency_total"] += latency
+            stats["latency_max"] = max(stats["latency_max"], latency)
+            stats["histogram"][bucket] += 1
+            stats["http_status"][status_key] = stats["http_status"].get(status_key, 0) + 1
+            stats["request_bytes"] += request_bytes
+            stats["response_bytes"] += response_bytes
+        self._maybe_flush()
+
+    def record_call(self, endpoint: str, attempts: int, succeeded: bool, api_code=None, fail_fast: bool = False):
+        """
+        Record the outcome of one request_with_retry call.
+
+        Args:
+            endpoint (str): Endpoint path.
+            attempts (int): HTTP attempts made (0 if the call failed fast).
+            succeeded (bool): Whether a response was returned.
+            api_code: The `code` field of the JSON response, if any.
+            fail_fast (bool): True if an open circuit stopped the call.
+        """
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats["calls"] += 1
+            stats["retries"] += max(0, attempts - 1)
+            if not succeeded:
+                stats["failed_calls"] += 1
+            if fail_fast:
+                stats["fail_fast"] += 1
+            if api_code is not None:
+                code_key = str(api_code)
+                stats["api_code"][code_key] = stats["api_code"].get(code_key, 0) + 1
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write this process's snapshot to the stats directory."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self.endpoints or os.getpid() != self._pid:
+                return
+            snapshot = json.dumps({"run_id": self.run_id, "endpoints": self.endpoints})
+        try:
+            os.makedirs(self.stats_dir, exist_ok=True)
+            tmp_path = self._path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            print(f"Could not write API stats to {self._path}: {e}")
+
+    def reset(self):
+        """
+        Start a new run: forget this process's numbers and remove every snapshot in the
+        stats directory. Call before starting the worker processes of the run.
+        """
+        with self._lock:
+            self.endpoints = {}
+            self._pid = os.getpid()
+            self.run_id = self._new_run()
+        for path in glob.glob(os.path.join(self.stats_dir, "*.json")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def merged(self) -> dict:
+        """
+        Combine the snapshots of every process of the current run (including this one) into one report.
+
+        Returns:
+            dict: {endpoint: {"calls", "attempts", "retries", "failed_calls", "fail_fast",
+                   "latency_total", "latency_max", "latency_avg", "latency_p50", "latency_p95",
+                   "histogram", "http_status", "api_code", "request_bytes", "response_bytes"}}
+                  Percentiles are bucket upper bounds (None when above the last bucket).
+        """
+        self.flush()
+        merged = {}
+        for path in glob.glob(os.path.join(self.stats_dir, "*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if not isinstance(snapshot, dict) or snapshot.get("run_id") != self.run_id:
+                continue
+            for endpoint, stats in snapshot.get("endpoints", {}).items():
+                total = merged.setdefault(endpoint, _empty_endpoint())
+                for key in ("calls", "attempts", "retries", "failed_calls", "fail_fast", "latency_total", "request_bytes", "response_bytes"):
+                    total[key] += stats.get(key, 0)
+                total["latency_max"] = max(total["latency_max"], stats.get("latency_max", 0.0))
+                total["histogram"] = [a + b for a, b in zip(total["histogram"], stats.get("histogram", []))]
+                for key in ("http_status", "api_code"):
+                    for value, count in stats.get(key, {}).items():
+                        total[key][value] = total[key].get(value, 0) + count
+
+        for stats in merged.values():
+            attempts = stats["attempts"]
+            stats["latency_avg"] = stats["latency_total"] / attempts if attempts else 0.0
+            stats["latency_p50"] = _histogram_percentile(stats["histogram"], 0.50)
+            stats["latency_p95"] = _histogram_percentile(stats["histogram"], 0.95)
+        return dict(sorted(merged.items()))
+
+    def dump(self, path: str) -> dict:
+        """Write the merged report to `path` as JSON and return it."""
+        report = {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "latency_buckets": _bucket_labels(),
+            "endpoints": self.merged(),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        return report
+
+def _histogram_percentile(histogram: list[int], fraction: float) -> float | None:
+    """Upper bound of the bucket holding the given fraction of the samples."""
+    total = sum(histogram)
+    if not total:
+        return 0.0
+    running = 0
+    for index, count in enumerate(histogram):
+        running += count
+        if running >= fraction * total:
+            return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else None
+    return None
+
+_stats: ApiStats | None = None
+
+def get_api_stats() -> ApiStats:
+    """Returns this process's recorder (snapshot directory configurable with geelark_stats_dir)."""
+    global _stats
+    if _stats is None:
+        stats_dir = os.getenv("geelark_stats_dir", os.path.join(tempfile.gettempdir(), "geelark_api_stats"))
+        _stats = ApiStats(stats_dir)
+    return _stats
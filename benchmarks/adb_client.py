@@ -0,0 +1,72 @@
+"""
+Benchmark: spawning `adb` per command vs. the in-process adb host-protocol client.
+
+Both paths talk to a local fake adb server (adb_stub.AdbStubServer), so the numbers
+isolate the per-command overhead: process startup plus a fresh server connection for
+the subprocess path, one (pre-opened) socket for AdbClient. If no `adb` binary is on
+PATH, the subprocess path runs `python -m adbclient` as a stand-in, which starts up
+more slowly than the real adb binary; treat that row as an upper bound.
+
+Run from the repository root:
+    python -m benchmarks.adb_client [--iterations 50]
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+from adb_stub import AdbStubServer
+from adbclient import AdbClient
+
+SERIAL = "127.0.0.1:20001"
+
+def subprocess_commands(adb: list[str], env: dict) -> dict:
+    run = lambda *args: subprocess.run(adb + list(args), capture_output=True, text=True, env=env)
+    return {
+        "devices": lambda: run("devices"),
+        "connect": lambda: run("connect", SERIAL),
+        "shell getprop": lambda: run("shell", SERIAL, "getprop", "ro.product.model"),
+    }
+
+def client_commands(client: AdbClient) -> dict:
+    return {
+        "devices": client.devices,
+        "connect": lambda: client.connect(SERIAL),
+        "shell getprop": lambda: client.shell(SERIAL, "getprop ro.product.model"),
+    }
+
+def time_commands(commands: dict, iterations: int) -> dict:
+    timings = {}
+    for name, command in commands.items():
+        command()  # warm up
+        started = time.perf_counter()
+        for _ in range(iterations):
+            command()
+        timings[name] = (time.perf_counter() - started) / iterations
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    with AdbStubServer({SERIAL: {"ro.product.model": "Pixel 6", "ro.product.brand": "google"}}) as server:
+        env = dict(os.environ, ANDROID_ADB_SERVER_PORT=str(server.port))
+        adb_binary = shutil.which("adb")
+        adb = [adb_binary] if adb_binary else [sys.executable, "-m", "adbclient"]
+        label = "adb subprocess" if adb_binary else "subprocess (python stand-in)"
+
+        results = {
+            label: time_commands(subprocess_commands(adb, env), args.iterations),
+            "AdbClient": time_commands(client_commands(AdbClient(port=server.port)), args.iterations),
+        }
+
+    commands = list(next(iter(results.values())))
+    print(f"mean time per command over {args.iterations} runs\n")
+    print(f"{'path':<30}" + "".join(f"{name:>16}" for name in commands))
+    for path, timings in results.items():
+        print(f"{path:<30}" + "".join(f"{timings[name] * 1000:>14.2f}ms" for name in commands))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Benchmark: round trips and wall time of adjust_age_filter_and_apply, the recovery from
+"You've seen everyone nearby".
+
+A fake driver serves the filter screen fixture (benchmarks/fixtures/screens/filters.xml) and
+charges every Appium call a round-trip latency, plus a hierarchy-dump cost for XPath lookups
+and page_source. A drag moves the "Higher age" thumb `--settle-delay` seconds later; tapping
+Apply closes the filter screen (back to People) `--apply-delay` seconds later. Two versions
+are compared:
+
+    elements    the routine of before: presence waits for thumb and track, .location/.size on
+                each, drag, sleep(2), clickable wait for Apply, click, sleep(3)
+    snapshot    adjust_age_filter_and_apply(): both rects from one snapshot, drag, snapshot
+                waits for Apply and for the filter screen to close
+
+Run from the repository root:
+    python -m benchmarks.adjust_filters [--runs 3] [--latency 0.03] [--tree-cost 0.12]
+"""
+import argparse
+import os
+import time
+import xml.etree.ElementTree as ElementTree
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+import helper
+from benchmarks.locators import select
+from geometry import get_geometry_cache
+from locators import XPATH, locator
+from screens import parse_bounds
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "screens")
+
+class FakeElement:
+    def __init__(self, driver, node):
+        self._driver = driver
+        self._node = node
+
+    def _bounds(self) -> tuple:
+        self._driver._round_trip()
+        return parse_bounds(self._node.get("bounds", ""))
+
+    @property
+    def location(self) -> dict:
+        x1, y1, _, _ = self._bounds()
+        return {"x": x1, "y": y1}
+
+    @property
+    def size(self) -> dict:
+        x1, y1, x2, y2 = self._bounds()
+        return {"width": x2 - x1, "height": y2 - y1}
+
+    def is_displayed(self) -> bool:
+        self._driver._round_trip()
+        return self._node.get("displayed") != "false"
+
+    def is_enabled(self) -> bool:
+        self._driver._round_trip()
+        return self._node.get("enabled") != "false"
+
+    def click(self):
+        x1, y1, x2, y2 = self._bounds()
+        self._driver._tap((x1 + x2) // 2, (y1 + y2) // 2)
+
+class FiltersDriver:
+    """Filter screen: drags move the higher age thumb, Apply returns to the People tab."""
+
+    def __init__(self, latency: float, tree_cost: float, settle_delay: float, apply_delay: float):
+        self.session_id = f"bench-{id(self)}"
+        self.latency = latency
+        self.tree_cost = tree_cost
+        self.settle_delay = settle_delay
+        self.apply_delay = apply_delay
+        self.filters = ElementTree.parse(os.path.join(FIXTURES_DIR, "filters.xml")).getroot()
+        self.people = ElementTree.parse(os.path.join(FIXTURES_DIR, "people_loaded.xml")).getroot()
+        self.thumb = next(node for node in self.filters.iter() if node.get("content-desc") == "Higher age")
+        self.apply = next(node for node in self.filters.iter() if node.get("text") == "Apply")
+        self._drag, self._closes_at = None, None
+        self.round_trips = 0
+
+    def _round_trip(self, dumps_tree: bool = False):
+        self.round_trips += 1
+        time.sleep(self.latency + (self.tree_cost if dumps_tree else 0.0))
+
+    def _tap(self, x: int, y: int):
+        x1, y1, x2, y2 = parse_bounds(self.apply.get("bounds"))
+        if self._closes_at is None and x1 <= x < x2 and y1 <= y < y2:
+            self._closes_at = time.monotonic() + self.apply_delay
+
+    @property
+    def root(self):
+        now = time.monotonic()
+        if self._drag and now >= self._drag[1]:
+            x1, y1, x2, y2 = parse_bounds(self.thumb.get("bounds"))
+            half = (x2 - x1) // 2
+            self.thumb.set("bounds", f"[{self._drag[0] - half},{y1}][{self._drag[0] + half},{y2}]")
+            self._drag = None
+        return self.people if self._closes_at is not None and now >= self._closes_at else self.filters
+
+    @property
+    def page_source(self) -> str:
+        self._round_trip(dumps_tree=True)
+        return ElementTree.tostring(self.root, encoding="unicode")
+
+    def execute_script(self, script: str, args: dict):
+        self._round_trip()
+        if script == "mobile: dragGesture":
+            self._drag = (args["endX"], time.monotonic() + self.settle_delay)
+        elif script == "mobile: clickGesture":
+            self._tap(args["x"], args["y"])
+
+    def find_elements(self, by: str, value: str) -> list[FakeElement]:
+        self._round_trip(dumps_tree=by == XPATH)
+        return [FakeElement(self, node) for node in select(self.root, by, value)]
+
+    def find_element(self, by: str, value: str) -> FakeElement:
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElementException(value)
+        return found[0]
+
+# --- The routine of before the snapshot rewrite, replayed against the fake driver ---
+
+def elements_adjust(driver, timeout: int = 15) -> bool:
+    try:
+        thumb = WebDriverWait(driver, timeout).until(EC.presence_of_element_located(locator("higher_age_thumb")))
+        track = WebDriverWait(driver, timeout).until(EC.presence_of_element_located(locator("age_slider_track")))
+        thumb_location, thumb_size = thumb.location, thumb.size
+        track_location, track_size = track.location, track.size
+        start_x = thumb_location["x"] + thumb_size["width"] // 2
+        start_y = thumb_location["y"] + thumb_size["height"] // 2
+        target_x = track_location["x"] + track_size["width"] - thumb_size["width"] // 2 - 60
+        driver.execute_script("mobile: dragGesture", {"startX": start_x, "startY": start_y, "endX": target_x, "endY": start_y, "speed": 2500})
+        time.sleep(2)
+        WebDriverWait(driver, timeout).until(EC.element_to_be_clickable(locator("apply_button"))).click()
+        time.sleep(3)
+        return True
+    except TimeoutException:
+        return False
+
+def run(strategy, args) -> dict:
+    driver = FiltersDriver(args.latency, args.tree_cost, args.settle_delay, args.apply_delay)
+    started = time.perf_counter()
+    adjusted = strategy(driver)
+    wall = time.perf_counter() - started
+    get_geometry_cache().invalidate(driver)
+    return {"round_trips": driver.round_trips, "wall": wall, "recovered": adjusted and driver.root is driver.people}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.03, help="Simulated seconds per Appium round trip.")
+    parser.add_argument("--tree-cost", type=float, default=0.12, help="Simulated extra seconds for a server-side hierarchy dump.")
+    parser.add_argument("--settle-delay", type=float, default=0.3, help="Seconds before a dragged thumb shows at its new position.")
+    parser.add_argument("--apply-delay", type=float, default=0.8, help="Seconds before Apply closes the filter screen.")
+    args = parser.parse_args()
+
+    helper.log = lambda *a, **k: None
+    strategies = [
+        ("elements", elements_adjust),
+        ("snapshot", helper.adjust_age_filter_and_apply),
+    ]
+    print(f"{args.runs} runs, {args.latency * 1000:.0f}ms per round trip, +{args.tree_cost * 1000:.0f}ms per hierarchy dump, "
+          f"thumb settles after {args.settle_delay * 1000:.0f}ms, Apply closes after {args.apply_delay * 1000:.0f}ms\n")
+    print(f"{'adjust filters':<16}{'rt/run':>8}{'wall/run':>11}{'recovered':>11}")
+    for name, strategy in strategies:
+        results = [run(strategy, args) for _ in range(args.runs)]
+        round_trips = sum(r["round_trips"] for r in results) / args.runs
+        wall = sum(r["wall"] for r in results) / args.runs
+        recovered = sum(r["recovered"] for r in results)
+        print(f"{name:<16}{round_trips:>8.1f}{wall * 1000:>9.0f}ms{recovered:>7}/{args.runs}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: phone-after-phone bring-up vs. the staged BringUpPipeline.
+
+Runs against the local stub server, with `adb connect` and `glogin` replaced by
+sleeps of configurable length (no adb or real devices needed). The sequential
+strategy does what connect_to_phone does for one phone at a time; the pipeline
+overlaps the stages of different phones.
+
+Run from the repository root:
+    python -m benchmarks.bring_up [--phones 8] [--boot-seconds 2] [--connect-seconds 1.5] [--login-seconds 0.5]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import geelark_api
+import readiness
+from cache import TTLCache
+from geelark_stub import GeelarkStubServer
+
+def fake_adb(connect_seconds: float, login_seconds: float):
+    def connect(address: str) -> bool:
+        time.sleep(connect_seconds)
+        return True
+
+    def login(address: str, password: str) -> bool:
+        time.sleep(login_seconds)
+        return True
+    return connect, login
+
+def sequential(phone_ids: list[str], connect, login) -> int:
+    from connection import make_phone_ready
+
+    ready = 0
+    for phone_id in phone_ids:
+        info = make_phone_ready(phone_id)
+        address = f"{info['ip']}:{info['port']}" if info else None
+        if address and connect(address) and login(address, info["pwd"]):
+            ready += 1
+    return ready
+
+def pipelined(phone_ids: list[str], connect, login) -> int:
+    from pipeline import BringUpPipeline
+
+    pipeline = BringUpPipeline(connect=connect, login=login)
+    results = pipeline.bring_up(phone_ids)
+    pipeline.close()
+    pipelined.stage_stats = pipeline.stage_stats()
+    return sum(1 for info in results.values() if info)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--phones", type=int, default=8)
+    parser.add_argument("--boot-seconds", type=float, default=2.0)
+    parser.add_argument("--latency", type=float, default=0.1, help="Simulated per-request latency in seconds.")
+    parser.add_argument("--connect-seconds", type=float, default=1.5)
+    parser.add_argument("--login-seconds", type=float, default=0.5)
+    args = parser.parse_args()
+
+    # Keep the shared limiter, circuit breakers, stop queue and API stats of real runs out of the measurement
+    state_dir = tempfile.mkdtemp(prefix="geelark_bench_")
+    os.environ.setdefault("geelark_rate_limit", "100000")
+    os.environ.setdefault("geelark_rate_burst", "100000")
+    os.environ.setdefault("geelark_ratelimit_path", os.path.join(state_dir, "ratelimit.json"))
+    os.environ.setdefault("geelark_circuit_path", os.path.join(state_dir, "circuit.json"))
+    os.environ.setdefault("geelark_stop_queue_path", os.path.join(state_dir, "stop_queue.json"))
+    os.environ.setdefault("geelark_stats_dir", os.path.join(state_dir, "stats"))
+    geelark_api.app_id = geelark_api.app_id or "stub-app-id"
+    geelark_api.api_key = geelark_api.api_key or "stub-api-key"
+    connect, login = fake_adb(args.connect_seconds, args.login_seconds)
+
+    print(f"{args.phones} phones, boot ~{args.boot_seconds:g}s, connect {args.connect_seconds:g}s, login {args.login_seconds:g}s\n")
+    print(f"{'strategy':<12}{'ready':>7}{'wall':>9}")
+    for name, strategy in [("sequential", sequential), ("pipeline", pipelined)]:
+        with GeelarkStubServer(args.phones, boot_seconds=args.boot_seconds, latency=args.latency, seed=1) as stub:
+            geelark_api.configure_client(base_url=stub.url)
+            geelark_api.phone_cache = TTLCache(None, geelark_api.CACHE_TTLS)  # never mix stub data into the real cache
+            readiness.get_watcher().stop()
+            readiness._watcher = None
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                ready = strategy(list(stub.phones), connect, login)
+            print(f"{name:<12}{ready:>7}{time.perf_counter() - started:>8.2f}s")
+
+    print(f"\n{'stage':<10}{'phones':>7}{'avg queued':>12}{'avg time':>10}{'max time':>10}")
+    for stage, stats in pipelined.stage_stats.items():
+        print(f"{stage:<10}{stats['phones']:>7}{stats['avg_wait']:>11.2f}s{stats['avg_service']:>9.2f}s{stats['max_service']:>9.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+Locator micro-benchmark: times every strategy of each registry locator (locators.py) against
+a recorded screen and picks the fastest one that finds the same element as the reference
+XPath (the element itself or one inside it, e.g. a button's label).
+
+Offline (the default) it replays the page_source fixtures in benchmarks/fixtures/screens.
+Strategies are evaluated on the recorded tree, and each lookup is charged what it costs on
+the device: a round trip for every strategy, plus a view-tree walk for ID, accessibility id
+and UiSelector lookups, plus a full hierarchy dump for XPath. With --appium-url it attaches
+to the device's current screen and times real find_elements calls instead. Only those
+measured picks can be recorded (--write); the offline costs are estimates.
+
+Run from the repository root:
+    python -m benchmarks.locators [--iterations 5]
+    python -m benchmarks.locators --appium-url http://127.0.0.1:4723 --udid 127.0.0.1:5555 [--record NAME] [--write]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+import time
+import xml.etree.ElementTree as ElementTree
+import locators
+from screens import parse_bounds
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "screens")
+
+# --- A small XPath 1.0 subset: the step, predicate and function forms the locators use ---
+
+_XPATH_TOKEN = re.compile(r"\s*(//|/|\.|\[|\]|\(|\)|\||,|=|@[\w:.-]+|'[^']*'|\"[^\"]*\"|[\w.*:-]+)")
+
+def _tokenize(expression: str) -> list[str]:
+    tokens, position = [], 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _XPATH_TOKEN.match(expression, position)
+        if not match:
+            raise ValueError(f"Unsupported XPath near {expression[position:]!r}")
+        tokens.append(match.group(1))
+        position = match.end()
+    return tokens
+
+class XPathSubset:
+    """Compiles unions of location paths with [@a='v'], contains(@a, 'v'), and/or and nested relative paths."""
+
+    def __init__(self, expression: str):
+        self.tokens = _tokenize(expression)
+        self.position = 0
+        self.paths = [self._path()]
+        while self._accept("|"):
+            self.paths.append(self._path())
+        if self.position != len(self.tokens):
+            raise ValueError(f"Unsupported XPath: {expression!r}")
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _accept(self, token: str) -> bool:
+        if self._peek() == token:
+            self.position += 1
+            return True
+        return False
+
+    def _expect(self, token: str):
+        if not self._accept(token):
+            raise ValueError(f"Expected {token!r} at {self._peek()!r}")
+
+    def _path(self) -> tuple[bool, list]:
+        relative = self._accept(".")
+        steps = []
+        while self._peek() in ("//", "/"):
+            axis = self.tokens[self.position]
+            self.position += 1
+            name = self.tokens[self.position]
+            self.position += 1
+            predicates = []
+            while self._accept("["):
+                predicates.append(self._or())
+                self._expect("]")
+            steps.append((axis, name, predicates))
+        return relative, steps
+
+    def _or(self):
+        terms = [self._and()]
+        while self._accept("or"):
+            terms.append(self._and())
+        return lambda node: any(term(node) for term in terms)
+
+    def _and(self):
+        terms = [self._primary()]
+        while self._accept("and"):
+            terms.append(self._primary())
+        return lambda node: all(term(node) for term in terms)
+
+    def _primary(self):
+        token = self._peek()
+        if self._accept("("):
+            term = self._or()
+            self._expect(")")
+            return term
+        if token == "contains":
+            self.position += 1
+            self._expect("(")
+            attribute = self.tokens[self.position][1:]
+            self.position += 1
+            self._expect(",")
+            needle = self.tokens[self.position][1:-1]
+            self.position += 1
+            self._expect(")")
+            return lambda node: needle in node.get(attribute, "")
+        if token.startswith("@"):
+            self.position += 1
+            attribute = token[1:]
+            if self._accept("="):
+                value = self.tokens[self.position][1:-1]
+                self.position += 1
+                return lambda node: node.get(attribute) == value
+            return lambda node: bool(node.get(attribute))
+        if token == ".":
+            path = self._path()
+            return lambda node: bool(self._evaluate(path, [node]))
+        raise ValueError(f"Unsupported XPath predicate at {token!r}")
+
+    @staticmethod
+    def _evaluate(path: tuple[bool, list], context: list) -> list:
+        _, steps = path
+        for axis, name, predicates in steps:
+            found = []
+            for node in context:
+                candidates = (child for start in node for child in start.iter()) if axis == "//" else iter(node)
+                for candidate in candidates:
+                    if (name == "*" or candidate.tag == name) and all(predicate(candidate) for predicate in predicates):
+                        found.append(candidate)
+            context = list(dict.fromkeys(found))
+        return context
+
+    def select(self, root) -> list:
+        document = ElementTree.Element("document")
+        document.append(root)
+        found = []
+        for path in self.paths:
+            found.extend(self._evaluate(path, [document]))
+        order = {node: index for index, node in enumerate(root.iter())}
+        return sorted(dict.fromkeys(found), key=order.get)
+
+# --- A UiSelector subset ---
+
+_UI_METHOD = re.compile(r'\.(\w+)\(')
+
+def _parse_uiselector(expression: str, position: int = 0) -> tuple[list, int]:
+    prefix = "new UiSelector()"
+    if not expression.startswith(prefix, position):
+        raise ValueError(f"Unsupported UiSelector: {expression!r}")
+    position += len(prefix)
+    criteria = []
+    while True:
+        match = _UI_METHOD.match(expression, position)
+        if not match:
+            return criteria, position
+        method, position = match.group(1), match.end()
+        if method in ("childSelector", "fromParent"):
+            child, position = _parse_uiselector(expression, position)
+            criteria.append((method, child))
+        else:
+            value, end = json.JSONDecoder().raw_decode(expression, position)
+            criteria.append((method, value))
+            position = end
+        if expression[position] != ")":
+            raise ValueError(f"Unsupported UiSelector: {expression!r}")
+        position += 1
+
+_UI_CHECKS = {
+    "text": lambda node, value: node.get("text") == value,
+    "textContains": lambda node, value: value in node.get("text", ""),
+    "textMatches": lambda node, value: re.fullmatch(value, node.get("text", "")) is not None,
+    "textStartsWith": lambda node, value: node.get("text", "").startswith(value),
+    "className": lambda node, value: node.get("class") == value,
+    "description": lambda node, value: node.get("content-desc") == value,
+    "descriptionContains": lambda node, value: value in node.get("content-desc", ""),
+    "resourceId": lambda node, value: node.get("resource-id") == value,
+    "resourceIdMatches": lambda node, value: re.fullmatch(value, node.get("resource-id", "")) is not None,
+    "clickable": lambda node, value: (node.get("clickable") == "true") == value,
+    "selected": lambda node, value: (node.get("selected") == "true") == value,
+    "enabled": lambda node, value: (node.get("enabled") == "true") == value,
+}
+
+def _select_ui(criteria: list, nodes, parents: dict) -> list:
+    own = [(method, value) for method, value in criteria if method not in ("childSelector", "fromParent")]
+    child = next((value for method, value in criteria if method == "childSelector"), None)
+    sibling = next((value for method, value in criteria if method == "fromParent"), None)
+    matched = [node for node in nodes if all(_UI_CHECKS[method](node, value) for method, value in own)]
+    if child is not None:
+        matched = [found for parent in matched
+                   for found in _select_ui(child, (node for node in parent.iter() if node is not parent), parents)]
+    if sibling is not None:
+        matched = [found for node in matched if node in parents
+                   for found in _select_ui(sibling, (other for other in parents[node].iter() if other is not parents[node]), parents)]
+    return list(dict.fromkeys(matched))
+
+def select(root, by: str, value: str) -> list:
+    """The nodes of a recorded tree that a strategy finds, in document order."""
+    if by == locators.ID:
+        return [node for node in root.iter() if node.get("resource-id") == value]
+    if by == locators.ACCESSIBILITY_ID:
+        return [node for node in root.iter() if node.get("content-desc") == value]
+    if by == locators.UIAUTOMATOR:
+        parents = {child: parent for parent in root.iter() for child in parent}
+        return _select_ui(_parse_uiselector(value)[0], root.iter(), parents)
+    return XPathSubset(value).select(root)
+
+def _inside(inner: tuple | None, outer: tuple | None) -> bool:
+    return inner is not None and outer is not None and outer[0] <= inner[0] and outer[1] <= inner[1] and inner[2] <= outer[2] and inner[3] <= outer[3]
+
+# --- Offline: recorded screens ---
+
+def device_cost(by: str, nodes: int, args) -> float:
+    """Simulated on-device seconds for one lookup over a tree of `nodes` views."""
+    if by == locators.XPATH:
+        return args.latency + args.tree_cost
+    return args.latency + nodes * args.walk_cost
+
+def benchmark_offline(args) -> dict[str, dict]:
+    screens = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.xml"))):
+        with open(path, encoding="utf-8") as f:
+            screens[os.path.splitext(os.path.basename(path))[0]] = ElementTree.fromstring(f.read())
+
+    results = {}
+    for name, entry in locators.LOCATORS.items():
+        if len(entry.strategies) < 2:
+            continue
+        reference_by, reference_value = entry.reference
+        screen = next((screen for screen, root in screens.items() if select(root, reference_by, reference_value)), None)
+        if screen is None:
+            results[name] = {"screen": None}
+            continue
+        root = screens[screen]
+        nodes = sum(1 for _ in root.iter())
+        reference = parse_bounds(select(root, reference_by, reference_value)[0].get("bounds", ""))
+        timings = {}
+        for by, value in entry.strategies:
+            samples = []
+            for _ in range(args.iterations):
+                started = time.perf_counter()
+                found = select(root, by, value)
+                samples.append(time.perf_counter() - started + device_cost(by, nodes, args))
+            timings[by] = {
+                "seconds": statistics.median(samples),
+                "matches": bool(found) and _inside(parse_bounds(found[0].get("bounds", "")), reference),
+            }
+        results[name] = {"screen": screen, "timings": timings}
+    return results
+
+# --- Live: the device's current screen ---
+
+def benchmark_live(args) -> dict[str, dict]:
+    from appium import webdriver
+    from appium.options.android import UiAutomator2Options
+
+    options = UiAutomator2Options()
+    options.platform_name = "Android"
+    options.automation_name = "UiAutomator2"
+    options.udid = args.udid
+    options.no_reset = True
+    options.set_capability("appium:autoLaunch", False)
+    driver = webdriver.Remote(args.appium_url, options=options)
+    try:
+        if args.record:
+            path = os.path.join(FIXTURES_DIR, args.record + ".xml")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(driver.page_source)
+            print(f"Recorded the current screen to {path}\n")
+
+        results = {}
+        for name, entry in locators.LOCATORS.items():
+            if len(entry.strategies) < 2:
+                continue
+            reference = driver.find_elements(*entry.reference)
+            if not reference:
+                results[name] = {"screen": None}
+                continue
+            outer = reference[0].rect
+            outer = (outer["x"], outer["y"], outer["x"] + outer["width"], outer["y"] + outer["height"])
+            timings = {}
+            for by, value in entry.strategies:
+                samples, found = [], []
+                for _ in range(args.iterations):
+                    started = time.perf_counter()
+                    found = driver.find_elements(by, value)
+                    samples.append(time.perf_counter() - started)
+                rect = found[0].rect if found else None
+                inner = (rect["x"], rect["y"], rect["x"] + rect["width"], rect["y"] + rect["height"]) if rect else None
+                timings[by] = {"seconds": statistics.median(samples), "matches": _inside(inner, outer)}
+            results[name] = {"screen": "current", "timings": timings}
+        return results
+    finally:
+        driver.quit()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.03, help="Offline: simulated seconds per round trip.")
+    parser.add_argument("--tree-cost", type=float, default=0.12, help="Offline: simulated seconds for a hierarchy dump (XPath).")
+    parser.add_argument("--walk-cost", type=float, default=0.00002, help="Offline: simulated seconds per view walked by ID/UiSelector lookups.")
+    parser.add_argument("--appium-url", help="Time real lookups through this Appium server instead of the recorded screens.")
+    parser.add_argument("--udid", help="Device to attach to with --appium-url.")
+    parser.add_argument("--record", help="With --appium-url: also save the current screen as fixtures/screens/NAME.xml.")
+    parser.add_argument("--write", action="store_true", help="With --appium-url: record the picks in the locator preferences file.")
+    args = parser.parse_args()
+    if args.write and not args.appium_url:
+        # Offline picks follow from the simulated costs above, not from the device
+        parser.error("--write needs --appium-url: only measured picks are recorded")
+
+    results = benchmark_live(args) if args.appium_url else benchmark_offline(args)
+    labels = {locators.ID: "id", locators.UIAUTOMATOR: "uiselector", locators.ACCESSIBILITY_ID: "a11y id", locators.XPATH: "xpath"}
+    print(f"{'locator':<28}{'screen':<24}" + "".join(f"{label:>13}" for label in labels.values()) + "  pick")
+    picks = {}
+    for name, result in results.items():
+        if result["screen"] is None:
+            print(f"{name:<28}{'(not on any screen)':<24}")
+            continue
+        cells = []
+        for by in labels:
+            timing = result["timings"].get(by)
+            cells.append(f"{'':>13}" if timing is None else f"{timing['seconds'] * 1000:>9.1f}ms{'' if timing['matches'] else ' ✗':<2}")
+        matching = [by for by, timing in result["timings"].items() if timing["matches"]]
+        pick = min(matching, key=lambda by: result["timings"][by]["seconds"]) if matching else None
+        if pick is not None:
+            picks[name] = pick
+        print(f"{name:<28}{result['screen']:<24}" + "".join(cells) + f"  {labels.get(pick, '-')}")
+
+    print("\n✗ = found nothing, or not the reference element")
+    if args.write and picks:
+        locators.save_preferences(picks)
+        print(f"Recorded {len(picks)} picks in {locators.get_preferences_path()}")
+
+if __name__ == "__main__":
+    main()
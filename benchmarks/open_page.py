@@ -0,0 +1,201 @@
+"""
+Benchmark: round trips and wall time of open_page when switching People <-> Chats, as the
+"auto" automation mode does.
+
+A fake driver serves the People and Chats page_source fixtures (benchmarks/fixtures/screens)
+and charges every Appium call a round-trip latency, plus a hierarchy-dump cost for XPath
+lookups and page_source. A tab switch shows up `--switch-delay` seconds after the click or
+tap. Three versions are compared:
+
+    probes          the open_page of before the screen classifier: chained WebDriverWait
+                    probes for the current tab, a nav bar wait, a clickable-tab XPath wait,
+                    click, then the probes again until the tab is selected
+    element path    open_page(use_cached_bounds=False): snapshot checks, click on the tab element
+    coordinate tap  open_page(): snapshot check, tap at the cached tab bounds, snapshot verify
+
+Run from the repository root:
+    python -m benchmarks.open_page [--switches 10] [--latency 0.03] [--tree-cost 0.12]
+"""
+import argparse
+import os
+import re
+import time
+import xml.etree.ElementTree as ElementTree
+from appium.webdriver.common.appiumby import AppiumBy
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from geometry import get_geometry_cache
+from helper import open_page
+from screens import NAV_BAR_ID, parse_bounds
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "screens")
+TAB_FIXTURES = {"People": "people_loaded", "Chats": "chats_list"}
+NAV_XPATH = re.compile(r"^//\*\[@resource-id='([^']+)'\]//android\.view\.ViewGroup\[(.+)\]$")
+
+class FakeElement:
+    def __init__(self, driver, node):
+        self._driver = driver
+        self._node = node
+
+    def is_displayed(self) -> bool:
+        self._driver._round_trip()
+        return self._node.get("displayed") != "false"
+
+    def is_enabled(self) -> bool:
+        self._driver._round_trip()
+        return self._node.get("enabled") != "false"
+
+    def get_attribute(self, name: str):
+        self._driver._round_trip()
+        return self._node.get(name)
+
+    def click(self):
+        self._driver._round_trip()
+        self._driver._select(self._node.get("content-desc"))
+
+class TabDriver:
+    """Two-tab app: the selected tab follows clicks and taps after `switch_delay` seconds."""
+
+    def __init__(self, latency: float, tree_cost: float, switch_delay: float):
+        self.session_id = f"bench-{id(self)}"
+        self.latency = latency
+        self.tree_cost = tree_cost
+        self.switch_delay = switch_delay
+        self.sources = {}
+        for tab, fixture in TAB_FIXTURES.items():
+            with open(os.path.join(FIXTURES_DIR, fixture + ".xml"), encoding="utf-8") as f:
+                self.sources[tab] = f.read()
+        self.trees = {tab: ElementTree.fromstring(source) for tab, source in self.sources.items()}
+        self._tab, self._pending = "People", None
+        self.round_trips = 0
+
+    def _round_trip(self, dumps_tree: bool = False):
+        self.round_trips += 1
+        time.sleep(self.latency + (self.tree_cost if dumps_tree else 0.0))
+
+    def _select(self, tab: str | None):
+        if tab in self.sources:
+            self._pending = (tab, time.monotonic() + self.switch_delay)
+
+    @property
+    def tab(self) -> str:
+        if self._pending and time.monotonic() >= self._pending[1]:
+            self._tab, self._pending = self._pending[0], None
+        return self._tab
+
+    @property
+    def page_source(self) -> str:
+        self._round_trip(dumps_tree=True)
+        return self.sources[self.tab]
+
+    def get_window_size(self) -> dict:
+        self._round_trip()
+        return {"width": 1080, "height": 2400}
+
+    def back(self):
+        self._round_trip()
+
+    def execute_script(self, script: str, args: dict):
+        self._round_trip()
+        if script == "mobile: clickGesture":
+            for node in self.trees[self.tab].iter("android.view.ViewGroup"):
+                bounds = parse_bounds(node.get("bounds", ""))
+                if node.get("content-desc") in self.sources and bounds and bounds[0] <= args["x"] < bounds[2] and bounds[1] <= args["y"] < bounds[3]:
+                    self._select(node.get("content-desc"))
+                    return
+
+    def find_elements(self, by: str, value: str) -> list[FakeElement]:
+        root = self.trees[self.tab]
+        if by == AppiumBy.ID:
+            self._round_trip()
+            return [FakeElement(self, node) for node in root.iter() if node.get("resource-id") == value]
+        if by == AppiumBy.ACCESSIBILITY_ID:
+            self._round_trip()
+            return [FakeElement(self, node) for node in root.iter() if node.get("content-desc") == value]
+        self._round_trip(dumps_tree=True)
+        match = NAV_XPATH.match(value)
+        nav = next((node for node in root.iter() if match and node.get("resource-id") == match.group(1)), None)
+        if nav is None:
+            return []
+        condition = match.group(2)
+        if condition == "@selected='true' and @content-desc":
+            nodes = [node for node in nav.iter("android.view.ViewGroup") if node.get("selected") == "true" and node.get("content-desc")]
+        else:
+            desc = re.match(r"@content-desc='([^']+)'", condition).group(1)
+            nodes = [node for node in nav.iter("android.view.ViewGroup") if node.get("content-desc") == desc]
+        return [FakeElement(self, node) for node in nodes]
+
+    def find_element(self, by: str, value: str) -> FakeElement:
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElementException(value)
+        return found[0]
+
+# --- The open_page of before the screen classifier, replayed against the fake driver ---
+
+def probes_current_screen(driver, timeout: int = 5) -> str:
+    def nav_bar_present():
+        try:
+            return WebDriverWait(driver, max(1, timeout // 2)).until(EC.presence_of_element_located((AppiumBy.ID, NAV_BAR_ID))).is_displayed()
+        except TimeoutException:
+            return False
+    if not nav_bar_present():
+        driver.back()
+        if not nav_bar_present():
+            return "NAV_BAR_NOT_FOUND"
+    try:
+        selected = WebDriverWait(driver, timeout).until(EC.presence_of_element_located(
+            (AppiumBy.XPATH, f"//*[@resource-id='{NAV_BAR_ID}']//android.view.ViewGroup[@selected='true' and @content-desc]")))
+        return selected.get_attribute("content-desc").upper().replace(" ", "_") + "_SCREEN"
+    except TimeoutException:
+        return "UNKNOWN_SCREEN_SELECTED_TAB_NOT_FOUND_IN_NAV_BAR"
+
+def probes_open_page(driver, page: str, navigation_timeout: int = 10, verification_timeout: int = 5) -> bool:
+    target = page.upper().replace(" ", "_") + "_SCREEN"
+    if probes_current_screen(driver, timeout=3) == target:
+        return True
+    try:
+        WebDriverWait(driver, navigation_timeout).until(EC.presence_of_element_located((AppiumBy.ID, NAV_BAR_ID)))
+        WebDriverWait(driver, navigation_timeout).until(EC.element_to_be_clickable(
+            (AppiumBy.XPATH, f"//*[@resource-id='{NAV_BAR_ID}']//android.view.ViewGroup[@content-desc='{page}']"))).click()
+        WebDriverWait(driver, verification_timeout).until(lambda d: probes_current_screen(d, timeout=1) == target)
+        return True
+    except TimeoutException:
+        return False
+
+def run_switches(strategy, args) -> dict:
+    driver = TabDriver(args.latency, args.tree_cost, args.switch_delay)
+    quiet = lambda *a, **k: None
+    strategy(driver, "People", quiet)  # land on the first tab (and, for the snapshot paths, learn the tab bounds)
+    driver.round_trips = 0
+    opened = 0
+    started = time.perf_counter()
+    for i in range(args.switches):
+        opened += strategy(driver, "Chats" if i % 2 == 0 else "People", quiet)
+    wall = time.perf_counter() - started
+    get_geometry_cache().invalidate(driver)
+    return {"round_trips": driver.round_trips / args.switches, "wall": wall / args.switches, "opened": opened}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--switches", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.03, help="Simulated seconds per Appium round trip.")
+    parser.add_argument("--tree-cost", type=float, default=0.12, help="Simulated extra seconds for a server-side hierarchy dump.")
+    parser.add_argument("--switch-delay", type=float, default=0.2, help="Seconds before a tapped tab shows as selected.")
+    args = parser.parse_args()
+
+    strategies = [
+        ("probes", lambda driver, page, log: probes_open_page(driver, page)),
+        ("element path", lambda driver, page, log: open_page(driver, page, logger_func=log, use_cached_bounds=False)),
+        ("coordinate tap", lambda driver, page, log: open_page(driver, page, logger_func=log)),
+    ]
+    print(f"{args.switches} People <-> Chats switches, {args.latency * 1000:.0f}ms per round trip, "
+          f"+{args.tree_cost * 1000:.0f}ms per hierarchy dump, tab switch after {args.switch_delay * 1000:.0f}ms\n")
+    print(f"{'open_page':<16}{'rt/switch':>11}{'wall/switch':>13}{'opened':>8}")
+    for name, strategy in strategies:
+        result = run_switches(strategy, args)
+        print(f"{name:<16}{result['round_trips']:>11.1f}{result['wall'] * 1000:>11.0f}ms{result['opened']:>5}/{args.switches}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: sequential vs. parallel pagination of /phone/list.
+
+Serves a fake account of 1,200 phones from the local stub server (with a fixed
+per-request latency standing in for the round trip to openapi.geelark.com) and
+compares fetching the pages one after another with geelark_api.iter_cloud_phones.
+
+Run from the repository root:
+    python -m benchmarks.pagination [--phones 1200] [--latency 0.25]
+"""
+import argparse
+import os
+import time
+import geelark_api
+from cache import TTLCache
+from geelark_stub import GeelarkStubServer
+
+def sequential_pages(page_size: int = 100) -> tuple[int, float]:
+    """Fetch page after page until a short page comes back; returns (phone count, time to first phone)."""
+    started = time.perf_counter()
+    first_phone_at = None
+    count = 0
+    page = 1
+    while True:
+        items = geelark_api.get_all_cloud_phones(page=page, page_size=page_size)
+        if items and first_phone_at is None:
+            first_phone_at = time.perf_counter() - started
+        count += len(items)
+        if len(items) < page_size:
+            return count, first_phone_at
+        page += 1
+
+def parallel_pages() -> tuple[int, float]:
+    """Stream through iter_cloud_phones; returns (phone count, time to first phone)."""
+    started = time.perf_counter()
+    first_phone_at = None
+    count = 0
+    for _ in geelark_api.iter_cloud_phones():
+        if first_phone_at is None:
+            first_phone_at = time.perf_counter() - started
+        count += 1
+    return count, first_phone_at
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--phones", type=int, default=1200)
+    parser.add_argument("--latency", type=float, default=0.25, help="Simulated per-request latency in seconds.")
+    args = parser.parse_args()
+
+    # The stub has no rate limit of its own; keep the shared limiter out of the measurement
+    os.environ.setdefault("geelark_rate_limit", "100000")
+    os.environ.setdefault("geelark_rate_burst", "100000")
+    with GeelarkStubServer(args.phones, latency=args.latency) as stub:
+        geelark_api.app_id = geelark_api.app_id or "stub-app-id"
+        geelark_api.api_key = geelark_api.api_key or "stub-api-key"
+        geelark_api.configure_client(base_url=stub.url)
+        geelark_api.phone_cache = TTLCache(None, geelark_api.CACHE_TTLS)  # never mix stub data into the real cache
+
+        print(f"{args.phones} phones, {args.latency * 1000:.0f} ms per request\n")
+        print(f"{'strategy':<12}{'phones':>8}{'first phone':>14}{'total':>10}")
+        for name, strategy in [("sequential", sequential_pages), ("parallel", parallel_pages)]:
+            started = time.perf_counter()
+            count, first_phone_at = strategy()
+            total = time.perf_counter() - started
+            print(f"{name:<12}{count:>8}{first_phone_at:>13.2f}s{total:>9.2f}s")
+
+if __name__ == "__main__":
+    main()
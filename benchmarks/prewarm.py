@@ -0,0 +1,92 @@
+"""
+Benchmark: starting each queued phone when its worker slot frees up vs. pre-warming.
+
+Runs a queue of phones through a fixed number of worker slots against the local stub
+server; a "session" is a sleep of fixed length, and `adb connect`/`glogin` are short
+sleeps. Cold runs the PrewarmScheduler with max_prewarm=0 (phones start at their turn,
+the old behaviour); prewarm lets it start the next phones ahead of time.
+
+Run from the repository root:
+    python -m benchmarks.prewarm [--phones 8] [--slots 2] [--boot-seconds 3] [--session-seconds 4]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+import geelark_api
+import readiness
+from cache import TTLCache
+from geelark_stub import GeelarkStubServer
+
+def run_queue(phone_ids: list[str], args, max_prewarm: int | None) -> dict:
+    from pipeline import BringUpPipeline
+    from prewarm import PrewarmScheduler
+
+    fake_step = lambda *_: time.sleep(args.connect_seconds) or True
+    pipeline = BringUpPipeline(connect=fake_step, login=fake_step)
+    scheduler = PrewarmScheduler(
+        pipeline, phone_ids, args.slots,
+        expected_session=args.session_seconds, idle_timeout=args.idle_timeout, max_prewarm=max_prewarm,
+    )
+    started = time.perf_counter()
+    queue = list(phone_ids)
+    running = {}  # phone ID -> (future, session end or None)
+    scheduler.tick()
+    while queue or running:
+        now = time.perf_counter()
+        for phone_id, (future, ends_at) in list(running.items()):
+            if ends_at is None and future.done():
+                running[phone_id] = (future, now + args.session_seconds if future.result() else now)
+            elif ends_at is not None and now >= ends_at:
+                del running[phone_id]
+                scheduler.session_finished(phone_id)
+        while queue and len(running) < args.slots:
+            phone_id = queue.pop(0)
+            running[phone_id] = (scheduler.claim(phone_id), None)
+        if queue:
+            scheduler.tick()
+        time.sleep(0.05)
+    wall = time.perf_counter() - started
+    pipeline.close()
+    return dict(scheduler.stats(), wall=wall)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--phones", type=int, default=8)
+    parser.add_argument("--slots", type=int, default=2)
+    parser.add_argument("--boot-seconds", type=float, default=3.0)
+    parser.add_argument("--session-seconds", type=float, default=4.0)
+    parser.add_argument("--connect-seconds", type=float, default=0.3)
+    parser.add_argument("--idle-timeout", type=float, default=30.0)
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated per-request latency in seconds.")
+    args = parser.parse_args()
+
+    # Keep the shared limiter, circuit breakers, stop queue and API stats of real runs out of the measurement
+    state_dir = tempfile.mkdtemp(prefix="geelark_bench_")
+    os.environ.setdefault("geelark_rate_limit", "100000")
+    os.environ.setdefault("geelark_rate_burst", "100000")
+    os.environ.setdefault("geelark_ratelimit_path", os.path.join(state_dir, "ratelimit.json"))
+    os.environ.setdefault("geelark_circuit_path", os.path.join(state_dir, "circuit.json"))
+    os.environ.setdefault("geelark_stop_queue_path", os.path.join(state_dir, "stop_queue.json"))
+    os.environ.setdefault("geelark_stats_dir", os.path.join(state_dir, "stats"))
+    geelark_api.app_id = geelark_api.app_id or "stub-app-id"
+    geelark_api.api_key = geelark_api.api_key or "stub-api-key"
+
+    print(f"{args.phones} phones through {args.slots} slots, boot {args.boot_seconds:g}s, session {args.session_seconds:g}s\n")
+    print(f"{'strategy':<10}{'wall':>9}{'avg wait':>10}{'max wait':>10}{'ahead':>7}{'ready':>7}{'booting':>9}{'cold':>6}{'idle min':>10}")
+    for name, max_prewarm in [("cold", 0), ("prewarm", None)]:
+        with GeelarkStubServer(args.phones, boot_seconds=args.boot_seconds, boot_distribution="fixed", latency=args.latency, seed=1) as stub:
+            geelark_api.configure_client(base_url=stub.url)
+            geelark_api.phone_cache = TTLCache(None, geelark_api.CACHE_TTLS)  # never mix stub data into the real cache
+            readiness.get_watcher().stop()
+            readiness._watcher = None
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = run_queue(list(stub.phones), args, max_prewarm)
+        print(f"{name:<10}{result['wall']:>8.2f}s{result['avg_slot_wait']:>9.2f}s{result['max_slot_wait']:>9.2f}s"
+              f"{result['prewarmed']:>7}{result['claimed_ready']:>7}{result['claimed_warming']:>9}{result['claimed_cold']:>6}"
+              f"{result['idle_seconds'] / 60:>10.2f}")
+
+if __name__ == "__main__":
+    main()
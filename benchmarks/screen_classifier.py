@@ -0,0 +1,169 @@
+"""
+Benchmark: chained WebDriverWait probes vs. one page_source snapshot per screen classification.
+
+Replays recorded page_source dumps (benchmarks/fixtures/screens) through a fake driver that
+charges every Appium call a round-trip latency, plus a hierarchy-dump cost for the calls that
+make UiAutomator2 serialize the whole tree (XPath lookups and page_source). Three ways of
+finding out where the app is are compared:
+
+    tab probes     the old get_current_screen_by_tab: nav bar wait + is_displayed, back() and
+                   a second wait when it is missing, selected-tab XPath wait + get_attribute
+    + popup sweep  the tab probes plus one zero-wait find_elements per known popup, the
+                   least the old handlers spend to learn what the snapshot reports
+    snapshot       screens.classify_screen (tab, popups, profile and chat state at once)
+
+Run from the repository root:
+    python -m benchmarks.screen_classifier [--latency 0.03] [--tree-cost 0.12] [--iterations 3]
+"""
+import argparse
+import glob
+import os
+import time
+import xml.etree.ElementTree as ElementTree
+import screens
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "screens")
+
+# Where driver.back() leads from the screens without a navigation bar
+BACK_TARGETS = {"chat_open": "chats_list", "chat_opening_move": "chats_list", "its_a_match": "people_loaded"}
+
+SELECTED_TAB_XPATH = f"//*[@resource-id='{screens.NAV_BAR_ID}']//android.view.ViewGroup[@selected='true' and @content-desc]"
+
+class NoSuchElement(Exception):
+    pass
+
+class FakeElement:
+    def __init__(self, driver, node):
+        self._driver = driver
+        self._node = node
+
+    def is_displayed(self) -> bool:
+        self._driver._round_trip()
+        return self._node.get("displayed") != "false"
+
+    def get_attribute(self, name: str):
+        self._driver._round_trip()
+        return self._node.get(name)
+
+class FixtureDriver:
+    """Serves recorded page sources and counts (and charges for) Appium round trips."""
+
+    def __init__(self, sources: dict[str, str], current: str, latency: float, tree_cost: float):
+        self.sources = sources
+        self.trees = {name: ElementTree.fromstring(source) for name, source in sources.items()}
+        self.current = current
+        self.latency = latency
+        self.tree_cost = tree_cost
+        self.round_trips = 0
+
+    def _round_trip(self, dumps_tree: bool = False):
+        self.round_trips += 1
+        time.sleep(self.latency + (self.tree_cost if dumps_tree else 0.0))
+
+    @property
+    def page_source(self) -> str:
+        self._round_trip(dumps_tree=True)
+        return self.sources[self.current]
+
+    def back(self):
+        self._round_trip()
+        self.current = BACK_TARGETS.get(self.current, self.current)
+
+    def find_elements(self, by: str, value) -> list[FakeElement]:
+        root = self.trees[self.current]
+        if by == "id":
+            self._round_trip()
+            nodes = [node for node in root.iter() if node.get("resource-id") == value]
+        elif value == SELECTED_TAB_XPATH:
+            self._round_trip(dumps_tree=True)
+            nav = next((node for node in root.iter() if node.get("resource-id") == screens.NAV_BAR_ID), None)
+            nodes = [] if nav is None else [
+                node for node in nav.iter("android.view.ViewGroup") if node.get("selected") == "true" and node.get("content-desc")
+            ]
+        else:
+            # A popup locator, given as its rule; matched the way its XPath would be
+            self._round_trip(dumps_tree=True)
+            nodes = [node for node in root.iter() if value.matches(node.attrib)]
+        return [FakeElement(self, node) for node in nodes]
+
+    def find_element(self, by: str, value) -> FakeElement:
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElement(value)
+        return found[0]
+
+def wait_present(driver: FixtureDriver, by: str, value, timeout: float, poll: float = 0.5) -> FakeElement | None:
+    """WebDriverWait(driver, timeout).until(presence_of_element_located(...)) with selenium's default poll."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return driver.find_element(by, value)
+        except NoSuchElement:
+            if time.monotonic() + poll > deadline:
+                return None
+            time.sleep(poll)
+
+def tab_probes(driver: FixtureDriver, timeout: int = 3) -> str:
+    """The probe sequence get_current_screen_by_tab used to run (as called by open_page)."""
+    nav_present = lambda: (element := wait_present(driver, "id", screens.NAV_BAR_ID, max(1, timeout // 2))) is not None and element.is_displayed()
+    if not nav_present():
+        driver.back()
+        if not nav_present():
+            return "NAV_BAR_NOT_FOUND"
+    element = wait_present(driver, "xpath", SELECTED_TAB_XPATH, timeout)
+    if element is None:
+        return "UNKNOWN_SCREEN_SELECTED_TAB_NOT_FOUND_IN_NAV_BAR"
+    return element.get_attribute("content-desc").upper().replace(" ", "_") + "_SCREEN"
+
+def tab_probes_and_popups(driver: FixtureDriver) -> str:
+    popups = [rule.name for rule in screens.RULES if rule.kind == screens.POPUP and driver.find_elements("xpath", rule)]
+    return f"{tab_probes(driver)} {popups}"
+
+def snapshot(driver: FixtureDriver) -> str:
+    state = screens.classify_screen(driver)
+    if state.nav_bar is None and not state.chat and not state.popups:
+        driver.back()
+        state = screens.classify_screen(driver)
+    return f"{state.screen_id} {list(state.popups)}"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.03, help="Simulated seconds per Appium round trip.")
+    parser.add_argument("--tree-cost", type=float, default=0.12, help="Simulated extra seconds for a server-side hierarchy dump.")
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+
+    sources = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.xml"))):
+        with open(path, encoding="utf-8") as f:
+            sources[os.path.splitext(os.path.basename(path))[0]] = f.read()
+
+    strategies = [("tab probes", tab_probes), ("+ popup sweep", tab_probes_and_popups), ("snapshot", snapshot)]
+    print(f"{len(sources)} fixtures, {args.latency * 1000:.0f}ms per round trip, +{args.tree_cost * 1000:.0f}ms per hierarchy dump\n")
+    print(f"{'fixture':<24}" + "".join(f"{name:>22}" for name, _ in strategies) + f"{'parse':>9}  state")
+    totals = {name: [0, 0.0] for name, _ in strategies}
+    for fixture in sources:
+        cells = []
+        for name, strategy in strategies:
+            driver = FixtureDriver(sources, fixture, args.latency, args.tree_cost)
+            started = time.perf_counter()
+            for _ in range(args.iterations):
+                driver.current = fixture
+                strategy(driver)
+            wall = (time.perf_counter() - started) / args.iterations
+            round_trips = driver.round_trips / args.iterations
+            totals[name][0] += round_trips
+            totals[name][1] += wall
+            cells.append(f"{round_trips:>10.0f} rt {wall * 1000:>7.0f}ms")
+
+        started = time.perf_counter()
+        for _ in range(50):
+            state = screens.classify_page_source(sources[fixture])
+        parse_ms = (time.perf_counter() - started) / 50 * 1000
+        print(f"{fixture:<24}" + "".join(cells) + f"{parse_ms:>7.2f}ms  {state!r}")
+
+    count = len(sources)
+    print(f"{'average':<24}" + "".join(f"{rt / count:>10.1f} rt {wall / count * 1000:>7.0f}ms" for rt, wall in totals.values()))
+
+if __name__ == "__main__":
+    main()
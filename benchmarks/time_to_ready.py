@@ -0,0 +1,101 @@
+"""
+Benchmark: time-to-ready of connection.make_phone_ready for 1, 10 and 100 phones.
+
+Each fleet size gets a fresh local stub server that checks request signatures and
+boots phones with a configurable boot-time distribution, latency, failure rate and
+rate limit. Every phone is brought up from its own thread through make_phone_ready
+(start, wait via the readiness watcher, fetch ADB info), like the worker processes do.
+
+Run from the repository root:
+    python -m benchmarks.time_to_ready [--sizes 1 10 100] [--boot-seconds 5] [--boot-distribution lognormal]
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import geelark_api
+import readiness
+from cache import TTLCache
+from geelark_stub import GeelarkStubServer
+
+def timed_make_phone_ready(phone_id: str) -> float | None:
+    """Returns the seconds it took to get the phone's ADB information, or None if it failed."""
+    from connection import make_phone_ready
+
+    started = time.perf_counter()
+    connection_info = make_phone_ready(phone_id)
+    return time.perf_counter() - started if connection_info else None
+
+def run_fleet(size: int, args) -> dict:
+    stub = GeelarkStubServer(
+        size,
+        boot_seconds=args.boot_seconds,
+        latency=args.latency,
+        boot_distribution=args.boot_distribution,
+        app_id=geelark_api.app_id,
+        api_key=geelark_api.api_key,
+        failure_rate=args.failure_rate,
+        rate_limit=args.rate_limit,
+        seed=args.seed,
+    )
+    with stub:
+        geelark_api.configure_client(base_url=stub.url, pool_maxsize=max(32, size))
+        geelark_api.phone_cache = TTLCache(None, geelark_api.CACHE_TTLS)  # never mix stub data into the real cache
+        readiness.get_watcher().stop()
+        readiness._watcher = None  # every fleet size starts without learned boot times
+
+        phone_ids = list(stub.phones)
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=size) as executor:
+            times = list(executor.map(timed_make_phone_ready, phone_ids))
+        wall = time.perf_counter() - started
+
+        ready = sorted(t for t in times if t is not None)
+        return {
+            "size": size,
+            "ready": len(ready),
+            "p50": statistics.median(ready) if ready else None,
+            "p95": ready[min(len(ready) - 1, int(0.95 * len(ready)))] if ready else None,
+            "max": ready[-1] if ready else None,
+            "wall": wall,
+            "requests": sum(stub.request_counts.values()),
+            "events": dict(stub.event_counts),
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--boot-seconds", type=float, default=5.0)
+    parser.add_argument("--boot-distribution", choices=["fixed", "uniform", "normal", "lognormal"], default="lognormal")
+    parser.add_argument("--latency", type=float, default=0.1, help="Simulated per-request latency in seconds.")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with HTTP 500.")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Server-side requests per second (429 above it).")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    # Keep the shared limiter, circuit breakers, stop queue and API stats of real runs out of the measurement
+    state_dir = tempfile.mkdtemp(prefix="geelark_bench_")
+    os.environ.setdefault("geelark_rate_limit", "100000")
+    os.environ.setdefault("geelark_rate_burst", "100000")
+    os.environ.setdefault("geelark_ratelimit_path", os.path.join(state_dir, "ratelimit.json"))
+    os.environ.setdefault("geelark_circuit_path", os.path.join(state_dir, "circuit.json"))
+    os.environ.setdefault("geelark_stop_queue_path", os.path.join(state_dir, "stop_queue.json"))
+    os.environ.setdefault("geelark_stats_dir", os.path.join(state_dir, "stats"))
+    geelark_api.app_id = geelark_api.app_id or "stub-app-id"
+    geelark_api.api_key = geelark_api.api_key or "stub-api-key"
+
+    print(f"boot {args.boot_distribution} ~{args.boot_seconds:g}s, {args.latency * 1000:.0f} ms per request, "
+          f"failure rate {args.failure_rate:g}, rate limit {args.rate_limit or 'none'}\n")
+    print(f"{'phones':>7}{'ready':>7}{'p50':>9}{'p95':>9}{'max':>9}{'wall':>9}{'requests':>10}  stub events")
+    for size in args.sizes:
+        result = run_fleet(size, args)
+        fmt = lambda value: f"{value:>8.2f}s" if value is not None else f"{'-':>9}"
+        print(f"{result['size']:>7}{result['ready']:>7}{fmt(result['p50'])}{fmt(result['p95'])}{fmt(result['max'])}"
+              f"{fmt(result['wall'])}{result['requests']:>10}  {result['events'] or ''}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import time
+from ratelimit import FileLock
+
+class TTLCache:
+    """
+    Small namespaced TTL cache kept in memory and mirrored to a JSON file.
+
+    Each namespace (e.g. "inventory", "adb") has its own time-to-live. The file
+    lets entries survive between CLI runs and be shared with worker processes;
+    it is re-read whenever another process has rewritten it. Updates re-read,
+    change and rewrite it under a FileLock, so concurrent writers in other
+    processes do not drop each other's changes.
+
+    Args:
+        path (str): JSON file the cache is persisted to. None keeps it in memory only.
+        ttls (dict[str, float]): Time-to-live in seconds per namespace.
+        default_ttl (float): TTL for namespaces missing from `ttls`.
+    """
+
+    def __init__(self, path: str | None, ttls: dict[str, float], default_ttl: float = 60):
+        self.path = path
+        self.ttls = dict(ttls)
+        self.default_ttl = default_ttl
+        self.hits = {}
+        self.misses = {}
+        self._entries = {}
+        self._loaded_mtime = None
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(path + ".lock") if path else None
+        self._reload_if_changed()
+
+    # --- Persistence ---
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _reload_if_changed(self, force: bool = False):
+        if not self.path:
+            return
+        mtime = self._file_mtime()
+        if mtime is None:
+            if force:
+                self._entries = {}
+            return
+        if mtime == self._loaded_mtime and not force:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self._entries = {}
+        self._loaded_mtime = mtime
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+            self._loaded_mtime = self._file_mtime()
+        except OSError as e:
+            print(f"Could not write cache file {self.path}: {e}")
+
+    def _update(self, change):
+        """Applies `change(entries)` to the latest file contents and writes them back, all under the file lock."""
+        with self._lock:
+            if self._file_lock is None:
+                change(self._entries)
+                return
+            with self._file_lock:
+                self._reload_if_changed(force=True)
+                if change(self._entries) is not False:
+                    self._save()
+
+    # --- Lookups ---
+
+    def ttl_for(self, namespace: str) -> float:
+        return self.ttls.get(namespace, self.default_ttl)
+
+    def _lookup(self, namespace: str, key: str):
+        entry = self._entries.get(namespace, {}).get(key)
+        if entry is None or time.time() - entry["stored_at"] > self.ttl_for(namespace):
+            return None
+        return entry
+
+    def get(self, namespace: str, key: str, default=None):
+        """Returns the cached value, or `default` if it is missing or expired."""
+        values = self.get_many(namespace, [key])
+        return values.get(key, default)
+
+    def get_many(self, namespace: str, keys: list[str]) -> dict:
+        """
+        Looks up several keys at once.
+
+        Returns:
+            dict: The fresh entries that were found, keyed by key. Missing keys are left out.
+        """
+        with self._lock:
+            self._reload_if_changed()
+            found = {}
+            for key in keys:
+                entry = self._lookup(namespace, key)
+                if entry is not None:
+                    found[key] = entry["value"]
+            self.hits[namespace] = self.hits.get(namespace, 0) + len(found)
+            self.misses[namespace] = self.misses.get(namespace, 0) + len(keys) - len(found)
+            return found
+
+    # --- Updates ---
+
+    def set(self, namespace: str, key: str, value):
+        self.set_many(namespace, {key: value})
+
+    def set_many(self, namespace: str, values: dict):
+        """Stores several entries at once and writes the file a single time."""
+        if not values:
+            return
+        def change(entries):
+            now = time.time()
+            bucket = entries.setdefault(namespace, {})
+            for key, value in values.items():
+                bucket[key] = {"value": value, "stored_at": now}
+        self._update(change)
+
+    def invalidate(self, namespace: str, keys: list[str] = None):
+        """Drops the given keys from a namespace, or the whole namespace if `keys` is None."""
+        def change(entries):
+            if namespace not in entries:
+                return False
+            if keys is None:
+                del entries[namespace]
+            else:
+                bucket = entries[namespace]
+                for key in keys:
+                    bucket.pop(key, None)
+        self._update(change)
+
+    def clear(self):
+        self._update(lambda entries: entries.clear())
+
+    def stats(self) -> dict:
+        """
+        Returns hit/miss counters per namespace.
+
+        Returns:
+            dict: {namespace: {"hits": int, "misses": int}}
+        """
+        namespaces = set(self.hits) | set(self.misses)
+        return {
+            namespace: {"hits": self.hits.get(namespace, 0), "misses": self.misses.get(namespace, 0)}
+            for namespace in sorted(namespaces)
+        }
@@ -2,6 +2,7 @@
 
 import time
 import random
+from typing import Callable
 from appium.webdriver.common.appiumby import AppiumBy
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
@@ -9,6 +10,8 @@ from selenium.common.exceptions import TimeoutException, StaleElementReferenceEx
 from rich import print as rprint
 from rich.console import Console
 from helper import open_page
+from helper import get_screen_dimensions as helper_get_screen_dimensions
+from locators import locator
 import logging
 log = rprint
 # Initialize rich console for better formatting
@@ -16,32 +19,32 @@ console = Console()
 
 # --- Locators ---
 # Chats List Screen
-YOUR_MATCHES_TITLE_LOCATOR = (AppiumBy.ID, "com.bumble.app:id/connections_expiringConnectionsTitle")
-YOUR_MATCHES_RV_LOCATOR = (AppiumBy.ID, "com.bumble.app:id/connections_connectionsListExpiring")
-MATCH_ITEM_BUTTON_XPATH = ".//android.widget.Button[@resource-id='com.bumble.app:id/connectionItem_ringView']"
-MAIN_CHAT_LIST_RV_LOCATOR = (AppiumBy.ID, "com.bumble.app:id/connections_connectionsList")
+YOUR_MATCHES_TITLE_LOCATOR = locator("matches_title")
+YOUR_MATCHES_RV_LOCATOR = locator("matches_list")
+MATCH_ITEM_BUTTON_LOCATOR = locator("match_item_button")
+MAIN_CHAT_LIST_RV_LOCATOR = locator("chat_list")
 
 # "Opening Move" Screen
-OPENING_MOVE_CONTAINER_LOCATOR = (AppiumBy.ID, "com.bumble.app:id/initialChatV3_container")
-OPENING_MOVE_TITLE_TEXT_LOCATOR = (AppiumBy.XPATH, "//android.widget.TextView[contains(@text, 'Opening Move')]")
-OPENING_MOVE_REPLY_BUTTON_LOCATOR = (AppiumBy.XPATH, "//android.view.View[@clickable='true' and .//android.widget.TextView[@text='Reply']]")
+OPENING_MOVE_CONTAINER_LOCATOR = locator("opening_move_container")
+OPENING_MOVE_TITLE_TEXT_LOCATOR = locator("opening_move_title")
+OPENING_MOVE_REPLY_BUTTON_LOCATOR = locator("opening_move_reply")
 
 
 # Individual Chat Screen (Regular chat with input field) - UPDATED
-CHAT_MESSAGE_INPUT_LOCATOR = (AppiumBy.ID, "com.bumble.app:id/chatInput_text") # Updated from XML
+CHAT_MESSAGE_INPUT_LOCATOR = locator("chat_input") # Updated from XML
 # The Send button often appears dynamically. We'll use a content-desc for now.
 # It might replace the voice message icon (com.bumble.app:id/recording_IconComponent)
-CHAT_SEND_BUTTON_LOCATOR = (AppiumBy.ID, "com.bumble.app:id/chatInput_button_send") # NEW - More reliable
+CHAT_SEND_BUTTON_LOCATOR = locator("chat_send") # NEW - More reliable
 # Alternative if the above is too generic or if it has a specific ID when it appears:
 # CHAT_SEND_BUTTON_LOCATOR_BY_ID_IF_AVAILABLE = (AppiumBy.ID, "com.bumble.app:id/id_of_the_send_button_when_visible")
 
-CHAT_TOOLBAR_NAME_LOCATOR = (AppiumBy.ID, "com.bumble.app:id/chatToolbar_title")
-CHAT_HEADER_BACK_BUTTON_LOCATOR = (AppiumBy.XPATH, "//android.widget.ImageButton[@content-desc='Back']") # Toolbar back button
+CHAT_TOOLBAR_NAME_LOCATOR = locator("chat_toolbar_name")
+CHAT_HEADER_BACK_BUTTON_LOCATOR = locator("chat_back") # Toolbar back button
 
-SPOTLIGHT_PROMO_TEXT_LOCATOR = (AppiumBy.XPATH, "//*[contains(@text, 'Spotlight is the easiest way')]")
-OPENING_MOVES_SETUP_PROMO_TEXT_LOCATOR = (AppiumBy.XPATH, "//*[contains(@text, 'Get to good conversation, faster')]")
+SPOTLIGHT_PROMO_TEXT_LOCATOR = locator("spotlight_promo")
+OPENING_MOVES_SETUP_PROMO_TEXT_LOCATOR = locator("opening_moves_promo")
 
-CHAT_24_HOURS_BANNER_TEXT_LOCATOR = (AppiumBy.XPATH, "//android.widget.TextView[contains(@text, 'hours to reply')]")
+CHAT_24_HOURS_BANNER_TEXT_LOCATOR = locator("chat_24_hours_banner")
 
 BEELINE_CARD_INNER_BUTTON_ID = "com.bumble.app:id/connectionItemBeeline_cards"
 # --- Helper Functions ---
@@ -298,18 +301,12 @@ def navigate_back_to_chats_list(driver, initial_back_presses=2, extra_back_press
             return False
 
 def get_screen_dimensions(driver):
-    """Gets the current screen width and height."""
-    try:
-        window_size = driver.get_window_size()
-        width = window_size.get('width')
-        height = window_size.get('height')
-        if width is None or height is None:
-            log("[yellow]⚠[/yellow] Could not get window dimensions, using defaults.")
-            return 1080, 1920 # Example defaults
-        return int(width), int(height)
-    except Exception as e:
-        log(f"[red]✗[/red] Error getting screen dimensions: {e}")
-        return 1080, 1920 # Fallback
+    """Gets the current screen width and height from the shared geometry cache (defaults if unknown)."""
+    width, height = helper_get_screen_dimensions(driver)
+    if width is None or height is None:
+        log("[yellow]⚠[/yellow] Could not get window dimensions, using defaults.")
+        return 1080, 1920 # Example defaults
+    return width, height
 
 def perform_horizontal_scroll_on_matches_list(driver, matches_rv_element, preferred_direction="left"):
     """
@@ -400,10 +397,12 @@ def perform_horizontal_scroll_on_matches_list(driver, matches_rv_element, prefer
 def process_new_matches(driver, 
                         max_total_matches_to_process_this_run=None, 
                         max_consecutive_empty_scrolls=3,
-                        logger_func: logging.Logger = rprint):
+                        logger_func: logging.Logger = rprint,
+                        device_guard: Callable[[], bool] = None):
     """
     Scrolls the "Your matches" list. If Beeline card is visible, scrolls left.
     Otherwise, scrolls randomly. Picks one new, non-expired match and processes it.
+    `device_guard` is checked before every iteration; returning False (device detached) stops.
     """
     global log
     log = logger_func
@@ -423,6 +422,8 @@ def process_new_matches(driver,
     
     for iteration_num in range(max_overall_iterations):
         log(f"\n[cyan]--- Processing Iteration #{iteration_num + 1} ---[/cyan]")
+        if device_guard is not None and not device_guard():
+            break
         
         if max_total_matches_to_process_this_run is not None and \
            grand_total_processed_this_run >= max_total_matches_to_process_this_run:
@@ -444,7 +445,7 @@ def process_new_matches(driver,
 
             # Get the top-level clickable items in the carousel
             # Note: From your XML, both user matches (Button) and the Beeline card (FrameLayout) are direct children of the RecyclerView
-            all_items_in_rv_view = matches_rv_element.find_elements(AppiumBy.XPATH, MATCH_ITEM_BUTTON_XPATH)
+            all_items_in_rv_view = matches_rv_element.find_elements(*MATCH_ITEM_BUTTON_LOCATOR)
             
             # --- Filter for processable matches ---
             new_active_processable_matches = []
@@ -0,0 +1,244 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from ratelimit import FileLock
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker shared by every process on the host.
+
+    closed:    requests flow normally; consecutive failures are counted.
+    open:      after `failure_threshold` consecutive failures, requests fail fast
+               for `reset_timeout` seconds without touching the network.
+    half_open: once the timeout has passed, a single probe request is let through;
+               its success closes the circuit, its failure re-opens it.
+
+    State lives in a JSON file guarded by a FileLock (like SharedRateLimiter), so
+    once one worker process has seen the API go down the others fail fast too.
+
+    Args:
+        state_path (str): JSON file holding the state of every endpoint's breaker.
+        endpoint (str): Endpoint path this breaker guards, e.g. "/phone/stop".
+        failure_threshold (int): Consecutive failures that open the circuit.
+        reset_timeout (float): Seconds the circuit stays open before a probe is allowed.
+    """
+
+    def __init__(self, state_path: str, endpoint: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.state_path = state_path
+        self.endpoint = endpoint
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = FileLock(state_path + ".lock")
+
+    def _load_all(self) -> dict:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_all(self, states: dict):
+        tmp_path = f"{self.state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(states, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _state(self, states: dict) -> dict:
+        state = states.setdefault(self.endpoint, {})
+        state.setdefault("state", CLOSED)
+        state.setdefault("failures", 0)
+        state.setdefault("opened_at", 0.0)
+        state.setdefault("probe_started", 0.0)
+        state.setdefault("transitions", {})
+        state.setdefault("fail_fast", 0)
+        return state
+
+    def _transition(self, state: dict, new_state: str):
+        old_state = state["state"]
+        if old_state == new_state:
+            return
+        state["state"] = new_state
+        key = f"{old_state}->{new_state}"
+        state["transitions"][key] = state["transitions"].get(key, 0) + 1
+        print(f"Circuit breaker for {self.endpoint}: {old_state} -> {new_state}")
+
+    def allow(self) -> bool:
+        """
+        Whether a request to this endpoint may be sent now.
+
+        Returns:
+            bool: False while the circuit is open (the caller should fail fast).
+        """
+        with self._lock:
+            states = self._load_all()
+            state = self._state(states)
+            now = time.time()
+            if state["state"] == CLOSED:
+                return True
+            if state["state"] == OPEN and now - state["opened_at"] >= self.reset_timeout:
+                self._transition(state, HALF_OPEN)
+                state["probe_started"] = now
+                self._save_all(states)
+                return True
+            # A half-open probe that never reported back (e.g. its process was killed)
+            # is given up on after reset_timeout, and another probe is let through
+            if state["state"] == HALF_OPEN and now - state["probe_started"] >= self.reset_timeout:
+                state["probe_started"] = now
+                self._save_all(states)
+                return True
+            state["fail_fast"] += 1
+            self._save_all(states)
+            return False
+
+    def record_success(self) -> bool:
+        """
+        Report a successful request.
+
+        Returns:
+            bool: True if this success closed a previously open circuit.
+        """
+        with self._lock:
+            states = self._load_all()
+            state = self._state(states)
+            recovered = state["state"] != CLOSED
+            if not recovered and state["failures"] == 0:
+                return False
+            state["failures"] = 0
+            self._transition(state, CLOSED)
+            self._save_all(states)
+            return recovered
+
+    def record_failure(self):
+        """Report a request that failed because the API was unreachable or unhealthy."""
+        with self._lock:
+            states = self._load_all()
+            state = self._state(states)
+            state["failures"] += 1
+            if state["state"] == HALF_OPEN or state["failures"] >= self.failure_threshold:
+                state["opened_at"] = time.time()
+                self._transition(state, OPEN)
+            self._save_all(states)
+
+    def status(self) -> dict:
+        """
+        Returns this endpoint's breaker state.
+
+        Returns:
+            dict: {"state", "failures", "opened_at", "probe_started", "transitions", "fail_fast"}
+        """
+        with self._lock:
+            return self._state(self._load_all())
+
+    def reset(self):
+        """Close the circuit and zero its counters."""
+        with self._lock:
+            states = self._load_all()
+            states.pop(self.endpoint, None)
+            self._save_all(states)
+
+class StopQueue:
+    """
+    Durable queue of phone IDs whose stop request could not be delivered.
+
+    IDs are kept in a JSON file so they survive the process (and the CLI run)
+    that failed to stop them, and are sent again once the API recovers. Senders
+    read the queue with pending() and remove() only the IDs the API answered, so
+    a crash or exit mid-send leaves the rest queued.
+
+    Args:
+        path (str): JSON file holding the queued IDs.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = FileLock(path + ".lock")
+
+    def _load(self) -> list[str]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return []
+
+    def _save(self, ids: list[str]):
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(ids, f)
+        os.replace(tmp_path, self.path)
+
+    def add(self, ids: list[str]):
+        """Queue IDs for a later stop; IDs already queued are not duplicated."""
+        if not ids:
+            return
+        with self._lock:
+            queued = self._load()
+            self._save(list(dict.fromkeys(queued + list(ids))))
+
+    def remove(self, ids: list[str]):
+        """Drop IDs whose stop has been delivered; IDs queued meanwhile by others are kept."""
+        if not ids:
+            return
+        done = set(ids)
+        with self._lock:
+            queued = self._load()
+            remaining = [phone_id for phone_id in queued if phone_id not in done]
+            if len(remaining) != len(queued):
+                self._save(remaining)
+
+    def pending(self) -> list[str]:
+        """Returns the queued IDs without removing them."""
+        with self._lock:
+            return self._load()
+
+_breakers: dict[str, CircuitBreaker] = {}
+_stop_queue: StopQueue | None = None
+
+def _circuit_path() -> str:
+    return os.getenv(
+        "geelark_circuit_path",
+        os.path.join(tempfile.gettempdir(), "geelark_circuit.json"),
+    )
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    """
+    Returns this process's handle on the host-wide breaker for one endpoint.
+    The threshold and open period can be tuned with the geelark_breaker_threshold
+    and geelark_breaker_reset environment variables.
+    """
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            _circuit_path(),
+            endpoint,
+            failure_threshold=int(os.getenv("geelark_breaker_threshold", "5")),
+            reset_timeout=float(os.getenv("geelark_breaker_reset", "30")),
+        )
+        _breakers[endpoint] = breaker
+    return breaker
+
+def breaker_statuses() -> dict[str, dict]:
+    """Returns the state of every endpoint breaker recorded on this host, keyed by endpoint."""
+    state_path = _circuit_path()
+    with FileLock(state_path + ".lock"):
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+def get_stop_queue() -> StopQueue:
+    """Returns the durable stop queue (path configurable with geelark_stop_queue_path)."""
+    global _stop_queue
+    if _stop_queue is None:
+        path = os.getenv(
+            "geelark_stop_queue_path",
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), ".geelark_stop_queue.json"),
+        )
+        _stop_queue = StopQueue(path)
+    return _stop_queue
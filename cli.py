@@ -2,26 +2,36 @@ import os
 import signal
 import sys
 import time
-import subprocess
-import re
 import threading
 import multiprocessing
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterable, Iterator
 from rich.console import Console
 from rich.table import Table
 from rich.prompt import Prompt, Confirm
 from rich import print as rprint
 from rich.text import Text
+from rich.live import Live
 from typing import Callable 
-from geelark_api import get_available_phones, stop_phone, start_phone
+from geelark_api import iter_available_phones, stop_phone, start_phone, phone_cache, flush_stop_queue, stop_phones_confirmed
+from circuit import breaker_statuses, get_stop_queue
+from apistats import get_api_stats, LATENCY_BUCKETS
+from models import PhoneRecord
 from connection import connect_to_phone
+from adbclient import AdbError, get_adb_client
+from adbregistry import get_connection_registry
+from pipeline import BringUpPipeline, ConnectionHandoff
+from prewarm import PrewarmScheduler
+from spans import SpanRecorder, span, new_run_id, read_records, aggregate
+from hotplug import DeviceTracker, DeviceWatch
+from geometry import get_geometry_cache
+from ratelimit import get_rate_limiter
 from appium import webdriver
 from appium.options.android import UiAutomator2Options
 from helper import open_page
+from locators import locator
 from swipe import realistic_swipe
 from chat import process_new_matches
-from adb import get_local_devices
-from appium.webdriver.common.appiumby import AppiumBy
+from adb import get_local_devices, get_device_props
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, StaleElementReferenceException, NoSuchElementException
@@ -40,12 +50,11 @@ def open_phones_manually():
     """
     console.print("\n[bold green]Manual Phone Session Manager[/bold green]")
     
-    remote_phones = get_available_phones(adb_enabled=False)
+    # Rows are rendered page by page while the phone list is still loading
+    remote_phones = display_phones(iter_available_phones(adb_enabled=False))
     if not remote_phones:
         rprint("[red]No remote phones available.[/red]")
         return
-
-    display_phones(remote_phones)
     
     # <<< FIX 1: The prompt text is now shorter and mentions 'all' >>>
     selection_str = Prompt.ask(
@@ -63,7 +72,7 @@ def open_phones_manually():
     # <<< FIX 2: Added logic to handle the 'all' keyword >>>
     if selection_str.strip().lower() == 'all':
         rprint("[cyan]Selecting all available phones...[/cyan]")
-        ids_to_start = [phone['id'] for phone in remote_phones]
+        ids_to_start = [phone.id for phone in remote_phones]
         # Map all phones by their original index number (as a string)
         selected_phone_map = {str(i + 1): phone for i, phone in enumerate(remote_phones)}
     else:
@@ -76,7 +85,7 @@ def open_phones_manually():
             
             choice_idx = int(choice) - 1
             phone_data = remote_phones[choice_idx]
-            ids_to_start.append(phone_data['id'])
+            ids_to_start.append(phone_data.id)
             selected_phone_map[choice] = phone_data
 
     if not ids_to_start:
@@ -87,7 +96,7 @@ def open_phones_manually():
     active_phone_ids = []
     try:
         rprint(f"\n[cyan]Attempting to start {len(ids_to_start)} phone(s)...[/cyan]")
-        response = start_phone(ids_to_start)
+        response = start_phone(ids_to_start, headless=False)
         
         # Check the API response to see which phones ACTUALLY started
         if response and response.get("code") == 0:
@@ -111,8 +120,8 @@ def open_phones_manually():
             
             # Find the original menu number for each active phone
             for original_number, phone_data in selected_phone_map.items():
-                if phone_data['id'] in active_phone_ids:
-                    active_phones_table.add_row(original_number, phone_data['name'], phone_data['id'])
+                if phone_data.id in active_phone_ids:
+                    active_phones_table.add_row(original_number, phone_data.name, phone_data.id)
             
             console.print(active_phones_table)
 
@@ -126,16 +135,17 @@ def open_phones_manually():
             else:
                 for choice in shutdown_choice_str.strip().split():
                     # Check if the chosen number corresponds to a currently active phone
-                    if choice in selected_phone_map and selected_phone_map[choice]['id'] in active_phone_ids:
-                        ids_to_stop.append(selected_phone_map[choice]['id'])
+                    if choice in selected_phone_map and selected_phone_map[choice].id in active_phone_ids:
+                        ids_to_stop.append(selected_phone_map[choice].id)
                     else:
                         rprint(f"[yellow]Warning: '{choice}' is not a valid active phone number. Skipping.[/yellow]")
 
             if ids_to_stop:
                 rprint(f"\n[cyan]Sending stop command for {len(ids_to_stop)} phone(s)...[/cyan]")
-                stop_phone(ids_to_stop)
-                # Remove the stopped phones from our active list
-                active_phone_ids = [pid for pid in active_phone_ids if pid not in ids_to_stop]
+                names = {phone.id: phone.name for phone in selected_phone_map.values()}
+                results = stop_and_reconcile(ids_to_stop, names)
+                # Remove the phones that are no longer running from our active list
+                active_phone_ids = [pid for pid in active_phone_ids if results.get(pid, {}).get("state", "running") == "running"]
 
         rprint("\n[bold green]All manually opened phones have been shut down.[/bold green]")
 
@@ -144,8 +154,8 @@ def open_phones_manually():
         if active_phone_ids:
             rprint("\n[bold yellow]Exiting session. Ensuring all remaining active phones are stopped...[/bold yellow]")
             try:
-                stop_phone(active_phone_ids)
-                rprint("[green]Cleanup complete. All phones stopped.[/green]")
+                names = {phone.id: phone.name for phone in selected_phone_map.values()}
+                stop_and_reconcile(active_phone_ids, names)
             except Exception as e:
                 rprint(f"[bold red]CRITICAL: Cleanup failed. Could not stop phones {active_phone_ids}. Please check your provider's dashboard manually! Error: {e}[/bold red]")
 
@@ -167,15 +177,22 @@ def create_device_logger(device_name: str):
 
     return device_specific_log
 
-def run_automation_for_device(device: Dict, automation_type: str, appium_port: int, system_port: int, duration: int, probability: int,messaging_probability=4):
+def run_automation_for_device(device: PhoneRecord, automation_type: str, appium_port: int, system_port: int, duration: int, probability: int,messaging_probability=4, handoff: ConnectionHandoff = None, run_id: str = None, device_watch: DeviceWatch = None):
     """
     This function contains all logic to automate a SINGLE phone.
     It's designed to be run in its own process.
+    For remote phones brought up by the orchestrator's pipeline, `handoff` delivers the connection info.
+    Every phase is timed and written as one record (see spans.py) tagged with `run_id`.
+    `device_watch` (fed by the orchestrator's DeviceTracker) lets the automation pause while the
+    device is detached and stop if it does not come back, instead of running into command timeouts.
     """
-    device_name = device.get('name', 'UnknownDevice')
+    device_name = device.name
     
     # === NEW: Create the logger for this specific device ===
     log = create_device_logger(device_name)
+    spans = SpanRecorder(device.id, device_name, run_id)
+    pause_timeout = float(os.getenv("geelark_detach_pause", "60"))
+    guard = device_watch.guard(pause_timeout, log) if device_watch is not None else (lambda: True)
     
     appium_service = None
     driver = None
@@ -184,24 +201,33 @@ def run_automation_for_device(device: Dict, automation_type: str, appium_port: i
         log("Automation process started.")
         
         # 1. Connect to the physical device
-        if device["type"] == "local":
-            connection_info = { "ip": device["id"].split(":")[0], "port": device["id"].split(":")[1] }
+        if device.type == "local":
+            connection_info = { "ip": device.id.split(":")[0], "port": device.id.split(":")[1] }
+        elif handoff is not None: # remote, connected by the orchestrator
+            log("Waiting for the bring-up pipeline to connect the phone...")
+            with spans.span("bring_up_wait"):
+                connection_info = handoff.wait(timeout=600)
+            for phase, seconds in connection_info.pop("bring_up_phases", {}).items():
+                spans.add(phase, seconds)
         else: # remote
-            connection_info = connect_to_phone(device['id'])
+            connection_info = connect_to_phone(device.id, spans=spans)
 
         if not connection_info:
             log("[red]Failed to get connection info. Terminating.[/red]")
+            spans.outcome = "no_connection"
             return
 
         # 2. Start a unique Appium Service for this device
         # Pass the logger to any functions that need it
-        appium_service = start_appium_service_instance('127.0.0.1', appium_port, system_port, log)
+        with spans.span("appium_service"):
+            appium_service = start_appium_service_instance('127.0.0.1', appium_port, system_port, log)
         server_url = f"http://127.0.0.1:{appium_port}/wd/hub"
 
         # 3. Setup the Appium Driver
-        driver = setup_appium_driver(connection_info, server_url, system_port)
+        driver = setup_appium_driver(connection_info, server_url, system_port, spans=spans)
         if not driver:
             log("[red]Failed to initialize driver. Terminating.[/red]")
+            spans.outcome = "no_driver"
             return
 
         log("[green]Setup complete. Starting automation logic.[/green]")
@@ -209,27 +235,34 @@ def run_automation_for_device(device: Dict, automation_type: str, appium_port: i
         # 4. Execute the automation logic, passing the logger
         if automation_type == "swiping":
             # Pass the log function to your helper functions
-            if open_page(driver, "People", logger_func=log): 
-                realistic_swipe(driver, right_swipe_probability=probability, duration_minutes=duration, logger_func=log,messaging_probability=messaging_probability)
+            if guard() and timed_open_page(driver, "People", log, spans): 
+                realistic_swipe(driver, right_swipe_probability=probability, duration_minutes=duration, logger_func=log,messaging_probability=messaging_probability, device_guard=guard)
         elif automation_type == "handle_matches":
-            if open_page(driver, "Chats", logger_func=log): 
-                process_new_matches(driver, 10, 5, logger_func=log)
+            if guard() and timed_open_page(driver, "Chats", log, spans): 
+                process_new_matches(driver, 10, 5, logger_func=log, device_guard=guard)
         elif automation_type == "auto":
              for i in range(2):
-                if open_page(driver, "People", logger_func=log): 
-                    realistic_swipe(driver, right_swipe_probability=7, duration_minutes=5, logger_func=log)
-                if open_page(driver, "Chats", logger_func=log): 
-                    process_new_matches(driver,10, 5, logger_func=log)
-
-        log("[green]Automation task finished.[/green]")
+                if guard() and timed_open_page(driver, "People", log, spans): 
+                    realistic_swipe(driver, right_swipe_probability=7, duration_minutes=5, logger_func=log, device_guard=guard)
+                if guard() and timed_open_page(driver, "Chats", log, spans): 
+                    process_new_matches(driver,10, 5, logger_func=log, device_guard=guard)
+
+        if device_watch is not None and not device_watch.is_present():
+            log("[red]Automation stopped early: the device is detached.[/red]")
+            spans.outcome = "detached"
+        else:
+            log("[green]Automation task finished.[/green]")
+            spans.outcome = "finished"
     except Exception as e:
         log(f"[red]An unexpected error occurred: {e}[/red]")
+        spans.outcome = "error"
         import traceback
         log(traceback.format_exc())
     finally:
         # 5. Cleanup (this is critical!)
         log("Starting cleanup...")
         if driver:
+            get_geometry_cache().invalidate(driver)
             try:
                 # driver.quit()
                 log("Appium driver quit successfully.")
@@ -241,10 +274,19 @@ def run_automation_for_device(device: Dict, automation_type: str, appium_port: i
                 log("Appium service stopped successfully.")
             except Exception as e:
                 log(f"[red]Error stopping Appium service: {e}[/red]")
-        if device["type"] != "local":
-            stop_phone([device['id']])
+        if device.type != "local":
+            stop_phone([device.id])
             log("Remote phone stop signal sent.")
+        spans.write()
         log("Cleanup finished.")
+def timed_open_page(driver, page_name: str, log: Callable, spans: SpanRecorder = None) -> bool:
+    """open_page timed as the "open_page" phase; the first success marks the device's first action."""
+    with span(spans, "open_page"):
+        opened = open_page(driver, page_name, logger_func=log)
+    if opened and spans is not None:
+        spans.mark("first_action")
+    return opened
+
 def start_appium_service_instance(host: str, port: int, system_port: int, log: Callable) -> AppiumService:
     """Starts a unique Appium server instance on a specific port."""
     service = AppiumService()
@@ -287,16 +329,12 @@ def handle_update_popup(driver, timeout=3) -> bool:
     try:
         # Quick check for the header text
         WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located(
-                (AppiumBy.ID, "com.bumble.app:id/ctaBox_header")
-            )
+            EC.presence_of_element_located(locator("update_prompt_header"))
         )
 
         # Now find the 'Maybe later' button and click it
         maybe_later_btn = WebDriverWait(driver, timeout).until(
-            EC.element_to_be_clickable(
-                (AppiumBy.ID, "com.bumble.app:id/button_later")
-            )
+            EC.element_to_be_clickable(locator("update_prompt_later"))
         )
 
         delay = random.uniform(0.2, 0.4)
@@ -322,44 +360,45 @@ def get_device_info(connection_address: str) -> Tuple[str, str]:
         Tuple[str, str]: (platform_version, device_name)
     """
     try:
-        # Get device properties
-        cmd = ["adb", "-s", connection_address, "shell", "getprop"]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        
-        # Extract platform version
-        version_match = re.search(r'\[ro\.build\.version\.release\]:\s*\[(.*?)\]', result.stdout)
-        platform_version = version_match.group(1) if version_match else "12"  # Default to 12 if not found
+        # Served from the getprop dump cached by local discovery (fetched now if missing)
+        props = get_device_props([connection_address]).get(connection_address, {})
+        platform_version = props.get("ro.build.version.release") or "12"  # Default to 12 if not found
         
         return platform_version, connection_address
         
-    except subprocess.CalledProcessError as e:
-        rprint(f"[red]Failed to get device info: {e.stderr if isinstance(e.stderr, str) else e.stderr.decode()}[/red]")
+    except AdbError as e:
+        rprint(f"[red]Failed to get device info: {e}[/red]")
         return "12", connection_address  # Default values if command fails
     except Exception as e:
         rprint(f"[red]Error getting device info: {str(e)}[/red]")
         return "12", connection_address  # Default values if command fails
 
 def manage_adb_server(action: str = "kill") -> bool:
-    """Manage the ADB server."""
+    """
+    Manage the ADB server.
+    "start" makes sure it is running and syncs the connection registry with the devices
+    it already has attached (kept across menu actions, so they need no new connect/login);
+    "kill" stops it and forgets every transport.
+    """
     try:
         if action == "kill":
             rprint("[yellow]Killing ADB server...[/yellow]")
-            subprocess.run(["adb", "kill-server"], check=True, capture_output=True, text=True)
+            get_adb_client().kill_server()
+            get_connection_registry().clear()
             rprint("[green]ADB server killed successfully[/green]")
         elif action == "start":
-            rprint("[yellow]Starting ADB server...[/yellow]")
-            subprocess.run(["adb", "start-server"], check=True, capture_output=True, text=True)
-            rprint("[green]ADB server started successfully[/green]")
+            attached = get_connection_registry().refresh()
+            rprint(f"[green]ADB server ready ({len(attached)} device(s) attached)[/green]")
         return True
-    except subprocess.CalledProcessError as e:
-        rprint(f"[red]Failed to {action} ADB server: {e.stderr}[/red]")
-        return False
     except Exception as e:
         rprint(f"[red]Error managing ADB server: {str(e)}[/red]")
         return False
 
-def setup_appium_driver(connection_info: dict, server_url: str, system_port: int) -> webdriver.Remote:
-    """Set up and return an Appium WebDriver instance for a specific device."""
+def setup_appium_driver(connection_info: dict, server_url: str, system_port: int, spans: SpanRecorder = None) -> webdriver.Remote:
+    """
+    Set up and return an Appium WebDriver instance for a specific device.
+    With `spans`, times the driver_session, driver_settle (fixed sleep) and app_foreground phases.
+    """
     connection_address = f"{connection_info['ip']}:{connection_info['port']}"
     platform_version, device_name = "12", connection_address # Simplified for example
 
@@ -382,23 +421,26 @@ def setup_appium_driver(connection_info: dict, server_url: str, system_port: int
 
     try:
         rprint(f"[{device_name}] Connecting to Appium at {server_url}...")
-        driver = webdriver.Remote(server_url, options=options)
-        time.sleep(5) # Wait for app to stabilize
+        with span(spans, "driver_session"):
+            driver = webdriver.Remote(server_url, options=options)
+        with span(spans, "driver_settle"):
+            time.sleep(5) # Wait for app to stabilize
         rprint(f"[{device_name}] Driver initialized successfully.")
 
         target_package = "com.bumble.app"
         max_retries = 3
-        for attempt in range(max_retries):
-            if driver.current_package == target_package:
-                rprint(f"[{device_name}] [green]Bumble app is in the foreground. Driver is ready.[/green]")
-                # Now is a good time to handle any initial popups
-                handle_update_popup(driver)
-                return driver # Success!
-
-            # If not, log it and attempt to activate the app
-            rprint(f"[{device_name}] [yellow]App not in foreground (current: {driver.current_package}). Activating... (Attempt {attempt + 1}/{max_retries})[/yellow]")
-            driver.activate_app(target_package)
-            time.sleep(5)
+        with span(spans, "app_foreground"):
+            for attempt in range(max_retries):
+                if driver.current_package == target_package:
+                    rprint(f"[{device_name}] [green]Bumble app is in the foreground. Driver is ready.[/green]")
+                    # Now is a good time to handle any initial popups
+                    handle_update_popup(driver)
+                    return driver # Success!
+
+                # If not, log it and attempt to activate the app
+                rprint(f"[{device_name}] [yellow]App not in foreground (current: {driver.current_package}). Activating... (Attempt {attempt + 1}/{max_retries})[/yellow]")
+                driver.activate_app(target_package)
+                time.sleep(5)
 
         # If the loop finishes without success, we have a problem.
         rprint(f"[{device_name}] [red]FATAL: Failed to activate the Bumble app after {max_retries} attempts.[/red]")
@@ -424,8 +466,14 @@ def clear_screen():
     """Clear the terminal screen."""
     os.system('cls' if os.name == 'nt' else 'clear')
 
-def display_phones(phones: List[Dict]):
-    """Display phones in a formatted table."""
+def display_phones(phones: Iterable[PhoneRecord]) -> List[PhoneRecord]:
+    """
+    Display phones in a formatted table.
+    Accepts a list or a stream; rows are rendered as soon as each phone arrives.
+
+    Returns:
+        List[PhoneRecord]: The displayed phones, in row order.
+    """
     table = Table(title="Available Phones")
     table.add_column("No.", style="cyan")
     table.add_column("Name", style="green")
@@ -434,22 +482,24 @@ def display_phones(phones: List[Dict]):
     table.add_column("Model", style="magenta")
     table.add_column("Type", style="cyan")
 
-    for idx, phone in enumerate(phones, 1):
-        status_color = "green" if phone["status"] == "active" else "red"
-        device_type = phone.get("type", "remote")
-        type_color = "blue" if device_type == "local" else "cyan"
-        
-        table.add_row(
-            str(idx),
-            phone["name"],
-            f"[{status_color}]{phone['status']}[/{status_color}]",
-            phone["brand"].title(),
-            phone["model"],
-            f"[{type_color}]{device_type}[/{type_color}]"
-        )
+    displayed = []
+    with Live(table, console=console, refresh_per_second=8):
+        for idx, phone in enumerate(phones, 1):
+            status_color = "green" if phone.status == "active" else "red"
+            device_type = phone.type
+            type_color = "blue" if device_type == "local" else "cyan"
+            
+            table.add_row(
+                str(idx),
+                phone.name,
+                f"[{status_color}]{phone.status}[/{status_color}]",
+                phone.brand.title(),
+                phone.model,
+                f"[{type_color}]{device_type}[/{type_color}]"
+            )
+            displayed.append(phone)
     
-    console.print(table)
-    return phones
+    return displayed
 
 def get_automation_type():
     """Get the type of automation to perform."""
@@ -466,28 +516,25 @@ def get_automation_type():
     }
     return automation_types[choice]
 
-def get_all_available_devices() -> List[Dict]:
-    """Get all available devices (both remote and local)."""
+def iter_all_available_devices() -> Iterator[PhoneRecord]:
+    """Stream all available devices: remote phones page by page, then local devices."""
     # Get remote devices
-    remote_devices = get_available_phones()
-    for device in remote_devices:
-        device["type"] = "remote"
+    yield from iter_available_phones()
     
     # Get local devices
-    local_devices = get_local_devices()
-    
-    # Combine both lists
-    return remote_devices + local_devices
+    yield from get_local_devices()
+
+def get_all_available_devices() -> List[PhoneRecord]:
+    """Get all available devices (both remote and local)."""
+    return list(iter_all_available_devices())
 
 def start_automation_all(duration=None,probability=None,automation_type=None,messaging_probability=4):
     """Manages the parallel execution of automation across selected devices."""
-    # 1. Get all available devices
-    devices = get_all_available_devices()
+    # 1. Get all available devices, rendering them as they arrive
+    devices = display_phones(iter_all_available_devices())
     if not devices:
         rprint("[red]No available devices found![/red]")
         return
-
-    display_phones(devices)
     
     # 2. Prompt for device selection
     selection_str = Prompt.ask(
@@ -515,6 +562,14 @@ def start_automation_all(duration=None,probability=None,automation_type=None,mes
         rprint("[red]No valid devices were selected. Aborting.[/red]")
         return
 
+    # How many devices this host drives at once; the rest wait for a free slot
+    slots = len(selected_devices)
+    if len(selected_devices) > 1:
+        default_slots = os.getenv("geelark_max_workers", str(len(selected_devices)))
+        slots_str = Prompt.ask("How many devices should run at once", default=default_slots)
+        slots = int(slots_str) if slots_str.isdigit() and int(slots_str) > 0 else len(selected_devices)
+        slots = min(slots, len(selected_devices))
+
     # 4. Get automation parameters
     if not automation_type:
         automation_type = get_automation_type()
@@ -528,52 +583,104 @@ def start_automation_all(duration=None,probability=None,automation_type=None,mes
             probability = int(prob_str) if prob_str.isdigit() and 1 <= int(prob_str) <= 10 else 5
 
     # 5. Prepare for multiprocessing
-    manage_adb_server("kill") # Kill any old server
-    manage_adb_server("start") # Start one clean server for all processes
+    manage_adb_server("start") # One server for all processes; phones still attached from earlier runs are reused
 
     processes = []
+    pipeline = None
+    scheduler = None
+    run_id = new_run_id() # Tags the timing record every worker writes
+    # Stream adb attach/detach events so workers can pause or stop when their device drops off
+    tracker = DeviceTracker().start()
+    tracker.add_listener(print_device_event)
+    get_rate_limiter().reset_metrics() # Throttling counters cover this fleet run only
+    get_api_stats().reset()
     try:
         appium_base_port = 4723
         system_base_port = 8200 # Each UiAutomator2 instance needs a unique system port
 
-        # 6. Create and start a process for each selected device
-        rprint("\n[bold blue]Starting automation processes...[/bold blue]")
-        for i, device in enumerate(selected_devices):
-            appium_port = appium_base_port + (i * 2) # e.g., 4723, 4725, 4727
-            system_port = system_base_port + i       # e.g., 8200, 8201, 8202
-
-            process = multiprocessing.Process(
-                target=run_automation_for_device,
-                args=(device, automation_type, appium_port, system_port, duration, probability,messaging_probability)
-            )
-            processes.append(process)
-            process.start()
-            rprint(f"[green]Started process {process.pid} for device '{device['name']}' on Appium port {appium_port}[/green]")
-            time.sleep(5) # Stagger the process starts slightly to avoid resource contention
-
-        # 7. Wait for all processes to complete
-        rprint("\n[bold yellow]All automation processes are running. Waiting for them to complete...[/bold yellow]")
-        for process in processes:
-            process.join() # This will block until the process finishes
+        # Remote phones are brought up through the staged pipeline (start -> ready -> adb info
+        # -> connect -> login); the pre-warm scheduler starts the next ones in the queue ahead
+        # of their turn, and each worker process just waits for its phone's connection info.
+        remote_ids = [device.id for device in selected_devices if device.type == "remote"]
+        if remote_ids:
+            rprint(f"\n[cyan]Bringing up {min(len(remote_ids), slots)} of {len(remote_ids)} remote phone(s)...[/cyan]")
+            pipeline = BringUpPipeline()
+        scheduler = PrewarmScheduler(
+            pipeline,
+            [device.id for device in selected_devices],
+            slots,
+            remote_ids=set(remote_ids),
+            expected_session=duration * 60 if automation_type == "swiping" and duration else None,
+        )
+        scheduler.tick() # Start the first wave in one batch
+
+        # 6. Run a process per device, at most `slots` at a time (each slot owns its Appium/system ports)
+        rprint(f"\n[bold blue]Starting automation processes ({slots} at a time)...[/bold blue]")
+        queue = list(selected_devices)
+        free_slots = list(range(slots))
+        running = {}  # process -> (device, slot)
+        while queue or running:
+            for process, (device, slot) in list(running.items()):
+                if not process.is_alive():
+                    process.join()
+                    del running[process]
+                    free_slots.append(slot)
+                    scheduler.session_finished(device.id)
+                    rprint(f"[cyan]Device '{device.name}' finished; its slot is free.[/cyan]")
+
+            while queue and free_slots:
+                device = queue.pop(0)
+                slot = free_slots.pop(0)
+                appium_port = appium_base_port + (slot * 2) # e.g., 4723, 4725, 4727
+                system_port = system_base_port + slot       # e.g., 8200, 8201, 8202
+
+                connection_future = scheduler.claim(device.id)
+                handoff = None
+                device_watch = DeviceWatch()
+                if device.type == "remote":
+                    handoff = ConnectionHandoff()
+                    connection_future.add_done_callback(
+                        lambda done, handoff=handoff, phone_id=device.id, device_watch=device_watch: hand_off_connection(
+                            done, phone_id, handoff, pipeline, tracker, device_watch
+                        )
+                    )
+                else:
+                    tracker.subscribe(device.id, device_watch)
+
+                process = multiprocessing.Process(
+                    target=run_automation_for_device,
+                    args=(device, automation_type, appium_port, system_port, duration, probability,messaging_probability, handoff, run_id, device_watch)
+                )
+                processes.append(process)
+                running[process] = (device, slot)
+                process.start()
+                rprint(f"[green]Started process {process.pid} for device '{device.name}' on Appium port {appium_port}[/green]")
+                time.sleep(5) # Stagger the process starts slightly to avoid resource contention
+
+            if queue:
+                scheduler.tick()
+            time.sleep(1)
 
         rprint("\n[bold green]All automation tasks have completed.[/bold green]")
-        manage_adb_server("kill") # Final cleanup
+        if pipeline is not None:
+            print_stage_timings(pipeline)
+            print_prewarm_summary(scheduler)
     finally:
         # This block is GUARANTEED to run, even on Ctrl+C
         rprint("\n[bold yellow]Main process is shutting down...[/bold yellow]")
+        if pipeline is not None:
+            pipeline.close()
 
         # 1. Find all remote phones that were part of this run.
         remote_device_ids = [
-            device['id'] for device in selected_devices if device.get("type") == "remote"
+            device.id for device in selected_devices if device.type == "remote"
         ]
 
-        # 2. If there are any, call the stop_phone API for all of them.
+        # 2. If there are any, stop them all and confirm they actually shut down.
         if remote_device_ids:
             rprint(f"[yellow]Sending stop command for {len(remote_device_ids)} remote phone(s)...[/yellow]")
             try:
-                # The stop_phone function likely accepts a list of IDs.
-                stop_phone(remote_device_ids)
-                rprint("[green]Stop command sent successfully.[/green]")
+                stop_and_reconcile(remote_device_ids, {device.id: device.name for device in selected_devices})
             except Exception as e:
                 rprint(f"[bold red]CRITICAL: Failed to send stop command for phones: {e}[/bold red]")
         
@@ -586,7 +693,216 @@ def start_automation_all(duration=None,probability=None,automation_type=None,mes
                 process.join(timeout=5)
         
         rprint("[green]All child processes have been terminated.[/green]")
-        manage_adb_server("kill")
+        tracker.stop()
+        if tracker.counts["detach"]:
+            rprint(f"[yellow]Devices detached {tracker.counts['detach']} time(s) and re-attached {tracker.counts['attach']} time(s) during the run.[/yellow]")
+        print_phase_timings(read_records(run_id=run_id))
+        print_throttling_summary()
+        print_api_stats()
+        stats_path = f"geelark_api_stats_{time.strftime('%Y%m%d_%H%M%S')}.json"
+        try:
+            get_api_stats().dump(stats_path)
+            rprint(f"[green]API call statistics written to {stats_path}[/green]")
+        except OSError as e:
+            rprint(f"[red]Could not write API call statistics: {e}[/red]")
+
+def hand_off_connection(future, phone_id: str, handoff: ConnectionHandoff, pipeline: BringUpPipeline, tracker: DeviceTracker, device_watch: DeviceWatch):
+    """
+    Done-callback of a phone's bring-up future: passes the connection info (with the
+    pipeline's phase timings) to the worker process and subscribes its DeviceWatch to
+    the phone's adb serial, which is only known once the phone is up.
+
+    The handoff is always set, {} if the bring-up failed, raised or was cancelled, so
+    the worker gives up at once instead of waiting out its timeout.
+    """
+    connection_info = {}
+    try:
+        if future.cancelled():
+            rprint(f"[red]Bring-up of phone {phone_id} was cancelled.[/red]")
+        elif future.exception() is not None:
+            rprint(f"[red]Bring-up of phone {phone_id} failed: {future.exception()}[/red]")
+        elif future.result():
+            connection_info = dict(future.result(), bring_up_phases=pipeline.phase_durations(phone_id, future))
+            tracker.subscribe(f"{connection_info['ip']}:{connection_info['port']}", device_watch)
+    except Exception as e:
+        rprint(f"[red]Error handing over the connection of phone {phone_id}: {e}[/red]")
+    finally:
+        handoff.set(connection_info)
+
+def stop_and_reconcile(phone_ids: List[str], names: Dict[str, str] = None, deadline: float = 60) -> Dict[str, Dict]:
+    """
+    Stop remote phones, confirm they shut down, and print one table of the outcome.
+
+    Args:
+        phone_ids (List[str]): Cloud phone IDs to stop.
+        names (Dict[str, str]): Display names by phone ID.
+        deadline (float): Seconds to keep confirming and retrying stragglers.
+
+    Returns:
+        Dict[str, Dict]: The per-phone results of stop_phones_confirmed.
+    """
+    names = names or {}
+    with console.status(f"[cyan]Stopping {len(phone_ids)} phone(s) and confirming shutdown...[/cyan]"):
+        results = stop_phones_confirmed(phone_ids, deadline=deadline)
+    registry = get_connection_registry()
+    for phone_id in phone_ids:
+        registry.forget_phone(phone_id)  # its next start needs a fresh connect and glogin
+
+    state_styles = {"stopped": "green", "running": "bold red", "failed": "red"}
+    table = Table(title="Stop Reconciliation")
+    table.add_column("Name", style="cyan")
+    table.add_column("ID", style="yellow")
+    table.add_column("State")
+    table.add_column("Details", style="white")
+    # Problems first, so they are not scrolled away
+    order = {"running": 0, "failed": 1, "stopped": 2}
+    for phone_id, result in sorted(results.items(), key=lambda item: order.get(item[1]["state"], 3)):
+        style = state_styles.get(result["state"], "white")
+        table.add_row(names.get(phone_id, "-"), phone_id, f"[{style}]{result['state']}[/{style}]", result["msg"])
+    console.print(table)
+
+    counts = {state: sum(1 for result in results.values() if result["state"] == state) for state in order}
+    rprint(f"[green]{counts['stopped']} stopped[/green], [bold red]{counts['running']} still running[/bold red], [red]{counts['failed']} failed[/red]")
+    if counts["running"] or counts["failed"]:
+        rprint("[bold red]Check the phones that are not stopped on the Geelark dashboard; they may still be billing.[/bold red]")
+    return results
+
+def print_stage_timings(pipeline: BringUpPipeline):
+    """Print how long phones queued for and spent in each bring-up stage."""
+    table = Table(title="Bring-up Stage Timings")
+    table.add_column("Stage", style="cyan")
+    table.add_column("Phones", style="white")
+    table.add_column("Avg Queued", style="yellow")
+    table.add_column("Avg Time", style="green")
+    table.add_column("p95 Time", style="green")
+    table.add_column("Max Time", style="magenta")
+    for stage, stats in pipeline.stage_stats().items():
+        table.add_row(
+            stage,
+            str(stats["phones"]),
+            f"{stats['avg_wait']:.1f}s",
+            f"{stats['avg_service']:.1f}s",
+            f"{stats['p95_service']:.1f}s",
+            f"{stats['max_service']:.1f}s",
+        )
+    console.print(table)
+
+def print_device_event(event: Dict):
+    """DeviceTracker listener: report devices dropping off or coming back during a run."""
+    if event["type"] == "detach":
+        rprint(f"[bold red]Device {event['serial']} detached (now {event['state'] or 'gone'}).[/bold red]")
+    elif event["type"] == "attach":
+        rprint(f"[green]Device {event['serial']} attached.[/green]")
+
+def print_phase_timings(records: List[Dict]):
+    """Show p50/p95 per device-run phase across the fleet, slowest median first in bold."""
+    if not records:
+        return
+    stats = aggregate(records)
+    table = Table(title=f"Device Run Phases ({len(records)} run(s))")
+    table.add_column("Phase", style="cyan")
+    table.add_column("Runs", justify="right")
+    table.add_column("p50", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("Max", justify="right")
+    phases = {name: phase for name, phase in stats.items() if name not in ("time_to_first_action", "total")}
+    slowest = max(phases, key=lambda name: phases[name]["p50"]) if phases else None
+    for name, phase in stats.items():
+        if name == "time_to_first_action":
+            table.add_section()
+        label = f"[bold]{name}[/bold]" if name == slowest else name
+        table.add_row(label, str(phase["runs"]), f"{phase['p50']:.2f}s", f"{phase['p95']:.2f}s", f"{phase['max']:.2f}s")
+    console.print(table)
+
+def print_prewarm_summary(scheduler: PrewarmScheduler):
+    """Show how well phones were warmed ahead of their worker slot."""
+    stats = scheduler.stats()
+    session = f"{stats['session_length']:.0f}s" if stats["session_length"] is not None else "unknown"
+    rprint(
+        f"[cyan]Pre-warm: {stats['prewarmed']} started ahead, {stats['claimed_ready']} ready at their slot, "
+        f"{stats['claimed_warming']} still booting, {stats['claimed_cold']} started cold, "
+        f"{stats['idle_stopped']} stopped after idling ({stats['idle_seconds'] / 60:.1f} idle phone-minutes)[/cyan]"
+    )
+    rprint(
+        f"[cyan]Wait for a phone after its slot freed: avg {stats['avg_slot_wait']:.1f}s, max {stats['max_slot_wait']:.1f}s "
+        f"(lead time {stats['lead_time']:.0f}s, session {session})[/cyan]"
+    )
+
+def print_throttling_summary():
+    """Print how much the shared Geelark API rate limiter throttled the fleet."""
+    metrics = get_rate_limiter().metrics()
+    table = Table(title="Geelark API Throttling")
+    table.add_column("Requests", style="cyan")
+    table.add_column("Throttled", style="yellow")
+    table.add_column("Time Waiting", style="yellow")
+    table.add_column("Retries", style="magenta")
+    table.add_column("Retries Denied", style="red")
+    table.add_column("Retry-After Honored", style="blue")
+    table.add_row(
+        str(metrics["acquired"]),
+        str(metrics["throttled"]),
+        f"{metrics['wait_seconds']:.1f}s",
+        str(metrics["retries"]),
+        str(metrics["retries_denied"]),
+        str(metrics["retry_after_honored"]),
+    )
+    console.print(table)
+
+    breakers = breaker_statuses()
+    if breakers:
+        breaker_table = Table(title="Geelark API Circuit Breakers")
+        breaker_table.add_column("Endpoint", style="cyan")
+        breaker_table.add_column("State", style="yellow")
+        breaker_table.add_column("Transitions", style="magenta")
+        breaker_table.add_column("Failed Fast", style="red")
+        for endpoint, state in sorted(breakers.items()):
+            transitions = ", ".join(f"{name}: {count}" for name, count in state.get("transitions", {}).items())
+            breaker_table.add_row(endpoint, state.get("state", "closed"), transitions or "-", str(state.get("fail_fast", 0)))
+        console.print(breaker_table)
+
+    queued_stops = get_stop_queue().pending()
+    if queued_stops:
+        rprint(f"[yellow]{len(queued_stops)} phone(s) are queued to be stopped once the API recovers.[/yellow]")
+
+def print_api_stats():
+    """Print per-endpoint latency and call accounting for the Geelark API (all processes of the last run)."""
+    report = get_api_stats().merged()
+    if not report:
+        rprint("[yellow]No Geelark API calls recorded yet.[/yellow]")
+        return
+
+    def fmt_seconds(value):
+        return f">{LATENCY_BUCKETS[-1]:g}s" if value is None else f"{value * 1000:.0f}ms"
+
+    table = Table(title="Geelark API Calls")
+    table.add_column("Endpoint", style="cyan")
+    table.add_column("Calls", style="white")
+    table.add_column("Retries", style="magenta")
+    table.add_column("Failed", style="red")
+    table.add_column("Avg", style="green")
+    table.add_column("p50", style="green")
+    table.add_column("p95", style="yellow")
+    table.add_column("Max", style="yellow")
+    table.add_column("Total Time", style="blue")
+    table.add_column("HTTP Status", style="white")
+    table.add_column("API Code", style="white")
+    table.add_column("Sent/Received", style="white")
+    for endpoint, stats in report.items():
+        table.add_row(
+            endpoint,
+            str(stats["calls"]),
+            str(stats["retries"]),
+            f"{stats['failed_calls']} ({stats['fail_fast']} fast)",
+            fmt_seconds(stats["latency_avg"]),
+            fmt_seconds(stats["latency_p50"]),
+            fmt_seconds(stats["latency_p95"]),
+            fmt_seconds(stats["latency_max"]),
+            f"{stats['latency_total']:.1f}s",
+            ", ".join(f"{status}: {count}" for status, count in stats["http_status"].items()),
+            ", ".join(f"{code}: {count}" for code, count in stats["api_code"].items()),
+            f"{stats['request_bytes'] / 1024:.1f}/{stats['response_bytes'] / 1024:.1f} KB",
+        )
+    console.print(table)
 
 def start_automation_specific():
     """Start automation for a single, user-selected device."""
@@ -594,15 +910,15 @@ def start_automation_specific():
     driver = None
     appium_service = None
     selected_device = None
+    spans = None
 
     try:
         # --- GATHER USER INPUT ---
-        devices = get_all_available_devices()
+        devices = display_phones(iter_all_available_devices())
         if not devices:
             rprint("[red]No available devices found![/red]")
             return
 
-        display_phones(devices)
         device_numbers = [str(i) for i in range(1, len(devices) + 1)]
         choice = Prompt.ask("Select device number", choices=device_numbers)
         selected_device = devices[int(choice) - 1]
@@ -618,22 +934,22 @@ def start_automation_specific():
             probability = int(prob_str) if prob_str.isdigit() and 1 <= int(prob_str) <= 10 else 5
         
         # --- SETUP LOGGING AND ENVIRONMENT ---
-        device_name = selected_device.get('name', 'UnknownDevice')
+        device_name = selected_device.name
         log = create_device_logger(device_name)
+        spans = SpanRecorder(selected_device.id, device_name, new_run_id())
         
         # <<< FIX 1: REMOVED THE CALLS to initialize_swipe_logger and initialize_chat_logger >>>
         # They are not needed.
 
-        manage_adb_server("kill")
         manage_adb_server("start")
         
         # --- CONNECT AND INITIALIZE ---
-        if selected_device["type"] == "local":
-            connection_info = { "ip": selected_device["id"].split(":")[0], "port": selected_device["id"].split(":")[1] }
-            log(f"[green]Using local device: {selected_device['name']}[/green]")
+        if selected_device.type == "local":
+            connection_info = { "ip": selected_device.id.split(":")[0], "port": selected_device.id.split(":")[1] }
+            log(f"[green]Using local device: {selected_device.name}[/green]")
         else:
-            log(f"\n[yellow]Preparing {selected_device['name']} for automation...[/yellow]")
-            connection_info = connect_to_phone(selected_device['id'])
+            log(f"\n[yellow]Preparing {selected_device.name} for automation...[/yellow]")
+            connection_info = connect_to_phone(selected_device.id, spans=spans)
         
         if not connection_info:
             log("[red]Failed to prepare device for automation. Please try again.[/red]")
@@ -644,10 +960,11 @@ def start_automation_specific():
         server_url = f"http://127.0.0.1:{appium_port}/wd/hub"
 
         log("[yellow]Starting Appium server...[/yellow]")
-        appium_service = start_appium_service_instance('127.0.0.1', appium_port, system_port, log)
+        with spans.span("appium_service"):
+            appium_service = start_appium_service_instance('127.0.0.1', appium_port, system_port, log)
         
         log("[yellow]Initializing Appium driver...[/yellow]")
-        driver = setup_appium_driver(connection_info, server_url, system_port)
+        driver = setup_appium_driver(connection_info, server_url, system_port, spans=spans)
         if not driver:
             log("[red]Failed to initialize Appium driver. Stopping automation.[/red]")
             return
@@ -655,16 +972,16 @@ def start_automation_specific():
         log("[green]Appium driver initialized successfully[/green]")
         
         if automation_type == "swiping":
-            if open_page(driver, "People",logger_func=log): 
+            if timed_open_page(driver, "People", log, spans): 
                 realistic_swipe(driver, right_swipe_probability=probability, duration_minutes=duration, logger_func=log)
         elif automation_type == "handle_matches":
-            if open_page(driver, "Chats",logger_func=log): 
+            if timed_open_page(driver, "Chats", log, spans): 
                 process_new_matches(driver, 10, 5,logger_func=log)
         elif automation_type == "auto":
             for i in range(2):
-                if open_page(driver, "People", logger_func=log): 
+                if timed_open_page(driver, "People", log, spans): 
                     realistic_swipe(driver, right_swipe_probability=7, duration_minutes=5, logger_func=log)
-                if open_page(driver, "Chats",logger_func=log): 
+                if timed_open_page(driver, "Chats", log, spans): 
                     process_new_matches(driver,10, 5, logger_func=log)
             
     except Exception as e:
@@ -676,6 +993,7 @@ def start_automation_specific():
         # This local cleanup is correct. Do not change it.
         rprint("\n[bold yellow]Cleaning up resources...[/bold yellow]")
         if driver:
+            get_geometry_cache().invalidate(driver)
             try:
                 driver.quit()
                 rprint("[green]Appium driver closed.[/green]")
@@ -693,43 +1011,49 @@ def start_automation_specific():
             except Exception as e:
                 rprint(f"[red]Error stopping Appium server: {e}[/red]")
         
-        if selected_device and selected_device["type"] == "remote":
+        if selected_device and selected_device.type == "remote":
             try:
-                stop_phone([selected_device['id']])
-                rprint(f"[green]Phone stop signal sent for {selected_device['name']}.[/green]")
+                stop_and_reconcile([selected_device.id], {selected_device.id: selected_device.name})
             except Exception as e:
                 rprint(f"[red]Error stopping phone: {str(e)}[/red]")
-        
-        manage_adb_server("kill")
+
+        if spans is not None:
+            print_phase_timings([spans.write()])
 def list_available_phones():
     """List all available devices."""
-    devices = get_all_available_devices()
+    devices = display_phones(iter_all_available_devices())
     if not devices:
         rprint("[red]No available devices found![/red]")
-        return
-    
-    display_phones(devices)
+
+    cache_stats = ", ".join(
+        f"{namespace} {counts['hits']} hit/{counts['misses']} miss"
+        for namespace, counts in phone_cache.stats().items()
+    )
+    rprint(f"[grey50]Phone cache: {cache_stats or 'empty'}[/grey50]")
 
 def disable_phone():
     """Disable a phone from automation."""
-    phones = get_available_phones()
+    phones = display_phones(iter_available_phones())
     if not phones:
         rprint("[red]No available phones found![/red]")
         return
 
-    phones = display_phones(phones)
     phone_numbers = [str(i) for i in range(1, len(phones) + 1)]
     choice = Prompt.ask("Select phone number to disable", choices=phone_numbers)
     
     selected_phone = phones[int(choice) - 1]
     
-    if Confirm.ask(f"Are you sure you want to disable {selected_phone['name']}?"):
+    if Confirm.ask(f"Are you sure you want to disable {selected_phone.name}?"):
         # TODO: Implement actual phone disable function
-        rprint(f"[red]Disabling {selected_phone['name']}...[/red]")
+        rprint(f"[red]Disabling {selected_phone.name}...[/red]")
         rprint("[yellow]This is a placeholder for the actual implementation[/yellow]")
 
 def show_menu():
     """Display the main menu."""
+    queued_stops = get_stop_queue().pending()
+    if queued_stops:
+        rprint(f"[yellow]Stopping {len(queued_stops)} phone(s) left running by an earlier session...[/yellow]")
+        flush_stop_queue()
     while True:
         clear_screen()
         console.print("[bold blue]Phone Automation Dashboard[/bold blue]")
@@ -740,9 +1064,10 @@ def show_menu():
         console.print("4. List Available Devices")
         console.print("5. Disable Device")
         console.print("6. Open Phones for Manual Use")  
-        console.print("7. Exit")                      
+        console.print("7. Show API Call Stats")
+        console.print("8. Exit")                      
         
-        choice = Prompt.ask("\nSelect an option", choices=["1", "2", "3", "4", "5", "6","7"])
+        choice = Prompt.ask("\nSelect an option", choices=["1", "2", "3", "4", "5", "6", "7", "8"])
         
         if choice == "1":
             start_automation_all()
@@ -758,8 +1083,11 @@ def show_menu():
             # Call the new function
             open_phones_manually()
         elif choice == "7":
+            print_api_stats()
+        elif choice == "8":
             # The clean exit logic
             if Confirm.ask("Are you sure you want to exit?"):
+                manage_adb_server("kill")
                 console.print("[yellow]Goodbye![/yellow]")
                 break
         
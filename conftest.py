@@ -0,0 +1,16 @@
+import os
+import tempfile
+
+# Keep the host-wide state files (cache, rate limiter, breakers, stop queue, stats) of the
+# tests away from the real ones; set before any test module imports geelark_api.
+_state_dir = tempfile.mkdtemp(prefix="geelark_tests_")
+for name, file_name in (
+    ("geelark_cache_path", "cache.json"),
+    ("geelark_ratelimit_path", "ratelimit.json"),
+    ("geelark_circuit_path", "circuit.json"),
+    ("geelark_stop_queue_path", "stop_queue.json"),
+    ("geelark_stats_dir", "stats"),
+    ("geelark_spans_path", "device_runs.jsonl"),
+    ("geelark_locator_prefs", "locator_prefs.json"),
+):
+    os.environ[name] = os.path.join(_state_dir, file_name)
@@ -1,15 +1,23 @@
 import time
-import subprocess
-from geelark_api import start_phone, get_phone_status, get_adb_information
+from geelark_api import start_phone, get_adb_information
+from readiness import get_watcher
+from adbclient import AdbError
+from adbregistry import get_connection_registry
+from spans import SpanRecorder, span
 from rich import print as rprint
 
-def make_phone_ready(phone_id: str) -> dict:
+def make_phone_ready(phone_id: str, deadline: float = 300, spans: SpanRecorder = None) -> dict:
     """
     Makes a phone ready for use by starting it and waiting for it to be fully started.
     Then retrieves and returns the ADB connection information.
+
+    The wait goes through the process-wide ReadinessWatcher, which batches the status
+    polling of every phone booting in this process into one request per tick.
     
     Args:
         phone_id (str): The ID of the phone to start
+        deadline (float): Maximum seconds to wait for the phone to finish booting.
+        spans (SpanRecorder): If given, times the start, status_wait and adb_info phases.
         
     Returns:
         dict: ADB connection information for the phone, or empty dict if failed
@@ -22,7 +30,8 @@ def make_phone_ready(phone_id: str) -> dict:
     }
     """
     # Start the phone
-    start_response = start_phone([phone_id])
+    with span(spans, "start"):
+        start_response = start_phone([phone_id])
     if not start_response or start_response.get("code") != 0:
         rprint(f"[red]Failed to start phone {phone_id}[/red]")
         return {}
@@ -31,29 +40,21 @@ def make_phone_ready(phone_id: str) -> dict:
     
     rprint("[yellow]Waiting for phone to start...[/yellow]")
     # Wait for phone to be fully started
-    while True:
-        status_info = get_phone_status([phone_id])
-        
-        # Check if we got any successful status information
-        success_details = status_info.get("successDetails", [])
-        if not success_details:
-            rprint("[red]Failed to get phone status[/red]")
-            return {}
-            
-        phone_status = success_details[0]
-        
-        # Status codes: 0=Started, 1=Starting, 2=Shut down, 3=Expired
-        if phone_status["status"] == 0:  # Phone is started
-            rprint(f"[green]Phone {phone_id} is now started[/green]")
-            break
-        elif phone_status["status"] in [2, 3]:  # Phone is shut down or expired
-            rprint(f"[red]Phone {phone_id} is not available (status: {phone_status['status']})[/red]")
-            return {}
-            
-        time.sleep(3)
+    # Status codes: 0=Started, 1=Starting, 2=Shut down, 3=Expired
+    with span(spans, "status_wait"):
+        status = get_watcher().wait(phone_id, deadline=deadline)
+
+    if status is None:
+        rprint(f"[red]Phone {phone_id} did not report as started within {deadline}s[/red]")
+        return {}
+    if status in [2, 3]:  # Phone is shut down or expired
+        rprint(f"[red]Phone {phone_id} is not available (status: {status})[/red]")
+        return {}
+    rprint(f"[green]Phone {phone_id} is now started[/green]")
     
     # Get ADB information
-    adb_info = get_adb_information([phone_id])
+    with span(spans, "adb_info"):
+        adb_info = get_adb_information([phone_id])
     if not adb_info:
         rprint("[red]Failed to get ADB information[/red]")
         return {}
@@ -71,7 +72,7 @@ def make_phone_ready(phone_id: str) -> dict:
     
     return connection_info
 
-def connect_to_phone(phone_id: str) -> dict:
+def connect_to_phone(phone_id: str, spans: SpanRecorder = None) -> dict:
     """
     Connects to a phone using ADB commands.
     First makes the phone ready, then establishes ADB connection and logs in.
@@ -79,12 +80,13 @@ def connect_to_phone(phone_id: str) -> dict:
     
     Args:
         phone_id (str): The ID of the phone to connect to
+        spans (SpanRecorder): If given, times every bring-up phase (including adb_connect and login)
         
     Returns:
         dict: Connection information if successful, empty dict if failed
     """
     # First make sure the phone is ready
-    connection_info = make_phone_ready(phone_id)
+    connection_info = make_phone_ready(phone_id, spans=spans)
     if not connection_info:
         rprint("[red]Failed to get connection information[/red]")
         return {}
@@ -99,32 +101,29 @@ def connect_to_phone(phone_id: str) -> dict:
         try:
             # Connect to the phone
             rprint(f"[yellow]Connecting to {connection_address}... (Attempt {retry_count + 1}/{max_retries})[/yellow]")
-            connect_cmd = ["adb", "connect", connection_address]
-            connect_result = subprocess.run(connect_cmd, capture_output=True, text=True)
-            
-            if "connected" in connect_result.stdout.lower():
+            with span(spans, "adb_connect"):
+                connected = adb_connect(connection_address)
+            if connected:
                 rprint("[green]Successfully connected to device[/green]")
                 
                 # Login to the phone
                 rprint("[yellow]Logging in...[/yellow]")
-                login_cmd = ["adb", "-s", connection_address, "shell", "glogin", connection_info['pwd']]
-                login_result = subprocess.run(login_cmd, capture_output=True, text=True)
-                
-                if login_result.returncode == 0:
+                with span(spans, "login"):
+                    logged_in = adb_login(connection_address, connection_info['pwd'])
+                if logged_in:
                     rprint("[green]Successfully logged in[/green]")
+                    get_connection_registry().bind(phone_id, connection_address)
                     return connection_info
                 else:
-                    rprint(f"[red]Failed to login: {login_result.stderr}[/red]")
                     return {}
             else:
-                rprint(f"[red]Failed to connect: {connect_result.stdout.rstrip()}[/red]")
                 retry_count += 1
                 if retry_count < max_retries:
                     rprint(f"[yellow]Retrying in 3 seconds...[/yellow]")
                     time.sleep(3)
                 continue
                 
-        except subprocess.SubprocessError as e:
+        except AdbError as e:
             rprint(f"[red]Error executing ADB commands: {str(e)}[/red]")
             retry_count += 1
             if retry_count < max_retries:
@@ -138,6 +137,39 @@ def connect_to_phone(phone_id: str) -> dict:
     rprint("[red]Failed to connect after 3 attempts[/red]")
     return {}
 
+def adb_connect(connection_address: str) -> bool:
+    """
+    Makes sure the adb server is connected to a cloud phone's ADB endpoint.
+    An address that is already attached and answers a shell echo is reused as-is
+    (see adbregistry.ConnectionRegistry); only a missing or stale transport is (re)connected.
+
+    Returns:
+        bool: True if adb reports the device as connected.
+    """
+    try:
+        if not get_connection_registry().ensure_connected(connection_address):
+            rprint(f"[cyan]{connection_address} is already connected[/cyan]")
+        return True
+    except AdbError as e:
+        rprint(f"[red]Failed to connect: {e}[/red]")
+        return False
+
+def adb_login(connection_address: str, password: str) -> bool:
+    """
+    Runs the Geelark `glogin` command on a connected phone, unless this process already
+    logged it in with the same password over the current transport.
+
+    Returns:
+        bool: True if the phone is logged in.
+    """
+    try:
+        if not get_connection_registry().ensure_logged_in(connection_address, password):
+            rprint(f"[cyan]{connection_address} is already logged in[/cyan]")
+        return True
+    except AdbError as e:
+        rprint(f"[red]Failed to login: {e}[/red]")
+        return False
+
 if __name__ == "__main__":
     # Example usage
     
@@ -4,13 +4,174 @@ import hashlib
 import requests
 import json
 import os
+import math
+import random
+import threading
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from cache import TTLCache
+from ratelimit import get_rate_limiter
+from circuit import get_breaker, get_stop_queue
+from apistats import get_api_stats
+from models import PhoneRecord, PhoneTable
 
 load_dotenv(override=True)
 
 app_id: str =  os.getenv("geelark_app_id")
 api_key: str = os.getenv("geelark_api_key")
+api_base_url: str = os.getenv("geelark_base_url", "https://openapi.geelark.com/open/v1")
+
+# Phone inventory, equipmentInfo and ADB endpoint data are remembered between menu
+# actions (and runs) so listing devices again doesn't refetch everything.
+CACHE_TTLS = {
+    "inventory": 300,     # phone list (names, remarks)
+    "equipment": 86400,   # equipmentInfo per phone; hardware rarely changes
+    "adb": 300,           # /adb/getData result per phone; invalidated by start/stop
+}
+# Batch endpoints accept at most this many IDs per request
+BATCH_ID_LIMIT = 100
+# failDetails codes that won't change by asking again (phone does not exist, ADB not enabled)
+NON_RETRYABLE_FAIL_CODES = {42001, 49001}
+
+phone_cache = TTLCache(
+    os.getenv("geelark_cache_path", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".geelark_cache.json")),
+    CACHE_TTLS,
+)
+
+class GeelarkClient:
+    """
+    Owns a pooled keep-alive HTTP session for the Geelark OpenAPI.
+
+    Every request made through the same client reuses the TCP/TLS connections
+    kept open in its pool instead of doing a fresh handshake per call.
+
+    Args:
+        base_url (str): Root of the OpenAPI, e.g. "https://openapi.geelark.com/open/v1".
+        pool_connections (int): Number of per-host connection pools to cache.
+        pool_maxsize (int): Maximum number of connections kept alive per host.
+        keep_alive (bool): If False, every request asks the server to close the connection.
+        timeouts (dict): Per-endpoint timeouts in seconds, keyed by path (e.g. "/phone/status").
+        default_timeout (float): Timeout used for endpoints missing from `timeouts`.
+    """
+
+    DEFAULT_TIMEOUTS = {
+        "/phone/list": 15,
+        "/phone/start": 30,
+        "/phone/stop": 15,
+        "/phone/status": 10,
+        "/adb/getData": 10,
+    }
+
+    def __init__(
+        self,
+        base_url: str = api_base_url,
+        pool_connections: int = 4,
+        pool_maxsize: int = 32,
+        keep_alive: bool = True,
+        timeouts: dict = None,
+        default_timeout: float = 10):
+        self.base_url = base_url.rstrip("/")
+        self.timeouts = dict(self.DEFAULT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.default_timeout = default_timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    def url(self, endpoint: str) -> str:
+        """Builds the full URL for an endpoint path such as "/phone/list"."""
+        return self.base_url + endpoint
+
+    def endpoint_for(self, url: str) -> str:
+        """Returns the endpoint path of a URL, e.g. "/phone/stop"."""
+        path = urlparse(url).path
+        base_path = urlparse(self.base_url).path
+        return path[len(base_path):] if path.startswith(base_path) else path
+
+    def timeout_for(self, url: str) -> float:
+        """Returns the configured timeout for the endpoint the URL points at."""
+        path = urlparse(url).path
+        for endpoint, timeout in self.timeouts.items():
+            if path.endswith(endpoint):
+                return timeout
+        return self.default_timeout
+
+    def request(self, method: str, url: str, headers: dict = None, payload=None, timeout: float = None) -> requests.Response:
+        """
+        Sends a single request over the pooled session (no retries).
+
+        Raises:
+            requests.exceptions.RequestException: On connection errors, timeouts or HTTP error statuses.
+        """
+        if timeout is None:
+            timeout = self.timeout_for(url)
+        if method.upper() == "POST":
+            response = self.session.post(url, headers=headers, data=payload, timeout=timeout)
+        elif method.upper() == "GET":
+            response = self.session.get(url, headers=headers, timeout=timeout)
+        else:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        response.raise_for_status()
+        return response
+
+    def connection_stats(self) -> dict:
+        """
+        Reports how often pooled connections were reused.
+
+        Returns:
+            dict: {"requests": int, "new_connections": int, "reused": int, "reuse_ratio": float}
+        """
+        total_requests = 0
+        new_connections = 0
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                total_requests += pool.num_requests
+                new_connections += pool.num_connections
+        reused = max(0, total_requests - new_connections)
+        return {
+            "requests": total_requests,
+            "new_connections": new_connections,
+            "reused": reused,
+            "reuse_ratio": reused / total_requests if total_requests else 0.0,
+        }
+
+    def close(self):
+        """Closes every pooled connection."""
+        self.session.close()
+
+_client: GeelarkClient | None = None
+
+def get_client() -> GeelarkClient:
+    """Returns the process-wide client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = GeelarkClient(pool_maxsize=int(os.getenv("geelark_pool_size", "32")))
+    return _client
+
+def configure_client(**kwargs) -> GeelarkClient:
+    """
+    Replaces the process-wide client with one built from the given options.
+    Accepts the same keyword arguments as GeelarkClient.
+    """
+    global _client
+    if _client is not None:
+        _client.close()
+    _client = GeelarkClient(**kwargs)
+    return _client
 
 def generate_api_headers(app_id: str, api_key: str) -> dict:
     """
@@ -49,9 +210,11 @@ def request_with_retry(
     headers=None,
     payload=None,
     retries=3,
-    backoff=3) -> requests.Response | None:
+    backoff=3,
+    timeout=None) -> requests.Response | None:
     """
     Make an HTTP request with automatic retries on connection errors.
+    Requests go through the pooled session of the process-wide GeelarkClient.
 
     Args:
         method (str): HTTP method ("GET", "POST", etc.)
@@ -59,43 +222,116 @@ def request_with_retry(
         headers (dict): HTTP headers.
         payload (dict or str): Request payload.
         retries (int): Number of retries on failure.
-        backoff (int): Delay (seconds) between retries.
+        backoff (int): Base delay (seconds) for the exponential, jittered backoff between retries.
+        timeout (float): Per-request timeout; defaults to the client's per-endpoint timeout.
+
+    Every attempt first takes a token from the host-wide rate limiter, and every retry
+    is paid from its shared retry budget, so a fleet of worker processes neither
+    stampedes the API nor retries in lockstep.
+
+    Each endpoint also has a host-wide circuit breaker: while it is open the call
+    fails fast (returns None) instead of waiting out the retries and backoff.
 
     Returns:
         requests.Response: Response object on success.
-        None: If all retries failed.
+        None: If all retries failed or the endpoint's circuit is open.
     """
+    client = get_client()
+    limiter = get_rate_limiter()
+    stats = get_api_stats()
+    endpoint = client.endpoint_for(url)
+    breaker = get_breaker(endpoint)
+    request_bytes = len(payload) if isinstance(payload, (str, bytes)) else 0
+    attempts = 0
     for attempt in range(1, retries + 1):
+        if not breaker.allow():
+            print(f"Circuit for {breaker.endpoint} is open; failing fast.")
+            stats.record_call(endpoint, attempts, succeeded=False, fail_fast=True)
+            return None
+        limiter.acquire()
+        attempts += 1
+        started = time.perf_counter()
         try:
-            if method.upper() == "POST":
-                response = requests.post(url, headers=headers, data=payload, timeout=10)
-            elif method.upper() == "GET":
-                response = requests.get(url, headers=headers, timeout=10)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            response.raise_for_status()
-            return response
+            response = client.request(method, url, headers=headers, payload=payload, timeout=timeout)
         except (requests.exceptions.RequestException) as e:
+            error_response = getattr(e, "response", None)
+            stats.record_attempt(
+                endpoint,
+                time.perf_counter() - started,
+                error_response.status_code if error_response is not None else None,
+                request_bytes,
+                len(error_response.content) if error_response is not None else 0,
+            )
             print(f"[Attempt {attempt}/{retries}] Request failed: {e}")
-            if attempt < retries:
-                print(f"Retrying in {backoff} seconds...")
-                time.sleep(backoff)
-            else:
+            if _is_api_failure(e):
+                breaker.record_failure()
+            if attempt >= retries:
                 print("All retries failed.")
+                break
+            if not limiter.try_spend_retry():
+                print("Global retry budget is spent; not retrying.")
+                break
+            delay = _retry_delay(e, attempt, backoff)
+            print(f"Retrying in {delay:.1f} seconds...")
+            time.sleep(delay)
+        else:
+            stats.record_attempt(endpoint, time.perf_counter() - started, response.status_code, request_bytes, len(response.content))
+            stats.record_call(endpoint, attempts, succeeded=True, api_code=_api_code(response))
+            breaker.record_success()
+            if breaker.endpoint != "/phone/stop":
+                _schedule_stop_queue_flush()
+            return response
+    stats.record_call(endpoint, attempts, succeeded=False)
     return None
 
-def get_all_cloud_phones(
-    page: int = None,
-    page_size: int = 100,
-    ids: list[str] = None,
-    serial_name: str = None,
-    remark: str = None,
-    group_name: str = None,
-    tags: list[str] = None
-) -> dict:
+def _api_code(response: requests.Response):
+    """The `code` field of a JSON response body, or None if there is none."""
+    try:
+        body = response.json()
+    except ValueError:
+        return None
+    return body.get("code") if isinstance(body, dict) else None
+
+def _is_api_failure(error: requests.exceptions.RequestException) -> bool:
+    """
+    Whether an error says the API itself is unhealthy (counts towards opening its circuit).
+    Connection errors, timeouts, 429 and 5xx do; other client errors such as 401 do not.
+    """
+    response = getattr(error, "response", None)
+    if response is None:
+        return True
+    return response.status_code == 429 or response.status_code >= 500
 
+def _retry_delay(error: requests.exceptions.RequestException, attempt: int, backoff: float, max_delay: float = 60) -> float:
+    """
+    Seconds to wait before the next attempt.
+    Honors a Retry-After header on the failed response; otherwise exponential backoff with jitter.
+    """
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            get_rate_limiter().record("retry_after_honored")
+            return min(max_delay, max(0.0, delay))
+
+    ceiling = min(max_delay, backoff * 2 ** (attempt - 1))
+    return random.uniform(ceiling / 2, ceiling)
+
+def _fetch_phone_page(page: int | None, page_size: int | None, filters: dict) -> dict | None:
+    """
+    Fetch one page of /phone/list.
 
-    api_url = "https://openapi.geelark.com/open/v1/phone/list"
+    Returns:
+        dict | None: The response "data" object ({"total", "page", "pageSize", "items"}), or None on failure.
+    """
+    api_url = get_client().url("/phone/list")
     
     headers = generate_api_headers(app_id, api_key)
     
@@ -104,16 +340,16 @@ def get_all_cloud_phones(
         payload["page"] = page
     if page_size is not None:
         payload["pageSize"] = page_size
-    if ids is not None:
-        payload["ids"] = ids
-    if serial_name is not None:
-        payload["serialName"] = serial_name
-    if remark is not None: 
-        payload["remark"] = remark
-    if group_name is not None: 
-        payload["groupName"] = group_name
-    if tags is not None: 
-        payload["tags"] = tags
+    if filters.get("ids") is not None:
+        payload["ids"] = filters["ids"]
+    if filters.get("serial_name") is not None:
+        payload["serialName"] = filters["serial_name"]
+    if filters.get("remark") is not None: 
+        payload["remark"] = filters["remark"]
+    if filters.get("group_name") is not None: 
+        payload["groupName"] = filters["group_name"]
+    if filters.get("tags") is not None: 
+        payload["tags"] = filters["tags"]
 
     response = request_with_retry(
         method="POST",
@@ -121,31 +357,208 @@ def get_all_cloud_phones(
         headers=headers,
         payload=json.dumps(payload),
         retries=3,
-        backoff=3,  # wait 5s between retries
+        backoff=3,  # jittered 1.5-3s, then 3-6s (unless the API sends Retry-After)
     )
 
     if response:
         try:
             response_data = response.json()
-            return response_data["data"]["items"]
+            return response_data["data"]
         except Exception as e:
             print(f"Failed to parse response JSON: {e}")
-            return []
+            return None
     else:
-        print("Could not retrieve cloud phones after retries.")
-        return []
+        print(f"Could not retrieve cloud phones (page {page}) after retries.")
+        return None
+
+def _cached_inventory() -> list[dict] | None:
+    """Rebuilds the full phone list from the cache, or returns None if any part is missing or expired."""
+    phones = phone_cache.get("inventory", "phones")
+    if phones is None:
+        return None
+    equipment = phone_cache.get_many("equipment", [phone["id"] for phone in phones])
+    if len(equipment) < len(phones):
+        return None
+    return [{**phone, "equipmentInfo": equipment[phone["id"]]} for phone in phones]
+
+def _store_inventory(phones: list[dict]):
+    phone_cache.set_many("equipment", {phone["id"]: phone.get("equipmentInfo", {}) for phone in phones})
+    phone_cache.set("inventory", "phones", [
+        {key: value for key, value in phone.items() if key != "equipmentInfo"} for phone in phones
+    ])
 
-def start_phone(ids: list[str]) -> dict | None:
+def iter_cloud_phone_pages(page_size: int = 100, max_workers: int = 8, use_cache: bool = True, **filters) -> Iterator[list[dict]]:
     """
-    Start the specified cloud phones and open their URLs in the browser.
+    Yield every page of cloud phones, fetching pages 2..N concurrently.
+
+    The first page is requested on its own to learn the total count; the remaining
+    pages are then requested in parallel and yielded in the order they arrive.
+    Unfiltered listings are served from phone_cache while it is fresh.
 
     Args:
-        ids (list[str]): List of cloud phone IDs to start
+        page_size (int): Phones per page (the API allows up to 100).
+        max_workers (int): Maximum number of pages fetched at the same time.
+        use_cache (bool): If False, always hit the API (the result still refreshes the cache).
+        **filters: Optional ids, serial_name, remark, group_name, tags filters.
+
+    Yields:
+        list[dict]: The "items" of one page.
+    """
+    unfiltered = all(value is None for value in filters.values())
+    if unfiltered and use_cache:
+        cached = _cached_inventory()
+        if cached is not None:
+            yield cached
+            return
+
+    first_page = _fetch_phone_page(1, page_size, filters)
+    if not first_page:
+        return
+    fetched = list(first_page.get("items", []))
+    yield first_page.get("items", [])
+
+    total = first_page.get("total", 0)
+    page_count = math.ceil(total / page_size) if page_size else 1
+    if page_count <= 1:
+        if unfiltered:
+            _store_inventory(fetched)
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, page_count - 1)) as executor:
+        futures = {
+            executor.submit(_fetch_phone_page, page, page_size, filters): page
+            for page in range(2, page_count + 1)
+        }
+        complete = True
+        for future in as_completed(futures):
+            data = future.result()
+            if data is None:
+                print(f"Skipping page {futures[future]} of {page_count}; phones on it are missing from the list.")
+                complete = False
+                continue
+            fetched.extend(data.get("items", []))
+            yield data.get("items", [])
+
+    # Only a complete listing is worth remembering
+    if unfiltered and complete:
+        _store_inventory(fetched)
+
+def iter_cloud_phones(page_size: int = 100, max_workers: int = 8, **filters) -> Iterator[dict]:
+    """
+    Stream every cloud phone in the account, across all pages.
+    See iter_cloud_phone_pages for the arguments.
+    """
+    for items in iter_cloud_phone_pages(page_size, max_workers, **filters):
+        yield from items
+
+def get_all_cloud_phones(
+    page: int = None,
+    page_size: int = 100,
+    ids: list[str] = None,
+    serial_name: str = None,
+    remark: str = None,
+    group_name: str = None,
+    tags: list[str] = None
+) -> list[dict]:
+    """
+    Get cloud phones from the account.
+
+    Args:
+        page (int): Fetch only this page. If None, every page is fetched (concurrently).
+        page_size (int): Phones per page (max 100).
+        ids, serial_name, remark, group_name, tags: Optional server-side filters.
 
     Returns:
-        dict | None: API response dictionary on success, None on failure.
+        list[dict]: The phones, or an empty list on failure.
+    """
+    filters = {
+        "ids": ids,
+        "serial_name": serial_name,
+        "remark": remark,
+        "group_name": group_name,
+        "tags": tags,
+    }
+    if page is None:
+        return list(iter_cloud_phones(page_size=page_size, **filters))
+
+    data = _fetch_phone_page(page, page_size, filters)
+    return data.get("items", []) if data else []
+
+def _chunked(ids: list[str], size: int = BATCH_ID_LIMIT) -> list[list[str]]:
+    """Split an ID list into chunks the batch endpoints accept."""
+    return [ids[start:start + size] for start in range(0, len(ids), size)]
+
+def _fan_out(func, chunks: list[list[str]], max_workers: int = 8) -> list:
+    """Call func(chunk) for every chunk concurrently; results come back in chunk order."""
+    if len(chunks) <= 1:
+        return [func(chunk) for chunk in chunks]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        return list(executor.map(func, chunks))
+
+def _batched_call(batch_func, ids: list[str], retry_rounds: int = 1) -> dict:
+    """
+    Send a batch endpoint call for any number of IDs.
+
+    The IDs are split into chunks of BATCH_ID_LIMIT, the chunks are sent concurrently and
+    their successDetails/failDetails are merged. IDs that failed for a retryable reason
+    (including whole chunks whose request failed) are retried on their own, without
+    resending the IDs that already succeeded.
+
+    Args:
+        batch_func: Sends one chunk; returns the parsed response dict or None.
+        ids (list[str]): IDs to send.
+        retry_rounds (int): How many times failed IDs are retried.
+
+    Returns:
+        dict: {"code", "msg", "data": {"totalAmount", "successAmount", "failAmount", "successDetails", "failDetails"}}.
+              "code" is 0 if at least one chunk was accepted by the API. In failDetails, code -1
+              marks IDs whose request got no answer (transport failure, open circuit); IDs of a
+              chunk the API rejected as a whole carry the API's error code.
     """
-    api_url = "https://openapi.geelark.com/open/v1/phone/start"
+    unique_ids = list(dict.fromkeys(ids))
+    success, fail = {}, {}
+    code, msg = -1, "request failed"
+    pending = unique_ids
+    for round_number in range(retry_rounds + 1):
+        if round_number:
+            print(f"Retrying {len(pending)} failed ID(s)...")
+            time.sleep(random.uniform(0.5, 1.5))
+        chunks = _chunked(pending)
+        for chunk, response_data in zip(chunks, _fan_out(batch_func, chunks)):
+            if not response_data or response_data.get("code") != 0:
+                error_code = response_data.get("code", -1) if response_data else -1
+                error_msg = response_data.get("msg") if response_data else "request failed"
+                for phone_id in chunk:
+                    fail[phone_id] = {"code": error_code, "id": phone_id, "msg": error_msg}
+                if code != 0 and response_data:
+                    code, msg = response_data.get("code", -1), error_msg
+                continue
+            code, msg = 0, response_data.get("msg", "success")
+            data = response_data.get("data") or {}
+            for detail in data.get("successDetails", []):
+                success[detail["id"]] = detail
+                fail.pop(detail["id"], None)
+            for detail in data.get("failDetails", []):
+                fail[detail["id"]] = detail
+        pending = [phone_id for phone_id, detail in fail.items() if detail.get("code") not in NON_RETRYABLE_FAIL_CODES]
+        if not pending:
+            break
+
+    return {
+        "code": code,
+        "msg": msg,
+        "data": {
+            "totalAmount": len(unique_ids),
+            "successAmount": len(success),
+            "failAmount": len(fail),
+            "successDetails": list(success.values()),
+            "failDetails": list(fail.values()),
+        },
+    }
+
+def _post_ids(endpoint: str, ids: list[str], action: str) -> dict | None:
+    """POST {"ids": ids} to a batch endpoint; returns the parsed response or None."""
+    api_url = get_client().url(endpoint)
     headers = generate_api_headers(app_id, api_key)
     payload = {"ids": ids}
 
@@ -154,149 +567,304 @@ def start_phone(ids: list[str]) -> dict | None:
         url=api_url,
         headers=headers,
         payload=json.dumps(payload),
-        retries=3,    # Retry up to 3 times
-        backoff=5     # Wait 5 seconds between retries
+        retries=3,
+        backoff=5,
     )
 
     if response:
         try:
             response_data = response.json()
-            if response_data.get("code") == 0:
-                # Open each phone's URL in the browser
-                success_details = response_data.get("data", {}).get("successDetails", [])
-                for phone in success_details:
-                    url = phone.get("url")
-                    if url:
-                        print(f"Opening phone {phone.get('id')} in browser...")
-                        webbrowser.open(url)
-                        time.sleep(1)  # Small delay between opening multiple URLs
-            else:
+            if response_data.get("code") != 0:
                 print(f"API Error: {response_data.get('msg')}")
             return response_data
         except Exception as e:
             print(f"Failed to parse response JSON: {e}")
             return None
     else:
-        print("Failed to start phones after retries.")
+        print(f"Failed to {action} after retries.")
         return None
 
+def open_phone_urls(success_details: list[dict]) -> threading.Thread:
+    """
+    Open the screens of started phones in the browser on a background thread,
+    so the caller is not held up by the delay between tabs.
+
+    Args:
+        success_details (list[dict]): successDetails entries from a start_phone response
+
+    Returns:
+        threading.Thread: The (daemon) thread opening the URLs.
+    """
+    def _open_all():
+        for phone in success_details:
+            url = phone.get("url")
+            if url:
+                print(f"Opening phone {phone.get('id')} in browser...")
+                webbrowser.open(url)
+                time.sleep(1)  # Small delay between opening multiple URLs
+
+    opener = threading.Thread(target=_open_all, name="phone-url-opener", daemon=True)
+    opener.start()
+    return opener
+
+def start_phone(ids: list[str], headless: bool = True) -> dict | None:
+    """
+    Start the specified cloud phones.
+    Any number of IDs can be passed; they are sent in concurrent chunks of 100.
+
+    The call returns as soon as the start requests are answered. Each entry of
+    data["successDetails"] (id, url, ...) is the handle for one started phone;
+    pass the IDs to the readiness watcher to wait for the boot to finish.
+
+    Args:
+        ids (list[str]): List of cloud phone IDs to start
+        headless (bool): If False, also open each started phone's URL in the browser
+                         (in the background, see open_phone_urls).
+
+    Returns:
+        dict | None: API response dictionary on success, None on failure.
+    """
+    response_data = _batched_call(lambda chunk: _post_ids("/phone/start", chunk, "start phones"), ids)
+    # The phones' ADB endpoints change with their running state
+    phone_cache.invalidate("adb", ids)
+
+    if response_data["code"] != 0:
+        return None
+    if not headless:
+        open_phone_urls(response_data.get("data", {}).get("successDetails", []))
+    return response_data
+
 def stop_phone(ids: list[str]) -> dict | None:
     """
     Stop the specified cloud phones.
+    Any number of IDs can be passed; they are sent in concurrent chunks of 100.
+
+    IDs whose stop request could not be delivered (API down, circuit open) are put
+    in the durable stop queue; stops queued earlier are sent along with this call.
+
     Args:
         ids (list[str]): List of cloud phone IDs to stop
     Returns:
         dict | None: API response dictionary on success, None on failure.
     """
-    api_url = "https://openapi.geelark.com/open/v1/phone/stop"
-    headers = generate_api_headers(app_id, api_key)
-    payload = {"ids": ids}
+    stop_queue = get_stop_queue()
+    queued = stop_queue.pending()
+    all_ids = list(dict.fromkeys(list(ids) + queued))
+    if not all_ids:
+        return None
+    try:
+        response_data = _batched_call(lambda chunk: _post_ids("/phone/stop", chunk, "stop phones"), all_ids)
+    except Exception as e:
+        # The queued IDs are still in the queue; keep the new ones with them
+        print(f"Stop request failed: {e}")
+        stop_queue.add(ids)
+        return None
+    # The phones' ADB endpoints change with their running state
+    phone_cache.invalidate("adb", all_ids)
+
+    # code -1 marks IDs whose request never got an answer from the API; IDs the API
+    # rejected (unknown phone, bad parameters, auth) are not queued, they would fail again
+    undelivered = [detail["id"] for detail in response_data["data"]["failDetails"] if detail.get("code") == -1]
+    stop_queue.remove([phone_id for phone_id in queued if phone_id not in undelivered])
+    if undelivered:
+        print(f"Queued {len(undelivered)} phone(s) to be stopped once the API recovers.")
+        stop_queue.add(undelivered)
+
+    if response_data["code"] != 0:
+        return None
+    return response_data
 
-    response = request_with_retry(
-        method="POST",
-        url=api_url,
-        headers=headers,
-        payload=json.dumps(payload),
-        retries=3,
-        backoff=5,
-    )
+_last_flush_check = 0.0
 
-    if response:
-        try:
-            response_data = response.json()
-            return response_data
-        except Exception as e:
-            print(f"Failed to parse response JSON: {e}")
-            return None
-    else:
-        print("Failed to stop phones after retries.")
+def _schedule_stop_queue_flush(min_interval: float = 30):
+    """
+    The API answered a request: deliver the stops queued while it was down, on a
+    background thread. Checks the queue at most once every `min_interval` seconds.
+    The thread is not a daemon, so the interpreter lets an in-flight flush finish
+    before exiting.
+    """
+    global _last_flush_check
+    now = time.monotonic()
+    if now - _last_flush_check < min_interval:
+        return
+    _last_flush_check = now
+    if get_stop_queue().pending():
+        threading.Thread(target=flush_stop_queue, name="stop-queue-flush").start()
+
+def flush_stop_queue() -> dict | None:
+    """
+    Send the stop requests queued while the API was unreachable.
+
+    Returns:
+        dict | None: The stop_phone response, or None if nothing was queued or the API is still down.
+    """
+    if not get_stop_queue().pending():
         return None
+    return stop_phone([])
 
-def get_adb_information(ids: list[str]) -> list[dict]:
+def stop_phones_confirmed(ids: list[str], deadline: float = 60, poll_interval: float = 3, resend_interval: float = 10) -> dict[str, dict]:
+    """
+    Stop phones and make sure they actually shut down.
+
+    Sends the stops (chunked and concurrent, via stop_phone), then polls /phone/status
+    until every phone reports Shut down (2) or Expired (3). Only the stragglers are
+    sent another stop, at most every `resend_interval` seconds, until `deadline`.
+
+    Args:
+        ids (list[str]): Cloud phone IDs to stop.
+        deadline (float): Seconds to keep confirming and retrying.
+        poll_interval (float): Seconds between status checks.
+        resend_interval (float): Minimum seconds between two stops sent to the same phone.
+
+    Returns:
+        dict[str, dict]: Per phone ID, {"state": "stopped" | "running" | "failed", "msg": str}.
+            "running" phones were still up at the deadline; "failed" ones were rejected by
+            the API (e.g. unknown ID) or could not be queried.
+    """
+    ids = list(dict.fromkeys(ids))
+    results = {}
+    if not ids:
+        return results
+    started = time.monotonic()
+    last_stop = {}
+    seen_running = set()
+
+    def send_stop(phone_ids):
+        now = time.monotonic()
+        for phone_id in phone_ids:
+            last_stop[phone_id] = now
+        response_data = stop_phone(phone_ids)
+        fail_details = response_data["data"]["failDetails"] if response_data else []
+        for detail in fail_details:
+            if detail.get("code") in NON_RETRYABLE_FAIL_CODES:
+                results[detail["id"]] = {"state": "failed", "msg": detail.get("msg", "rejected by API")}
+
+    send_stop(ids)
+    while True:
+        pending = [phone_id for phone_id in ids if phone_id not in results]
+        if not pending:
+            break
+        status_info = get_phone_status(pending)
+        still_running = []
+        for detail in status_info.get("successDetails", []):
+            if detail.get("status") in (2, 3):
+                results[detail["id"]] = {"state": "stopped", "msg": "shut down" if detail["status"] == 2 else "expired"}
+            else:
+                still_running.append(detail["id"])
+                seen_running.add(detail["id"])
+        for detail in status_info.get("failDetails", []):
+            if detail.get("code") in NON_RETRYABLE_FAIL_CODES:
+                results[detail["id"]] = {"state": "failed", "msg": detail.get("msg", "status query failed")}
+
+        if time.monotonic() - started >= deadline:
+            break
+        now = time.monotonic()
+        to_resend = [phone_id for phone_id in still_running if now - last_stop[phone_id] >= resend_interval]
+        if to_resend:
+            print(f"Re-sending stop to {len(to_resend)} phone(s) that are still running...")
+            send_stop(to_resend)
+        if len(results) < len(ids):
+            time.sleep(poll_interval)
+
+    for phone_id in ids:
+        if phone_id in seen_running:
+            results.setdefault(phone_id, {"state": "running", "msg": f"still running after {deadline:g}s"})
+        else:
+            results.setdefault(phone_id, {"state": "failed", "msg": "could not confirm status"})
+    return results
+
+def get_adb_information(ids: list[str], use_cache: bool = True) -> list[dict]:
     """
     Get ADB connection information for specified cloud phones.
+    Ready results (code 0) are cached per phone until the phone is started/stopped or the
+    entry expires. "Not ready yet" answers such as 49002 (phone not running) are never
+    cached, so callers polling for readiness always reach the API.
 
     Args:
         ids (list[str]): List of cloud phone IDs to get ADB information for
+        use_cache (bool): If False, always ask the API.
 
     Returns:
         list[dict]: List of ADB connection details for each phone.
     """
-    api_url = "https://openapi.geelark.com/open/v1/adb/getData"
-    headers = generate_api_headers(app_id, api_key)
-    payload = {"ids": ids}
+    cached = phone_cache.get_many("adb", ids) if use_cache else {}
+    missing_ids = [phone_id for phone_id in ids if phone_id not in cached]
+    if missing_ids:
+        fetched = _fetch_adb_information(missing_ids)
+        fetched_by_id = {item["id"]: item for item in fetched if "id" in item}
+        phone_cache.set_many("adb", {phone_id: item for phone_id, item in fetched_by_id.items() if item.get("code") == 0})
+        cached.update(fetched_by_id)
+    return [cached[phone_id] for phone_id in ids if phone_id in cached]
+
+def _fetch_adb_information(ids: list[str], retry_rounds: int = 1) -> list[dict]:
+    """
+    Fetch /adb/getData for the given phones, bypassing the cache.
+    IDs are sent in concurrent chunks of 100; chunks whose request failed are retried on their own.
+    """
+    items = {}
+    pending = list(dict.fromkeys(ids))
+    for round_number in range(retry_rounds + 1):
+        if round_number:
+            print(f"Retrying ADB information for {len(pending)} phone(s)...")
+            time.sleep(random.uniform(0.5, 1.5))
+        chunks = _chunked(pending)
+        for response_data in _fan_out(lambda chunk: _post_ids("/adb/getData", chunk, "get ADB information"), chunks):
+            if response_data and response_data.get("code") == 0:
+                for item in response_data.get("data", {}).get("items", []):
+                    items[item.get("id")] = item
+        pending = [phone_id for phone_id in pending if phone_id not in items]
+        if not pending:
+            break
+    return [items[phone_id] for phone_id in ids if phone_id in items]
+
+def iter_available_phones(adb_enabled=True) -> Iterator[PhoneRecord]:
+    """
+    Stream available phones page by page, as soon as each page of the list arrives.
+    Phones are considered available if their remark doesn't contain 'inactive'.
 
-    response = request_with_retry(
-        method="POST",
-        url=api_url,
-        headers=headers,
-        payload=json.dumps(payload),
-        retries=3,
-        backoff=5,
-    )
+    Args:
+        adb_enabled (bool): If True, skip phones whose ADB is not enabled (code 49001).
 
-    if response:
-        try:
-            response_data = response.json()
-            if response_data.get("code") == 0:
-                return response_data.get("data", {}).get("items", [])
-            else:
-                print(f"API Error: {response_data.get('msg')}")
-                return []
-        except Exception as e:
-            print(f"Failed to parse response JSON: {e}")
-            return []
-    else:
-        print("Failed to get ADB information after retries.")
-        return []
+    Yields:
+        PhoneRecord: Available phone with its details (and its ADB endpoint if adb_enabled).
+    """
+    retrieved_any = False
+    for phones in iter_cloud_phone_pages():
+        retrieved_any = retrieved_any or bool(phones)
+
+        # Filter and format available phones
+        table = PhoneTable(
+            PhoneRecord.from_api(phone) for phone in phones
+            if "inactive" not in phone.get("remark", "").lower()
+        )
+
+        if adb_enabled and table:
+            # Get ADB info for this page's phones and filter out those where ADB is not enabled (code 49001)
+            yield from table.join_adb(get_adb_information(table.ids())).without_adb_disabled()
+        else:
+            yield from table
+
+    if not retrieved_any:
+        print("No phones retrieved.")
 
-def get_available_phones(adb_enabled=True) -> list[dict]:
+def get_available_phones(adb_enabled=True) -> list[PhoneRecord]:
     """
     Get a list of available phones based on their remark field.
     Phones are considered available if their remark doesn't contain 'inactive'.
 
     Returns:
-        list[dict]: List of available phones with their details.
+        list[PhoneRecord]: List of available phones with their details.
     """
-    # Get all phones
-    phones = get_all_cloud_phones()
-    if not phones:
-        print("No phones retrieved.")
-        return []
-
-    # Filter and format available phones
-    available_phones = []
-    for phone in phones:
-        remark = phone.get("remark", "").lower()
-        if "inactive" not in remark:
-            equipment_info = phone.get("equipmentInfo", {})
-            phone_info = {
-                "id": phone.get("id"),
-                "name": phone.get("serialName", "Unknown"),
-                "status": "active",
-                "brand": equipment_info.get("deviceBrand", "Unknown"),
-                "model": equipment_info.get("deviceModel", "Unknown")
-            }
-            available_phones.append(phone_info)
-
-    # Get ADB info for available phones
-    phone_ids = [phone["id"] for phone in available_phones]
-    adb_info = get_adb_information(phone_ids)
-
-    if adb_enabled:
-        # Filter out phones where ADB is not enabled (code 49001)
-        return [
-            phone for phone in available_phones
-            if not any(adb["id"] == phone["id"] and adb["code"] == 49001 for adb in adb_info)
-        ]
-    return available_phones
+    return list(iter_available_phones(adb_enabled))
 
 def get_phone_status(ids: list[str]) -> dict:
     """
     Query the status of cloud phones by their IDs.
+    The endpoint takes at most 100 IDs per call; longer lists are split into
+    concurrent chunks and the results merged.
 
     Args:
-        ids (list[str]): List of cloud phone IDs to query status for (max 100 elements)
+        ids (list[str]): List of cloud phone IDs to query status for
 
     Returns:
         dict: Response containing status details for each phone, or empty dict on failure.
@@ -322,39 +890,15 @@ def get_phone_status(ids: list[str]) -> dict:
         ]
     }
     """
-    api_url = "https://openapi.geelark.com/open/v1/phone/status"
-    headers = generate_api_headers(app_id, api_key)
-    payload = {"ids": ids}
-
-    response = request_with_retry(
-        method="POST",
-        url=api_url,
-        headers=headers,
-        payload=json.dumps(payload),
-        retries=3,
-        backoff=5,
-    )
-
-    if response:
-        try:
-            response_data = response.json()
-            if response_data.get("code") == 0:
-                return response_data.get("data", {})
-            else:
-                print(f"API Error: {response_data.get('msg')}")
-                return {}
-        except Exception as e:
-            print(f"Failed to parse response JSON: {e}")
-            return {}
-    else:
-        print("Failed to get phone status after retries.")
+    response_data = _batched_call(lambda chunk: _post_ids("/phone/status", chunk, "get phone status"), ids)
+    if response_data["code"] != 0:
         return {}
+    return response_data["data"]
 
 if __name__ == '__main__':
     print("Getting available phones (excluding those with ADB not enabled)...")
     available_phones = get_available_phones()
     print("\nAvailable phones:")
-    print(json.dumps(available_phones, indent=4))
-
-
-
+    print(json.dumps([phone.to_dict() for phone in available_phones], indent=4))
+    print("\nConnection reuse:")
+    print(json.dumps(get_client().connection_stats(), indent=4))
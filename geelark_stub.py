@@ -0,0 +1,351 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import Callable
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    """Serves the Geelark OpenAPI endpoints from the owning GeelarkStubServer's state."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send(400, {"code": 400, "msg": "invalid json"})
+            return
+
+        if stub.latency:
+            time.sleep(stub.latency)
+
+        route = self.path.split("/open/v1", 1)[-1]
+        handler = stub.routes.get(route)
+        if handler is None:
+            self._send(404, {"code": 404, "msg": f"unknown endpoint {route}"})
+            return
+
+        retry_after = stub.take_token()
+        if retry_after is not None:
+            stub.count("rate_limited")
+            self._send(429, {"code": 429, "msg": "too many requests"}, {"Retry-After": f"{retry_after:.2f}"})
+            return
+        if stub.failure_rate and random.random() < stub.failure_rate:
+            stub.count("injected_failures")
+            self._send(500, {"code": 500, "msg": "internal server error"})
+            return
+        signature_error = stub.check_signature(self.headers)
+        if signature_error:
+            stub.count("bad_signatures")
+            self._send(200, {"code": 40001, "msg": signature_error, "traceId": self.headers.get("traceId")})
+            return
+
+        with stub.lock:
+            stub.request_counts[route] = stub.request_counts.get(route, 0) + 1
+            data = handler(payload)
+        self._send(200, {"code": 0, "msg": "success", "traceId": self.headers.get("traceId"), "data": data})
+
+    def _send(self, status: int, body: dict, headers: dict = None):
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, format, *args):
+        pass  # keep load tests quiet
+
+def boot_time_sampler(distribution: str, mean: float) -> Callable[[], float]:
+    """
+    Build a boot-time sampler for GeelarkStubServer.
+
+    Args:
+        distribution (str): "fixed", "uniform" (mean ±20%), "normal" (sd = mean/4)
+                            or "lognormal" (median = mean, long right tail like real boots).
+        mean (float): Typical boot time in seconds.
+
+    Returns:
+        Callable[[], float]: Returns one boot time in seconds per call.
+    """
+    if distribution == "fixed":
+        return lambda: mean
+    if distribution == "uniform":
+        return lambda: mean * random.uniform(0.8, 1.2)
+    if distribution == "normal":
+        return lambda: max(0.0, random.gauss(mean, mean / 4))
+    if distribution == "lognormal":
+        return lambda: mean * random.lognormvariate(0, 0.35)
+    raise ValueError(f"Unknown boot time distribution: {distribution}")
+
+class GeelarkStubServer:
+    """
+    Local stand-in for openapi.geelark.com used to exercise the API clients offline.
+
+    Implements /phone/list, /phone/start, /phone/stop, /phone/status and /adb/getData
+    over an in-memory fleet. Started phones report status 1 (Starting) until their
+    boot time has elapsed, then 0 (Started).
+
+    Besides the happy path it can simulate the ways the real API misbehaves: signed
+    requests are checked like generate_api_headers signs them, requests over the rate
+    limit get 429 with Retry-After, a share of requests fail with HTTP 500, a share of
+    phones fail to start, and phones without ADB enabled answer /adb/getData with 49001.
+
+    Args:
+        phone_count (int): Number of cloud phones in the fake account.
+        boot_seconds (float): Typical time a phone spends in the Starting state.
+        latency (float): Artificial server-side delay per request, in seconds.
+        host (str): Interface to bind to.
+        port (int): Port to bind to; 0 picks a free one.
+        boot_distribution (str): Shape of the boot times, see boot_time_sampler.
+        app_id (str): If set together with api_key, requests must carry a valid signature.
+        api_key (str): The key the signature is checked against.
+        failure_rate (float): Probability that a request fails with HTTP 500.
+        start_failure_rate (float): Probability that one phone in a /phone/start call fails to start.
+        rate_limit (float): Requests per second accepted before answering 429 (None = unlimited).
+        adb_disabled_ratio (float): Share of phones that have ADB disabled (49001).
+        seed (int): Seed for the random failures and boot times, for reproducible runs.
+    """
+
+    def __init__(
+        self,
+        phone_count: int = 10,
+        boot_seconds: float = 2.0,
+        latency: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        boot_distribution: str = "uniform",
+        app_id: str = None,
+        api_key: str = None,
+        failure_rate: float = 0.0,
+        start_failure_rate: float = 0.0,
+        rate_limit: float = None,
+        adb_disabled_ratio: float = 0.0,
+        seed: int = None):
+        if seed is not None:
+            random.seed(seed)
+        self.boot_seconds = boot_seconds
+        self.sample_boot_time = boot_time_sampler(boot_distribution, boot_seconds)
+        self.latency = latency
+        self.app_id = app_id
+        self.api_key = api_key
+        self.failure_rate = failure_rate
+        self.start_failure_rate = start_failure_rate
+        self.rate_limit = rate_limit
+        self._tokens = rate_limit or 0.0
+        self._tokens_updated = time.monotonic()
+        self.lock = threading.Lock()
+        self.request_counts = {}
+        self.event_counts = {}
+        self.phones = {}
+        adb_disabled_count = round(phone_count * adb_disabled_ratio)
+        for i in range(phone_count):
+            phone_id = str(500000000000000000 + i)
+            self.phones[phone_id] = {
+                "id": phone_id,
+                "serialName": f"stub-{i + 1:04d}",
+                "remark": "",
+                "equipmentInfo": {"deviceBrand": "google", "deviceModel": "Pixel 6"},
+                "status": 2,
+                "ready_at": None,
+                "adb_enabled": i >= adb_disabled_count,
+            }
+        self.routes = {
+            "/phone/list": self._phone_list,
+            "/phone/start": self._phone_start,
+            "/phone/stop": self._phone_stop,
+            "/phone/status": self._phone_status,
+            "/adb/getData": self._adb_get_data,
+        }
+        self._server = ThreadingHTTPServer((host, port), _StubRequestHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to pass to geelark_api.configure_client(base_url=...)."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/open/v1"
+
+    def start(self) -> "GeelarkStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- Simulated API behaviour ---
+
+    def count(self, event: str):
+        with self.lock:
+            self.event_counts[event] = self.event_counts.get(event, 0) + 1
+
+    def take_token(self) -> float | None:
+        """Server-side token bucket; returns the Retry-After seconds if the request is over the limit."""
+        if not self.rate_limit:
+            return None
+        with self.lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._tokens_updated) * self.rate_limit)
+            self._tokens_updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            return (1 - self._tokens) / self.rate_limit
+
+    def check_signature(self, headers) -> str | None:
+        """Validates the headers built by generate_api_headers; returns an error message or None."""
+        if not (self.app_id and self.api_key):
+            return None
+        missing = [name for name in ("appId", "traceId", "ts", "nonce", "sign") if not headers.get(name)]
+        if missing:
+            return f"missing headers: {', '.join(missing)}"
+        if headers["appId"] != self.app_id:
+            return "unknown appId"
+        if headers["nonce"] != headers["traceId"][:6]:
+            return "nonce does not match traceId"
+        try:
+            skew = abs(time.time() * 1000 - int(headers["ts"]))
+        except ValueError:
+            return "invalid ts"
+        if skew > 5 * 60 * 1000:
+            return "ts out of range"
+        sign_str = self.app_id + headers["traceId"] + headers["ts"] + headers["nonce"] + self.api_key
+        if headers["sign"] != hashlib.sha256(sign_str.encode("utf-8")).hexdigest().upper():
+            return "signature verification failed"
+        return None
+
+    # --- Endpoint handlers (called with self.lock held) ---
+
+    def _current_status(self, phone: dict) -> int:
+        if phone["status"] == 1 and phone["ready_at"] is not None and time.time() >= phone["ready_at"]:
+            phone["status"] = 0
+        return phone["status"]
+
+    def _public(self, phone: dict) -> dict:
+        return {key: value for key, value in phone.items() if key not in ("ready_at", "adb_enabled")}
+
+    def _phone_list(self, payload: dict) -> dict:
+        items = list(self.phones.values())
+        if payload.get("ids"):
+            wanted = set(payload["ids"])
+            items = [phone for phone in items if phone["id"] in wanted]
+        page = payload.get("page") or 1
+        page_size = payload.get("pageSize") or 10
+        start = (page - 1) * page_size
+        return {
+            "total": len(items),
+            "page": page,
+            "pageSize": page_size,
+            "items": [self._public(phone) for phone in items[start:start + page_size]],
+        }
+
+    def _batch(self, ids: list, apply) -> dict:
+        success, fail = [], []
+        for phone_id in ids:
+            phone = self.phones.get(phone_id)
+            if phone is None:
+                fail.append({"code": 42001, "id": phone_id, "msg": "cloud phone does not exist"})
+            else:
+                success.append(apply(phone))
+        return {
+            "totalAmount": len(ids),
+            "successAmount": len(success),
+            "failAmount": len(fail),
+            "successDetails": success,
+            "failDetails": fail,
+        }
+
+    def _phone_start(self, payload: dict) -> dict:
+        def start(phone):
+            if self._current_status(phone) != 0:
+                phone["status"] = 1
+                phone["ready_at"] = time.time() + self.sample_boot_time()
+            return {"id": phone["id"], "url": f"https://stub.local/phone/{phone['id']}"}
+
+        ids = payload.get("ids", [])
+        failed = {phone_id for phone_id in ids if phone_id in self.phones and random.random() < self.start_failure_rate}
+        result = self._batch([phone_id for phone_id in ids if phone_id not in failed], start)
+        for phone_id in failed:
+            self.event_counts["start_failures"] = self.event_counts.get("start_failures", 0) + 1
+            result["failDetails"].append({"code": 42002, "id": phone_id, "msg": "cloud phone failed to start"})
+        result["totalAmount"] = len(ids)
+        result["failAmount"] = len(result["failDetails"])
+        return result
+
+    def _phone_stop(self, payload: dict) -> dict:
+        def stop(phone):
+            phone["status"] = 2
+            phone["ready_at"] = None
+            return {"id": phone["id"]}
+        return self._batch(payload.get("ids", []), stop)
+
+    def _phone_status(self, payload: dict) -> dict:
+        def status(phone):
+            return {"id": phone["id"], "serialName": phone["serialName"], "status": self._current_status(phone)}
+        return self._batch(payload.get("ids", []), status)
+
+    def _adb_get_data(self, payload: dict) -> dict:
+        items = []
+        for index, phone_id in enumerate(payload.get("ids", [])):
+            phone = self.phones.get(phone_id)
+            if phone is not None and not phone["adb_enabled"]:
+                items.append({"id": phone_id, "code": 49001, "msg": "ADB is not enabled for this cloud phone"})
+            elif phone is None or self._current_status(phone) != 0:
+                items.append({"id": phone_id, "code": 49002, "msg": "cloud phone is not running"})
+            else:
+                items.append({"id": phone_id, "code": 0, "ip": "127.0.0.1", "port": str(20000 + index), "pwd": "stubpwd"})
+        return {"items": items}
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local Geelark OpenAPI stub.")
+    parser.add_argument("--phones", type=int, default=10)
+    parser.add_argument("--boot-seconds", type=float, default=2.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--boot-distribution", choices=["fixed", "uniform", "normal", "lognormal"], default="uniform")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--start-failure-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--adb-disabled-ratio", type=float, default=0.0)
+    parser.add_argument("--app-id", default=None, help="Check request signatures against this appId/apiKey pair")
+    parser.add_argument("--api-key", default=None)
+    args = parser.parse_args()
+
+    server = GeelarkStubServer(
+        args.phones,
+        args.boot_seconds,
+        args.latency,
+        port=args.port,
+        boot_distribution=args.boot_distribution,
+        app_id=args.app_id,
+        api_key=args.api_key,
+        failure_rate=args.failure_rate,
+        start_failure_rate=args.start_failure_rate,
+        rate_limit=args.rate_limit,
+        adb_disabled_ratio=args.adb_disabled_ratio,
+    ).start()
+    print(f"Geelark stub serving {args.phones} phones at {server.url} (Ctrl+C to stop)")
+    print(f"Point the clients at it with: geelark_base_url={server.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
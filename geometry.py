@@ -0,0 +1,127 @@
+import threading
+import time
+
+class ScreenGeometry:
+    """
+    What is known about the screen of one driver session.
+
+    `width`/`height` come from one get_window_size() call. `rotation` and the navigation
+    bar and tab bounds are filled in from page_source snapshots, which the screen
+    classifier takes anyway, so they cost no extra round trips.
+    """
+
+    __slots__ = ("width", "height", "rotation", "nav_bar", "tabs", "fetched_at", "stale")
+
+    def __init__(self):
+        self.width = None
+        self.height = None
+        self.rotation = None
+        self.nav_bar = None  # (x1, y1, x2, y2)
+        self.tabs = {}       # content-desc -> (x1, y1, x2, y2)
+        self.fetched_at = 0.0
+        self.stale = True  # the window size has to be (re)fetched
+
+    def tab_center(self, name: str) -> tuple[int, int] | None:
+        bounds = self.tabs.get(name)
+        if bounds is None:
+            return None
+        x1, y1, x2, y2 = bounds
+        return (x1 + x2) // 2, (y1 + y2) // 2
+
+    def __repr__(self):
+        return f"ScreenGeometry(width={self.width!r}, height={self.height!r}, rotation={self.rotation!r}, tabs={list(self.tabs)!r})"
+
+class GeometryCache:
+    """
+    Screen geometry per driver session, so gestures and tab taps are computed without
+    asking the device every time.
+
+    Entries are keyed by the driver's session ID: a restarted session starts from scratch.
+    The window size is fetched once per session and again only after an orientation change,
+    noticed from the `rotation` of an observed snapshot or reported with invalidate().
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.counts = {"hits": 0, "fetches": 0}
+
+    @staticmethod
+    def _key(driver):
+        return getattr(driver, "session_id", None) or id(driver)
+
+    def _entry(self, driver) -> ScreenGeometry:
+        key = self._key(driver)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = ScreenGeometry()
+            return entry
+
+    def get(self, driver, refresh: bool = False) -> ScreenGeometry | None:
+        """
+        The session's geometry, fetching the window size if it is not known (or `refresh`).
+
+        Returns:
+            ScreenGeometry | None: The geometry, or None if the window size could not be read.
+        """
+        entry = self._entry(driver)
+        if not (refresh or entry.stale):
+            self.counts["hits"] += 1
+            return entry
+        try:
+            window_size = driver.get_window_size()
+        except Exception as e:
+            print(f"Error getting screen dimensions: {e}")
+            return None
+        self.counts["fetches"] += 1
+        width, height = window_size.get("width"), window_size.get("height")
+        if width is None or height is None:
+            print("WARNING: Could not get window dimensions, driver.get_window_size() returned None for width/height.")
+            return None
+        entry.width, entry.height = int(width), int(height)
+        entry.fetched_at = time.monotonic()
+        entry.stale = False
+        return entry
+
+    def dimensions(self, driver) -> tuple[int | None, int | None]:
+        """(width, height) of the session's screen, (None, None) if unknown."""
+        entry = self.get(driver)
+        return (entry.width, entry.height) if entry is not None else (None, None)
+
+    def tab_center(self, driver, name: str) -> tuple[int, int] | None:
+        """Center of navigation tab `name` as last seen in a snapshot of this session; never asks the device."""
+        with self._lock:
+            entry = self._entries.get(self._key(driver))
+        return entry.tab_center(name) if entry is not None else None
+
+    def observe(self, driver, state):
+        """
+        Update a session's geometry from a screens.ScreenState: a changed rotation marks the
+        window size stale and drops the tab bounds; nav bar and tab bounds are remembered.
+        """
+        entry = self._entry(driver)
+        if state.rotation is not None:
+            if entry.rotation is not None and state.rotation != entry.rotation:
+                entry.stale = True
+                entry.nav_bar, entry.tabs = None, {}
+            entry.rotation = state.rotation
+        if state.nav_bar is not None and state.tabs:
+            entry.nav_bar = state.nav_bar
+            entry.tabs = dict(state.tabs)
+
+    def invalidate(self, driver):
+        """Forget the session's geometry, e.g. after rotating the device or when closing the session."""
+        with self._lock:
+            self._entries.pop(self._key(driver), None)
+
+_cache: GeometryCache | None = None
+_cache_lock = threading.Lock()
+
+def get_geometry_cache() -> GeometryCache:
+    """Returns the process-wide geometry cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = GeometryCache()
+        return _cache
@@ -1,6 +1,5 @@
 from appium import webdriver
 from appium.options.android import UiAutomator2Options
-from appium.webdriver.common.appiumby import AppiumBy
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.actions import interaction
 from selenium.webdriver.common.actions.action_builder import ActionBuilder
@@ -9,26 +8,21 @@ from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from rich import print as rprint
-import time 
 import random
 import logging
+from screens import NAV_BAR_ID, wait_for_screen
+from geometry import get_geometry_cache
+from locators import locator, nav_tab
 
 log = rprint
-NAV_BAR_ID = "com.bumble.app:id/mainApp_navigationTabBar" # Define as a constant
 
 def get_screen_dimensions(driver):
-    """Gets the current screen width and height."""
-    try:
-        window_size = driver.get_window_size()
-        width = window_size.get('width')
-        height = window_size.get('height')
-        if width is None or height is None:
-            print("WARNING: Could not get window dimensions, driver.get_window_size() returned None for width/height.")
-            return None, None # Or raise an error, or return defaults
-        return int(width), int(height)
-    except Exception as e:
-        print(f"Error getting screen dimensions: {e}")
-        return None, None
+    """
+    Gets the current screen width and height.
+    Served from the session's geometry cache; the device is only asked once per session
+    and after an orientation change. Returns (None, None) if the size cannot be read.
+    """
+    return get_geometry_cache().dimensions(driver)
 def handle_adjust_filters_prompt(driver, timeout=3):
     """
     Checks for the "Adjust your filters" prompt (out of nearby profiles) and clicks the button.
@@ -40,13 +34,9 @@ def handle_adjust_filters_prompt(driver, timeout=3):
     Returns:
         bool: True if the prompt was detected and handled, False otherwise.
     """
-    # Define locators based on the XML
     # Using a more specific text that's less likely to appear elsewhere by chance
-    identifier_text_locator = (AppiumBy.XPATH, '//android.widget.TextView[contains(@text, "You’ve seen everyone nearby")]')
-    adjust_button_text_locator = (AppiumBy.XPATH, '//android.widget.TextView[@text="Adjust your filters"]')
-    
-    # More robust locator for the clickable button container:
-    adjust_button_clickable_container_locator = (AppiumBy.XPATH, "//android.view.View[@clickable='true' and .//android.widget.TextView[@text='Adjust your filters']]")
+    identifier_text_locator = locator("adjust_filters_title")
+    adjust_button_locator = locator("adjust_filters_button")
 
 
     try:
@@ -57,15 +47,15 @@ def handle_adjust_filters_prompt(driver, timeout=3):
         log("[green]Detected 'Adjust your filters' prompt (Out of nearby profiles).[/green]")
 
         # 2. If identifying text is found, find and click the "Adjust your filters" button.
-        #    It's better to click the clickable container View.
         adjust_button = WebDriverWait(driver, timeout).until(
-            EC.element_to_be_clickable(adjust_button_clickable_container_locator)
+            EC.element_to_be_clickable(adjust_button_locator)
         )
         adjust_button.click()
         log("[green]Clicked 'Adjust your filters' button.[/green]")
         
-        # Optional: Add a small delay to allow the UI to transition to the filter screen
-        time.sleep(2) 
+        # Wait (briefly) for the filter screen rather than a fixed delay; the slider wait in
+        # adjust_age_filter_and_apply covers a slower transition.
+        wait_for_screen(driver, lambda state: state.filters, timeout=3)
         
         return True # Prompt was handled
 
@@ -87,6 +77,10 @@ def adjust_age_filter_and_apply(driver, timeout=15):
     and clicks 'Apply'.
     Assumes the driver is already on the filter settings page where the age slider is visible.
 
+    The thumb and track rects come from one page_source snapshot, the thumb is moved with a
+    single drag gesture, and Apply is tapped once snapshots show it enabled; the routine
+    returns as soon as the filter screen has closed (no fixed delays).
+
     Args:
         driver: The Appium WebDriver instance.
         timeout (int): Maximum time to wait for elements.
@@ -96,29 +90,23 @@ def adjust_age_filter_and_apply(driver, timeout=15):
     """
     log("[yellow]Attempting to adjust age filter to a high random value and apply...[/yellow]")
 
-    higher_age_thumb_locator = (AppiumBy.XPATH, '//com.badoo.mobile.component.rangebar.RangeBarItem[@content-desc="Higher age"]')
-    slider_track_locator = (AppiumBy.ID, "com.bumble.app:id/range_bar_item")
-    apply_button_locator = (
-        AppiumBy.XPATH,
-        "//android.widget.Button[contains(@text, 'Apply') or contains(@text, 'APPLY')] | "
-        "//android.widget.TextView[@clickable='true' and (contains(@text, 'Apply') or contains(@text, 'APPLY'))] | "
-        "//android.view.View[@clickable='true' and .//android.widget.TextView[contains(@text, 'Apply') or contains(@text, 'APPLY')]]"
-    )
+    apply_button_locator = locator("apply_button")
+    slider_ready = lambda state: state.bounds("higher_age_thumb") is not None and state.bounds("age_slider") is not None
 
     try:
+        # Both rects come from one hierarchy snapshot instead of .location/.size on each element.
         log("[yellow]Locating age slider elements...[/yellow]")
-        higher_age_thumb = WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located(higher_age_thumb_locator)
-        )
-        slider_track = WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located(slider_track_locator)
-        )
+        state = wait_for_screen(driver, slider_ready, timeout=timeout)
+        if state is None or not slider_ready(state):
+            raise TimeoutException("Age slider not found on the filter screen")
         log("[green]Age slider elements located.[/green]")
 
-        thumb_location = higher_age_thumb.location
-        thumb_size = higher_age_thumb.size
-        track_location = slider_track.location
-        track_size = slider_track.size
+        thumb_x1, thumb_y1, thumb_x2, thumb_y2 = state.bounds("higher_age_thumb")
+        track_x1, _, track_x2, _ = state.bounds("age_slider")
+        thumb_location = {'x': thumb_x1, 'y': thumb_y1}
+        thumb_size = {'width': thumb_x2 - thumb_x1, 'height': thumb_y2 - thumb_y1}
+        track_location = {'x': track_x1}
+        track_size = {'width': track_x2 - track_x1}
 
         start_x = thumb_location['x'] + thumb_size['width'] // 2
         start_y = thumb_location['y'] + thumb_size['height'] // 2
@@ -185,14 +173,26 @@ def adjust_age_filter_and_apply(driver, timeout=15):
             })
             log("[green]Higher age thumb dragged.[/green]")
 
-        time.sleep(2) # UI update
-        log("[yellow]Locating and clicking 'Apply' button...[/yellow]")
-        apply_button = WebDriverWait(driver, timeout).until(
-            EC.element_to_be_clickable(apply_button_locator)
-        )
-        apply_button.click()
+        # Wait for the slider to settle (thumb moved, Apply enabled) rather than a fixed delay.
+        thumb_before = state.bounds("higher_age_thumb")
+        apply_enabled = lambda s: s.is_enabled("filters_apply")
+        state = wait_for_screen(driver, lambda s: apply_enabled(s) and (target_x == start_x or s.bounds("higher_age_thumb") != thumb_before), timeout=3)
+        if state is None or not apply_enabled(state):
+            state = wait_for_screen(driver, apply_enabled, timeout=timeout)
+        if state is None or not apply_enabled(state):
+            raise TimeoutException("Apply button not enabled")
+
+        log("[yellow]Clicking 'Apply' button...[/yellow]")
+        apply_x1, apply_y1, apply_x2, apply_y2 = state.bounds("filters_apply")
+        driver.execute_script('mobile: clickGesture', {'x': (apply_x1 + apply_x2) // 2, 'y': (apply_y1 + apply_y2) // 2})
+        state = wait_for_screen(driver, lambda s: not s.filters, timeout=3)
+        if state is None or state.filters:
+            log("[yellow]Filter screen still open after tapping 'Apply'. Clicking the button element...[/yellow]")
+            WebDriverWait(driver, timeout).until(EC.element_to_be_clickable(apply_button_locator)).click()
+            state = wait_for_screen(driver, lambda s: not s.filters, timeout=timeout)
+            if state is None or state.filters:
+                raise TimeoutException("Filter screen did not close after Apply")
         log("[green]Clicked 'Apply' button.[/green]")
-        time.sleep(3) # Filters apply
 
         return True
 
@@ -211,16 +211,8 @@ def adjust_age_filter_and_apply(driver, timeout=15):
 
 def is_nav_bar_present(driver, timeout=3):
     """Checks if the main navigation bar is present and displayed."""
-    try:
-        nav_bar_element = WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((AppiumBy.ID, NAV_BAR_ID))
-        )
-        return nav_bar_element.is_displayed() # Also check if it's actually visible
-    except TimeoutException:
-        return False
-    except Exception as e:
-        log(f"[yellow]Debug (is_nav_bar_present): Unexpected error checking nav bar: {e}[/yellow]")
-        return False
+    state = wait_for_screen(driver, lambda s: s.nav_bar is not None, timeout=timeout)
+    return state is not None and state.nav_bar is not None
 
 
 def get_current_screen_by_tab(driver: webdriver.Remote, timeout=5):
@@ -228,46 +220,57 @@ def get_current_screen_by_tab(driver: webdriver.Remote, timeout=5):
     Determines the current screen by checking the selected tab in the main navigation bar.
     Returns a screen identifier (e.g., "LIKED_YOU_SCREEN") or an "UNKNOWN_SCREEN..." status.
     Returns "NAV_BAR_NOT_FOUND" if the navigation bar itself is not present.
+
+    Reads the tab from page_source snapshots (screens.classify_screen), so a screen that
+    is already showing costs one round trip.
     """
-    if not is_nav_bar_present(driver, timeout=max(1, timeout // 2)): # Use a portion of the main timeout
-        log(f"[yellow]Debug (get_current_screen_by_tab): rain navigation bar ('{NAV_BAR_ID}') not found or not displayed.[/yellow]")
+    has_tab = lambda state: state.tab is not None
+    state = wait_for_screen(driver, has_tab, timeout=max(1, timeout // 2)) # Use a portion of the main timeout
+    if state is None:
+        log(f"[red]An unexpected error occurred in get_current_screen_by_tab: could not take a screen snapshot.[/red]")
+        return "UNKNOWN_SCREEN_ERROR_(SNAPSHOT_FAILED)"
+
+    if state.nav_bar is None:
+        log(f"[yellow]Debug (get_current_screen_by_tab): Main navigation bar ('{NAV_BAR_ID}') not found or not displayed.[/yellow]")
         log(f"[yellow]Backing out..[/yellow]")
         driver.back()
-        if not is_nav_bar_present(driver, timeout=max(1, timeout // 2)): # Use a portion of the main timeout
+        state = wait_for_screen(driver, has_tab, timeout=max(1, timeout // 2))
+        if state is None or state.nav_bar is None:
             log(f"[yellow]Debug (get_current_screen_by_tab): Main navigation bar ('{NAV_BAR_ID}') not found or not displayed.[/yellow]")
             return "NAV_BAR_NOT_FOUND" # Specific return value for this case
-    
-    try:
-        # Nav bar is confirmed present, proceed to find selected tab
-        selected_tab_xpath = f"//*[@resource-id='{NAV_BAR_ID}']//android.view.ViewGroup[@selected='true' and @content-desc]"
-        
-        selected_tab_element = WebDriverWait(driver, timeout).until(
-            EC.presence_of_element_located((AppiumBy.XPATH, selected_tab_xpath))
-        )
-        
-        content_desc = selected_tab_element.get_attribute("content-desc")
-        
-        if content_desc:
-            screen_name = content_desc.upper().replace(" ", "_") + "_SCREEN"
-            return screen_name
-        else:
-            return "UNKNOWN_SCREEN_SELECTED_TAB_HAS_NO_CONTENT_DESC"
-            
-    except TimeoutException:
-        # This timeout now specifically means the *selected tab* wasn't found, as nav_bar presence was checked.
+
+    if state.tab is None:
         log(f"[yellow]Debug (get_current_screen_by_tab): Nav bar present, but selected tab not found within {timeout}s.[/yellow]")
-        return "UNKNOWN_SCREEN_SELECTED_TAB_NOT_FOUND_IN_NAV_BAR"
-    except NoSuchElementException: # Should be caught by TimeoutException
-        log(f"[yellow]Debug (get_current_screen_by_tab): NoSuchElementException for selected tab.[/yellow]")
-        return "UNKNOWN_SCREEN_SELECTED_TAB_NOT_FOUND_IN_NAV_BAR_NSE"
+    return state.screen_id
+def tap_tab(driver: webdriver.Remote, page_name_from_ui, verification_timeout=2):
+    """
+    Taps a navigation tab at the position remembered from earlier snapshots of this session
+    and verifies the tab got selected with a snapshot.
+
+    Returns:
+        bool: True if the tab is now selected; False if its position is not known yet or the
+              tap did not select it (the snapshot taken for verification refreshes the positions).
+    """
+    center = get_geometry_cache().tab_center(driver, page_name_from_ui)
+    if center is None:
+        return False
+    try:
+        driver.execute_script('mobile: clickGesture', {'x': center[0], 'y': center[1]})
     except Exception as e:
-        log(f"[red]An unexpected error occurred in get_current_screen_by_tab (after nav bar check): {e}[/red]")
-        return f"UNKNOWN_SCREEN_ERROR_({type(e).__name__})"
+        log(f"[yellow]Debug (tap_tab): Tap on '{page_name_from_ui}' at {center} failed: {e}[/yellow]")
+        return False
+    state = wait_for_screen(driver, lambda s: s.tab == page_name_from_ui, timeout=verification_timeout)
+    return state is not None and state.tab == page_name_from_ui
+
 # --- Improved open_page function ---
-def open_page(driver: webdriver.Remote, page_name_from_ui, navigation_timeout=10, verification_timeout=5,logger_func: logging.Logger = rprint):
+def open_page(driver: webdriver.Remote, page_name_from_ui, navigation_timeout=10, verification_timeout=5,logger_func: logging.Logger = rprint, use_cached_bounds=True):
     """
     Navigates to the specified page using the bottom navigation bar if not already there.
 
+    Once a snapshot has shown the navigation bar, the tab is tapped at its known position
+    (tap_tab: one tap plus a snapshot to verify); if that does not land, the tab element
+    is looked up and clicked instead.
+
     Args:
         driver: The Appium WebDriver instance.
         page_name_from_ui (str): The exact text from the 'content-desc' of the tab 
@@ -275,6 +278,7 @@ def open_page(driver: webdriver.Remote, page_name_from_ui, navigation_timeout=10
                                  This is case-sensitive.
         navigation_timeout (int): Max time to wait for tab clicking.
         verification_timeout (int): Max time to wait for screen verification after click.
+        use_cached_bounds (bool): Try the coordinate tap before the element lookup.
 
     Returns:
         bool: True if successfully on the page, False otherwise.
@@ -283,7 +287,6 @@ def open_page(driver: webdriver.Remote, page_name_from_ui, navigation_timeout=10
     log = logger_func
     # Standardize the target screen name for comparison with get_current_screen_by_tab
     target_screen_id = page_name_from_ui.upper().replace(" ", "_") + "_SCREEN"
-    nav_bar_id = "com.bumble.app:id/mainApp_navigationTabBar"
 
     log(f"[yellow]Attempting to navigate to or verify '{page_name_from_ui}' (Target ID: {target_screen_id}).[/yellow]")
 
@@ -296,33 +299,37 @@ def open_page(driver: webdriver.Remote, page_name_from_ui, navigation_timeout=10
         log(f"[green]Already on the '{page_name_from_ui}' page.[/green]")
         return True
     
-    # 2. If not on the target page, or if nav bar wasn't found (could be a popup)
+    # 2. Fast path: the nav bar is showing, so tap the tab where the snapshots placed it
+    nav_bar_seen = current_screen != "NAV_BAR_NOT_FOUND" and not current_screen.startswith("UNKNOWN_SCREEN_ERROR")
+    if use_cached_bounds and nav_bar_seen and tap_tab(driver, page_name_from_ui, verification_timeout=min(2, verification_timeout)):
+        log(f"[green]Tapped and verified the '{page_name_from_ui}' tab.[/green]")
+        return True
+
+    # 3. If not on the target page, or if nav bar wasn't found (could be a popup)
     #    Attempt to click the target tab.
     #    The `content-desc` should match `page_name_from_ui`.
-    tab_to_click_xpath = f"//*[@resource-id='{nav_bar_id}']//android.view.ViewGroup[@content-desc='{page_name_from_ui}']"
+    tab_locator = nav_tab(page_name_from_ui).preferred
 
     try:
         log(f"[yellow]Not on '{page_name_from_ui}'. Attempting to click tab with content-desc: '{page_name_from_ui}'.[/yellow]")
         
         # Ensure the navigation bar itself is present first
         WebDriverWait(driver, navigation_timeout).until(
-            EC.presence_of_element_located((AppiumBy.ID, nav_bar_id))
+            EC.presence_of_element_located(locator("nav_bar"))
         )
         
         # Find and click the target tab
         tab_element = WebDriverWait(driver, navigation_timeout).until(
-            EC.element_to_be_clickable((AppiumBy.XPATH, tab_to_click_xpath))
+            EC.element_to_be_clickable(tab_locator)
         )
         tab_element.click()
         log(f"[green]Clicked on the '{page_name_from_ui}' tab.[/green]")
 
-        # 3. Verify navigation
-        #    Wait until get_current_screen_by_tab confirms we are on the target screen.
-        #    This lambda function will be re-evaluated by WebDriverWait.
-        WebDriverWait(driver, verification_timeout).until(
-            lambda d: get_current_screen_by_tab(d, timeout=1) == target_screen_id, # Use a short timeout for each check inside lambda
-            message=f"Failed to verify navigation to '{target_screen_id}' after clicking tab."
-        )
+        # 4. Verify navigation
+        #    One snapshot per check until the target tab shows as selected.
+        state = wait_for_screen(driver, lambda s: s.tab == page_name_from_ui, timeout=verification_timeout)
+        if state is None or state.tab != page_name_from_ui:
+            raise TimeoutException(f"Failed to verify navigation to '{target_screen_id}' after clicking tab.")
         
         log(f"[green]Successfully navigated to and verified '{page_name_from_ui}' page.[/green]")
         return True
@@ -0,0 +1,189 @@
+import multiprocessing
+import threading
+import time
+from collections import deque
+from typing import Callable
+from adbclient import AdbClient, AdbError, get_adb_client
+
+class DeviceWatch:
+    """
+    Cross-process view of one device's presence, fed by the orchestrator's DeviceTracker.
+
+    Create in the parent, hand to the tracker with DeviceTracker.subscribe() and to the
+    worker process as a Process argument. The device counts as present until the tracker
+    reports otherwise.
+    """
+
+    def __init__(self):
+        self._present = multiprocessing.Event()
+        self._present.set()
+        self._detaches = multiprocessing.Value("i", 0)
+
+    def update(self, state: str | None):
+        """Called by the tracker with the device's adb state (None once it is gone)."""
+        if state == "device":
+            self._present.set()
+        elif self._present.is_set():
+            self._present.clear()
+            with self._detaches.get_lock():
+                self._detaches.value += 1
+
+    def is_present(self) -> bool:
+        return self._present.is_set()
+
+    @property
+    def detaches(self) -> int:
+        """How many times the device went away."""
+        return self._detaches.value
+
+    def wait_present(self, timeout: float = None) -> bool:
+        """Block until the device is present; False if it did not come back within `timeout`."""
+        return self._present.wait(timeout)
+
+    def guard(self, pause_timeout: float = 0.0, log: Callable = print) -> Callable[[], bool]:
+        """
+        A check for automation loops to call before each round of device commands.
+
+        Returns:
+            Callable[[], bool]: True to carry on. When the device is detached it pauses up to
+                                `pause_timeout` seconds for it to come back (resume, True) and
+                                otherwise gives up (fail fast, False); 0 fails fast right away.
+        """
+        def device_guard() -> bool:
+            if self.is_present():
+                return True
+            if pause_timeout <= 0:
+                log("[red]Device detached. Stopping instead of waiting for command timeouts.[/red]")
+                return False
+            log(f"[yellow]Device detached. Pausing up to {pause_timeout:.0f}s for it to come back...[/yellow]")
+            if self.wait_present(pause_timeout):
+                log("[green]Device is back. Resuming.[/green]")
+                return True
+            log("[red]Device did not come back. Stopping.[/red]")
+            return False
+        return device_guard
+
+class DeviceTracker:
+    """
+    Keeps a live table of the adb server's devices by streaming host:track-devices-l
+    on a background thread, and publishes attach/detach events.
+
+    In-process subscribers register callbacks with add_listener(); worker processes get a
+    DeviceWatch per device through subscribe(). If the stream breaks (e.g. the adb server
+    restarts) every device is reported detached and the tracker reconnects.
+
+    Args:
+        client (AdbClient): adb client to use (defaults to the process-wide one).
+        reconnect_delay (float): Seconds to wait before reconnecting a broken stream.
+        history (int): Number of recent events kept in `events`.
+    """
+
+    def __init__(self, client: AdbClient = None, reconnect_delay: float = 1.0, history: int = 200):
+        self.client = client or get_adb_client()
+        self.reconnect_delay = reconnect_delay
+        self.events = deque(maxlen=history)
+        self.counts = {"attach": 0, "detach": 0, "state": 0, "reconnects": 0}
+        self._devices = {}
+        self._listeners = []
+        self._watches = {}  # serial -> [DeviceWatch]
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._synced = threading.Event()
+        self._thread = None
+
+    # --- Public API ---
+
+    def start(self, wait: float = 2.0) -> "DeviceTracker":
+        """Start tracking; waits up to `wait` seconds for the first device list."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="adb-device-tracker", daemon=True)
+            self._thread.start()
+        self._synced.wait(wait)
+        return self
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def devices(self) -> dict[str, str]:
+        """The live table: serial -> adb state ("device", "offline", ...)."""
+        with self._lock:
+            return dict(self._devices)
+
+    def add_listener(self, callback: Callable[[dict], None]):
+        """Call `callback(event)` for every event: {"type", "serial", "state", "previous", "at"}."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def subscribe(self, serial: str, watch: DeviceWatch):
+        """Feed a DeviceWatch with the state of `serial`, starting with its current state."""
+        with self._lock:
+            self._watches.setdefault(serial, []).append(watch)
+            state = self._devices.get(serial)
+        if state is not None:
+            # An unknown serial is left as present: a device connected a moment ago may not have been streamed yet
+            watch.update(state)
+
+    # --- Background tracking ---
+
+    def _apply(self, listing: list[dict]):
+        states = {device["serial"]: device["state"] for device in listing}
+        now = time.time()
+        events = []
+        with self._lock:
+            first_sync = not self._synced.is_set()
+            for serial in set(self._devices) | set(states):
+                previous, state = self._devices.get(serial), states.get(serial)
+                if previous == state:
+                    continue
+                if state == "device":
+                    kind = "attach"
+                elif previous == "device":
+                    kind = "detach"
+                else:
+                    kind = "state"  # e.g. unauthorized -> offline
+                if not first_sync:
+                    self.counts[kind] += 1
+                events.append({"type": kind, "serial": serial, "state": state, "previous": previous, "at": now})
+            self._devices = states
+            listeners = list(self._listeners)
+            watches = {event["serial"]: list(self._watches.get(event["serial"], ())) for event in events}
+            self._synced.set()
+
+        for event in events:
+            for watch in watches[event["serial"]]:
+                watch.update(event["state"])
+        if first_sync:
+            return  # the initial list is the baseline, not a burst of attaches
+        for event in events:
+            self.events.append(event)
+            for callback in listeners:
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"Device event listener failed: {e}")
+
+    def _run(self):
+        streaming = False
+        while not self._stopping.is_set():
+            try:
+                for listing in self.client.track_devices(idle_timeout=0.5):
+                    if self._stopping.is_set():
+                        return
+                    streaming = True
+                    if listing is not None:
+                        self._apply(listing)
+            except AdbError as e:
+                if self._stopping.is_set():
+                    return
+                if streaming:
+                    print(f"Device tracking interrupted ({e}); reconnecting...")
+            if streaming:
+                # Until the stream is back nothing is known to be attached
+                self._apply([])
+                streaming = False
+            with self._lock:
+                self.counts["reconnects"] += 1
+            self._stopping.wait(self.reconnect_delay)
@@ -0,0 +1,244 @@
+import json
+import os
+from appium.webdriver.common.appiumby import AppiumBy
+
+# Strategies in order of preference: an ID or accessibility id is a direct lookup and a
+# UiSelector walks the view tree on the device, while XPath makes UiAutomator2 serialize the
+# whole hierarchy to XML first.
+ID = AppiumBy.ID
+UIAUTOMATOR = AppiumBy.ANDROID_UIAUTOMATOR
+ACCESSIBILITY_ID = AppiumBy.ACCESSIBILITY_ID
+XPATH = AppiumBy.XPATH
+STRATEGY_ORDER = (ID, UIAUTOMATOR, ACCESSIBILITY_ID, XPATH)
+
+APP_ID = "com.bumble.app:id/"
+
+class Locator:
+    """
+    One logical element with the ways of finding it, cheapest first.
+
+    `preferred` is what the handlers wait on: the strategy picked by the locator benchmark
+    (benchmarks/locators.py) if one was recorded in the preferences file, else the first
+    strategy in STRATEGY_ORDER. The XPath, when given, is the original (reference) locator.
+    """
+
+    __slots__ = ("name", "strategies", "chosen")
+
+    def __init__(self, name: str, id: str = None, uiautomator: str = None, accessibility_id: str = None, xpath: str = None):
+        self.name = name
+        given = {ID: id, UIAUTOMATOR: uiautomator, ACCESSIBILITY_ID: accessibility_id, XPATH: xpath}
+        self.strategies = tuple((by, given[by]) for by in STRATEGY_ORDER if given[by] is not None)
+        self.chosen = None
+
+    @property
+    def preferred(self) -> tuple[str, str]:
+        if self.chosen is not None:
+            for strategy in self.strategies:
+                if strategy[0] == self.chosen:
+                    return strategy
+        return self.strategies[0]
+
+    @property
+    def reference(self) -> tuple[str, str]:
+        """The strategy the others are checked against (the most specific, last one)."""
+        return self.strategies[-1]
+
+    def __repr__(self):
+        return f"Locator({self.name!r}, preferred={self.preferred!r})"
+
+def _text(value: str) -> str:
+    """A Java string literal for UiSelector arguments."""
+    return json.dumps(value, ensure_ascii=False)
+
+def ui(**criteria) -> str:
+    """
+    Build a UiSelector expression, e.g. ui(className="android.widget.TextView", text="Got it").
+    A `child` criterion (a dict) becomes a childSelector, a `sibling` criterion a fromParent
+    (searched among the descendants of the matched element's parent).
+    """
+    child = criteria.pop("child", None)
+    sibling = criteria.pop("sibling", None)
+    parts = ["new UiSelector()"]
+    for method, value in criteria.items():
+        parts.append(f".{method}({str(value).lower() if isinstance(value, bool) else _text(value)})")
+    if child is not None:
+        parts.append(f".childSelector({ui(**child)})")
+    if sibling is not None:
+        parts.append(f".fromParent({ui(**sibling)})")
+    return "".join(parts)
+
+TEXT_VIEW = "android.widget.TextView"
+
+LOCATORS = {locator.name: locator for locator in (
+    # --- Navigation and People tab ---
+    Locator("nav_bar", id=APP_ID + "mainApp_navigationTabBar"),
+    Locator("navbar_logo", id=APP_ID + "navbar_logo"),
+    Locator("people_tab_selected",
+            uiautomator=ui(className="android.view.ViewGroup", description="People", selected=True),
+            xpath="//android.view.ViewGroup[@content-desc='People' and @selected='true']"),
+    Locator("profile_list", id=APP_ID + "encountersGridProfile_list"),
+    Locator("profile_summary", id=APP_ID + "encountersGridItem_summaryContainer"),
+    Locator("profile_loaded",
+            uiautomator=ui(resourceIdMatches=r".*:id/encountersGridItem_(summary|about)Container"),
+            xpath=f"//*[@resource-id='{APP_ID}encountersGridItem_summaryContainer' or @resource-id='{APP_ID}encountersGridItem_aboutContainer']"),
+    Locator("loading_skeleton", xpath="//androidx.compose.ui.platform.ComposeView/android.view.View/android.view.View"),
+
+    # --- Swipe popups ---
+    Locator("premium_ad_title",
+            uiautomator=ui(className=TEXT_VIEW, text="Find who you're looking for, faster"),
+            xpath="//android.widget.TextView[@text=\"Find who you're looking for, faster\"]"),
+    Locator("maybe_later_button",
+            uiautomator=ui(className=TEXT_VIEW, text="Maybe later"),
+            xpath="//android.view.View[@clickable='true' and .//android.widget.TextView[@text=\"Maybe later\"]]"),
+    Locator("they_saw_you_title",
+            uiautomator=ui(className=TEXT_VIEW, textContains="They saw you"),
+            xpath="//android.widget.TextView[contains(@text, \"They saw you\")]"),
+    Locator("they_saw_you_close",
+            uiautomator=ui(className="android.view.View", clickable=True, child={"description": "Close"}),
+            xpath="//android.view.View[@clickable='true' and .//android.view.View[@content-desc='Close']]"),
+    Locator("superswipe_title",
+            uiautomator=ui(className=TEXT_VIEW, text="Supercharge your chance to match"),
+            xpath="//android.widget.TextView[@text=\"Supercharge your chance to match\"]"),
+    Locator("superswipe_got_it",
+            uiautomator=ui(className=TEXT_VIEW, text="Supercharge your chance to match", sibling=dict(className=TEXT_VIEW, text="Got it")),
+            xpath="//androidx.compose.ui.platform.ComposeView[.//android.widget.TextView[@text='Supercharge your chance to match']]"
+                  "//android.view.View[@clickable='true' and .//android.widget.TextView[@text='Got it']]"),
+    Locator("superswipe_close",
+            uiautomator=ui(className="android.widget.ImageView", description="Close", clickable=True),
+            xpath="//android.widget.ImageView[@content-desc='Close' and @clickable='true']"),
+    Locator("first_move_title",
+            uiautomator=ui(className=TEXT_VIEW, textMatches="(?s).*It's time to.*make your move.*"),
+            xpath="//android.widget.TextView[contains(@text, \"It's time to\") and contains(@text, \"make your move\")]"),
+    Locator("first_move_close", id=APP_ID + "navbar_button_navigation"),
+    Locator("its_a_match_title",
+            uiautomator=ui(resourceId=APP_ID + "match_explanationTitle", text="What a match!"),
+            xpath=f"//*[@resource-id='{APP_ID}match_explanationTitle' and @text='What a match!']"),
+    Locator("its_a_match_close", id=APP_ID + "match_close"),
+    Locator("opening_moves_info_title",
+            uiautomator=ui(className=TEXT_VIEW, text="Kick things off with Opening Moves"),
+            xpath="//android.widget.TextView[@text='Kick things off with Opening Moves']"),
+    Locator("opening_moves_info_got_it",
+            uiautomator=ui(className=TEXT_VIEW, text="Kick things off with Opening Moves", sibling=dict(className=TEXT_VIEW, text="Got it")),
+            xpath="//androidx.compose.ui.platform.ComposeView[.//android.widget.TextView[@text='Kick things off with Opening Moves']]"
+                  "//android.view.View[@clickable='true' and .//android.widget.TextView[@text='Got it']]"),
+    Locator("mini_composer_input", id=APP_ID + "composerMini_text"),
+    Locator("mini_composer_send", id=APP_ID + "composerMini_icon"),
+    Locator("best_photo_title",
+            uiautomator=ui(className=TEXT_VIEW, text="Put your best photo first"),
+            xpath="//android.widget.TextView[@text='Put your best photo first']"),
+    Locator("best_photo_save",
+            uiautomator=ui(className="android.widget.Button", text="Save and close"),
+            xpath="//android.widget.Button[@text='Save and close']"),
+    Locator("out_of_likes_title",
+            uiautomator=ui(className=TEXT_VIEW, text="You’re all out of likes"),
+            xpath="//android.widget.TextView[@text='You’re all out of likes']"),
+    Locator("interested_panel", id=APP_ID + "parentPanel"),
+    Locator("dialog_positive_button", id="android:id/button1"),
+    Locator("update_prompt_header", id=APP_ID + "ctaBox_header"),
+    Locator("update_prompt_later", id=APP_ID + "button_later"),
+
+    # --- Filters ---
+    Locator("adjust_filters_title",
+            uiautomator=ui(className=TEXT_VIEW, textContains="You’ve seen everyone nearby"),
+            xpath='//android.widget.TextView[contains(@text, "You’ve seen everyone nearby")]'),
+    Locator("adjust_filters_button",
+            uiautomator=ui(className=TEXT_VIEW, text="Adjust your filters"),
+            xpath="//android.view.View[@clickable='true' and .//android.widget.TextView[@text='Adjust your filters']]"),
+    Locator("higher_age_thumb",
+            uiautomator=ui(className="com.badoo.mobile.component.rangebar.RangeBarItem", description="Higher age"),
+            accessibility_id="Higher age",
+            xpath='//com.badoo.mobile.component.rangebar.RangeBarItem[@content-desc="Higher age"]'),
+    Locator("age_slider_track", id=APP_ID + "range_bar_item"),
+    Locator("apply_button",
+            uiautomator=ui(textMatches="(?s).*(Apply|APPLY).*"),
+            xpath="//android.widget.Button[contains(@text, 'Apply') or contains(@text, 'APPLY')] | "
+                  "//android.widget.TextView[@clickable='true' and (contains(@text, 'Apply') or contains(@text, 'APPLY'))] | "
+                  "//android.view.View[@clickable='true' and .//android.widget.TextView[contains(@text, 'Apply') or contains(@text, 'APPLY')]]"),
+
+    # --- Chats ---
+    Locator("matches_title", id=APP_ID + "connections_expiringConnectionsTitle"),
+    Locator("matches_list", id=APP_ID + "connections_connectionsListExpiring"),
+    Locator("chat_list", id=APP_ID + "connections_connectionsList"),
+    Locator("match_item_button",  # searched within the matches list element
+            uiautomator=ui(className="android.widget.Button", resourceId=APP_ID + "connectionItem_ringView"),
+            xpath=f".//android.widget.Button[@resource-id='{APP_ID}connectionItem_ringView']"),
+    Locator("opening_move_container", id=APP_ID + "initialChatV3_container"),
+    Locator("opening_move_title",
+            uiautomator=ui(className=TEXT_VIEW, textContains="Opening Move"),
+            xpath="//android.widget.TextView[contains(@text, 'Opening Move')]"),
+    Locator("opening_move_reply",
+            uiautomator=ui(className=TEXT_VIEW, text="Reply"),
+            xpath="//android.view.View[@clickable='true' and .//android.widget.TextView[@text='Reply']]"),
+    Locator("chat_input", id=APP_ID + "chatInput_text"),
+    Locator("chat_send", id=APP_ID + "chatInput_button_send"),
+    Locator("chat_toolbar_name", id=APP_ID + "chatToolbar_title"),
+    Locator("chat_back",
+            uiautomator=ui(className="android.widget.ImageButton", description="Back"),
+            accessibility_id="Back",
+            xpath="//android.widget.ImageButton[@content-desc='Back']"),
+    Locator("spotlight_promo",
+            uiautomator=ui(textContains="Spotlight is the easiest way"),
+            xpath="//*[contains(@text, 'Spotlight is the easiest way')]"),
+    Locator("opening_moves_promo",
+            uiautomator=ui(textContains="Get to good conversation, faster"),
+            xpath="//*[contains(@text, 'Get to good conversation, faster')]"),
+    Locator("chat_24_hours_banner",
+            uiautomator=ui(className=TEXT_VIEW, textContains="hours to reply"),
+            xpath="//android.widget.TextView[contains(@text, 'hours to reply')]"),
+)}
+
+def nav_tab(page_name: str) -> Locator:
+    """The navigation bar tab whose content-desc is `page_name` (e.g. "People")."""
+    return Locator(
+        f"nav_tab:{page_name}",
+        accessibility_id=page_name,
+        xpath=f"//*[@resource-id='{APP_ID}mainApp_navigationTabBar']//android.view.ViewGroup[@content-desc='{page_name}']",
+    )
+
+def locator(name: str) -> tuple[str, str]:
+    """The (by, value) pair handlers should wait on for element `name`."""
+    return LOCATORS[name].preferred
+
+def get_preferences_path() -> str:
+    """JSON file with the strategy picked per locator (geelark_locator_prefs)."""
+    return os.getenv("geelark_locator_prefs", os.path.join(os.path.dirname(os.path.abspath(__file__)), "locator_prefs.json"))
+
+def load_preferences(path: str = None) -> int:
+    """
+    Apply the strategies recorded by the locator benchmark. Unknown names and strategies a
+    locator does not have are ignored.
+
+    Returns:
+        int: How many locators got a recorded strategy.
+    """
+    path = path or get_preferences_path()
+    try:
+        with open(path, encoding="utf-8") as f:
+            preferences = json.load(f)
+    except FileNotFoundError:
+        return 0
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Could not read locator preferences from {path}: {e}")
+        return 0
+    applied = 0
+    for name, by in preferences.items():
+        entry = LOCATORS.get(name)
+        if entry is not None and any(strategy[0] == by for strategy in entry.strategies):
+            entry.chosen = by
+            applied += 1
+    return applied
+
+def save_preferences(choices: dict[str, str], path: str = None):
+    """Record the strategy to use per locator name, merged into the existing preferences."""
+    path = path or get_preferences_path()
+    preferences = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            preferences = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        pass
+    preferences.update(choices)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(preferences, f, indent=2, sort_keys=True)
+
+load_preferences()
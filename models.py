@@ -0,0 +1,135 @@
+from typing import Iterable, Iterator
+
+class AdbEndpoint:
+    """
+    ADB connection details of one cloud phone, as returned by /adb/getData.
+
+    `code` is 0 when the endpoint is usable, 49001 when ADB is not enabled for the
+    phone and 49002 while the phone is not running.
+    """
+
+    __slots__ = ("id", "code", "ip", "port", "pwd", "msg")
+
+    ADB_DISABLED = 49001
+
+    def __init__(self, id: str, code: int, ip: str = None, port: str = None, pwd: str = None, msg: str = None):
+        self.id = id
+        self.code = code
+        self.ip = ip
+        self.port = port
+        self.pwd = pwd
+        self.msg = msg
+
+    @classmethod
+    def from_api(cls, item: dict) -> "AdbEndpoint":
+        return cls(item.get("id"), item.get("code"), item.get("ip"), item.get("port"), item.get("pwd"), item.get("msg"))
+
+    @property
+    def ready(self) -> bool:
+        return self.code == 0
+
+    @property
+    def adb_disabled(self) -> bool:
+        return self.code == self.ADB_DISABLED
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__ if getattr(self, name) is not None}
+
+    def __repr__(self):
+        return f"AdbEndpoint(id={self.id!r}, code={self.code!r}, ip={self.ip!r}, port={self.port!r})"
+
+class PhoneRecord:
+    """
+    One automatable device: a Geelark cloud phone ("remote") or a USB-attached phone ("local").
+
+    Slotted, so a fleet of thousands of records costs a fraction of the equivalent dicts,
+    and picklable, so records can be handed to worker processes as-is.
+    """
+
+    __slots__ = ("id", "name", "status", "brand", "model", "type", "adb")
+
+    def __init__(self, id: str, name: str, status: str = "active", brand: str = "Unknown", model: str = "Unknown", type: str = "remote", adb: AdbEndpoint = None):
+        self.id = id
+        self.name = name
+        self.status = status
+        self.brand = brand
+        self.model = model
+        self.type = type
+        self.adb = adb
+
+    @classmethod
+    def from_api(cls, phone: dict) -> "PhoneRecord":
+        """Builds a record from a /phone/list item."""
+        equipment_info = phone.get("equipmentInfo") or {}
+        return cls(
+            phone.get("id"),
+            phone.get("serialName", "Unknown"),
+            brand=equipment_info.get("deviceBrand", "Unknown"),
+            model=equipment_info.get("deviceModel", "Unknown"),
+        )
+
+    @property
+    def is_local(self) -> bool:
+        return self.type == "local"
+
+    def to_dict(self) -> dict:
+        record = {name: getattr(self, name) for name in ("id", "name", "status", "brand", "model", "type")}
+        if self.adb is not None:
+            record["adb"] = self.adb.to_dict()
+        return record
+
+    def __repr__(self):
+        return f"PhoneRecord(id={self.id!r}, name={self.name!r}, type={self.type!r})"
+
+class PhoneTable:
+    """
+    Phone records indexed by ID, iterated in insertion order.
+
+    Args:
+        records (Iterable[PhoneRecord]): Initial records; a later record replaces an earlier one with the same ID.
+    """
+
+    __slots__ = ("_by_id",)
+
+    def __init__(self, records: Iterable[PhoneRecord] = ()):
+        self._by_id = {record.id: record for record in records}
+
+    def add(self, record: PhoneRecord):
+        self._by_id[record.id] = record
+
+    def get(self, phone_id: str, default=None) -> PhoneRecord | None:
+        return self._by_id.get(phone_id, default)
+
+    def __getitem__(self, phone_id: str) -> PhoneRecord:
+        return self._by_id[phone_id]
+
+    def __contains__(self, phone_id: str) -> bool:
+        return phone_id in self._by_id
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[PhoneRecord]:
+        return iter(self._by_id.values())
+
+    def ids(self) -> list[str]:
+        return list(self._by_id)
+
+    def join_adb(self, adb_items: Iterable[dict]) -> "PhoneTable":
+        """
+        Attach /adb/getData results to their records with a single hash join
+        (one dict lookup per item); items for unknown IDs are ignored.
+
+        Returns:
+            PhoneTable: self, for chaining.
+        """
+        by_id = self._by_id
+        for item in adb_items:
+            record = by_id.get(item.get("id"))
+            if record is not None:
+                record.adb = AdbEndpoint.from_api(item)
+        return self
+
+    def without_adb_disabled(self) -> list[PhoneRecord]:
+        """Records whose ADB is not known to be disabled (code 49001), in table order."""
+        return [record for record in self._by_id.values() if record.adb is None or not record.adb.adb_disabled]
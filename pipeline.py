@@ -0,0 +1,317 @@
+import multiprocessing
+import queue
+import statistics
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable
+from geelark_api import start_phone, get_adb_information
+from readiness import get_watcher
+from connection import adb_connect, adb_login
+from adbregistry import get_connection_registry
+
+class PhoneJob:
+    """One phone travelling through the bring-up pipeline."""
+
+    __slots__ = ("phone_id", "info", "attempts", "deadline", "timings", "future", "stage")
+
+    def __init__(self, phone_id: str, deadline: float):
+        self.phone_id = phone_id
+        self.info = {}
+        self.attempts = 0
+        self.deadline = deadline
+        self.timings = {}  # stage -> [queued_at, started_at, finished_at]
+        self.future = Future()
+        self.stage = None
+
+    @property
+    def address(self) -> str:
+        return f"{self.info['ip']}:{self.info['port']}"
+
+class _Stage:
+    """A queue plus `concurrency` worker threads that hand batches of jobs to `handler`."""
+
+    def __init__(self, pipeline: "BringUpPipeline", name: str, handler: Callable[[list[PhoneJob]], None], concurrency: int, batch_size: int = 1, batch_window: float = 0.0):
+        self.pipeline = pipeline
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.queue = queue.Queue()
+        self.threads = [
+            threading.Thread(target=self._work, name=f"bringup-{name}-{i}", daemon=True)
+            for i in range(concurrency)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def _next_batch(self) -> list[PhoneJob] | None:
+        job = self.queue.get()
+        if job is None:
+            return None
+        batch = [job]
+        # Give phones that are right behind this one a moment to join the same API call
+        collect_until = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            try:
+                job = self.queue.get(timeout=max(0.0, collect_until - time.monotonic()))
+            except queue.Empty:
+                break
+            if job is None:
+                self.queue.put(None)  # leave the shutdown marker for the next worker
+                break
+            batch.append(job)
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            now = time.monotonic()
+            for job in batch:
+                job.timings[self.name][1] = now
+            try:
+                self.handler(batch)
+            except Exception as e:
+                for job in batch:
+                    self.pipeline.fail(job, f"{self.name} stage error: {e}")
+
+class BringUpPipeline:
+    """
+    Brings a fleet of cloud phones up through staged queues: start -> ready -> adb_info -> connect -> login.
+
+    Every stage has its own queue and concurrency limit, so while one phone is being
+    connected the next is still booting and a third is being started; a fleet comes up
+    in about the time of its slowest stage instead of the sum of all stages per phone.
+    The start and adb_info stages batch the phones waiting in their queue into one API
+    call, and the ready stage hands all booting phones to the shared ReadinessWatcher.
+    Failed adb connects are retried with a growing delay without holding a worker.
+
+    Args:
+        concurrency (dict[str, int]): Worker threads per stage, overriding DEFAULT_CONCURRENCY.
+        deadline (float): Per-phone limit on the whole bring-up, in seconds.
+        connect_attempts (int): adb connect attempts per phone.
+        connect (Callable[[str], bool]): Connects to "ip:port" (defaults to connection.adb_connect).
+        login (Callable[[str, str], bool]): Logs in on "ip:port" with a password (defaults to connection.adb_login).
+    """
+
+    STAGES = ("start", "ready", "adb_info", "connect", "login")
+    DEFAULT_CONCURRENCY = {"start": 2, "ready": 1, "adb_info": 2, "connect": 8, "login": 8}
+
+    def __init__(
+        self,
+        concurrency: dict = None,
+        deadline: float = 300,
+        connect_attempts: int = 3,
+        connect: Callable[[str], bool] = adb_connect,
+        login: Callable[[str, str], bool] = adb_login):
+        self.deadline = deadline
+        self.connect_attempts = connect_attempts
+        self._connect = connect
+        self._login = login
+        self._jobs = []
+        self._lock = threading.Lock()
+        limits = dict(self.DEFAULT_CONCURRENCY, **(concurrency or {}))
+        self.stages = {
+            "start": _Stage(self, "start", self._start, limits["start"], batch_size=100, batch_window=0.2),
+            "ready": _Stage(self, "ready", self._watch, limits["ready"], batch_size=1000),
+            "adb_info": _Stage(self, "adb_info", self._adb_info, limits["adb_info"], batch_size=100, batch_window=0.2),
+            "connect": _Stage(self, "connect", self._connect_one, limits["connect"]),
+            "login": _Stage(self, "login", self._login_one, limits["login"]),
+        }
+
+    # --- Public API ---
+
+    def submit(self, phone_ids: list[str]) -> dict[str, Future]:
+        """
+        Queue phones for bring-up.
+
+        Returns:
+            dict[str, Future]: Per phone ID, a future resolving to its connection info
+                               ({"ip", "port", "pwd", ...}) or {} if it failed.
+        """
+        futures = {}
+        deadline = time.monotonic() + self.deadline
+        for phone_id in phone_ids:
+            job = PhoneJob(phone_id, deadline)
+            with self._lock:
+                self._jobs.append(job)
+            futures[phone_id] = job.future
+            self._enqueue(job, "start")
+        return futures
+
+    def bring_up(self, phone_ids: list[str]) -> dict[str, dict]:
+        """Submit phones and block until every one is connected or has failed."""
+        futures = self.submit(phone_ids)
+        return {phone_id: future.result() for phone_id, future in futures.items()}
+
+    def stage_stats(self) -> dict[str, dict]:
+        """
+        Per-stage timings over every job that went through the stage.
+
+        Returns:
+            dict[str, dict]: {stage: {"phones", "avg_wait", "avg_service", "p95_service", "max_service"}}
+                             where wait is time queued and service is time being handled (seconds).
+        """
+        with self._lock:
+            jobs = list(self._jobs)
+        stats = {}
+        for stage in self.STAGES:
+            waits, services = [], []
+            for job in jobs:
+                queued_at, started_at, finished_at = job.timings.get(stage, (None, None, None))
+                if started_at is not None and finished_at is not None:
+                    waits.append(started_at - queued_at)
+                    services.append(finished_at - started_at)
+            services.sort()
+            stats[stage] = {
+                "phones": len(services),
+                "avg_wait": statistics.mean(waits) if waits else 0.0,
+                "avg_service": statistics.mean(services) if services else 0.0,
+                "p95_service": services[min(len(services) - 1, int(0.95 * len(services)))] if services else 0.0,
+                "max_service": services[-1] if services else 0.0,
+            }
+        return stats
+
+    def phase_durations(self, phone_id: str, future: Future = None) -> dict[str, float]:
+        """
+        Seconds one phone spent in each stage, queueing and retries included, keyed by the
+        phase names of spans.PHASES (the ready stage is "status_wait", connect is "adb_connect").
+
+        A phone submitted again (e.g. after being stopped for idling) has one job per
+        submission: pass the future submit() returned to pick that one; without it the
+        most recent submission is reported.
+        """
+        with self._lock:
+            job = next((job for job in reversed(self._jobs)
+                        if job.phone_id == phone_id and (future is None or job.future is future)), None)
+        if job is None:
+            return {}
+        names = {"ready": "status_wait", "connect": "adb_connect"}
+        return {
+            names.get(stage, stage): finished_at - queued_at
+            for stage, (queued_at, _, finished_at) in job.timings.items()
+            if finished_at is not None
+        }
+
+    def close(self):
+        """Stop the stage workers (queued jobs are abandoned)."""
+        for stage in self.stages.values():
+            for _ in stage.threads:
+                stage.queue.put(None)
+
+    # --- Job transitions ---
+
+    def _enqueue(self, job: PhoneJob, stage: str, delay: float = 0.0):
+        if time.monotonic() + delay > job.deadline:
+            self.fail(job, f"deadline passed before {stage}")
+            return
+        job.stage = stage
+        if delay:
+            timer = threading.Timer(delay, self._enqueue, args=(job, stage))
+            timer.daemon = True
+            timer.start()
+            return
+        job.timings.setdefault(stage, [time.monotonic(), None, None])
+        self.stages[stage].queue.put(job)
+
+    def _finish_stage(self, job: PhoneJob):
+        timing = job.timings.get(job.stage)
+        if timing is not None:
+            timing[2] = time.monotonic()
+
+    def advance(self, job: PhoneJob):
+        """Move a job to the stage after its current one (or complete it)."""
+        self._finish_stage(job)
+        index = self.STAGES.index(job.stage)
+        if index + 1 < len(self.STAGES):
+            job.attempts = 0
+            self._enqueue(job, self.STAGES[index + 1])
+        elif not job.future.done():
+            job.future.set_result(job.info)
+
+    def fail(self, job: PhoneJob, reason: str):
+        self._finish_stage(job)
+        print(f"Bring-up of phone {job.phone_id} failed: {reason}")
+        if not job.future.done():
+            job.future.set_result({})
+
+    # --- Stage handlers ---
+
+    def _start(self, jobs: list[PhoneJob]):
+        response = start_phone([job.phone_id for job in jobs])
+        started = {detail["id"] for detail in response["data"]["successDetails"]} if response else set()
+        for job in jobs:
+            if job.phone_id in started:
+                self.advance(job)
+            else:
+                self.fail(job, "start request failed")
+
+    def _watch(self, jobs: list[PhoneJob]):
+        watcher = get_watcher()
+        for job in jobs:
+            def on_final_status(phone_id, status, job=job):
+                if status == 0:
+                    self.advance(job)
+                else:
+                    self.fail(job, f"phone did not start (status {status})")
+            watcher.watch(job.phone_id, deadline=max(1.0, job.deadline - time.monotonic()), callback=on_final_status)
+
+    def _adb_info(self, jobs: list[PhoneJob]):
+        items = {item.get("id"): item for item in get_adb_information([job.phone_id for job in jobs])}
+        for job in jobs:
+            item = items.get(job.phone_id)
+            if item and item.get("code") == 0:
+                job.info = item
+                self.advance(job)
+            elif item and item.get("code") == 49001:
+                self.fail(job, "ADB is not enabled")
+            else:
+                # The endpoint is published shortly after the phone reports Started
+                job.attempts += 1
+                if job.attempts >= 5:
+                    self.fail(job, "ADB information not available")
+                else:
+                    self._finish_stage(job)
+                    self._enqueue(job, "adb_info", delay=1.0)
+
+    def _connect_one(self, jobs: list[PhoneJob]):
+        for job in jobs:
+            if self._connect(job.address):
+                self.advance(job)
+                continue
+            job.attempts += 1
+            if job.attempts >= self.connect_attempts:
+                self.fail(job, f"adb connect failed {job.attempts} times")
+            else:
+                self._finish_stage(job)
+                self._enqueue(job, "connect", delay=float(2 ** (job.attempts - 1)))
+
+    def _login_one(self, jobs: list[PhoneJob]):
+        for job in jobs:
+            if self._login(job.address, job.info.get("pwd", "")):
+                get_connection_registry().bind(job.phone_id, job.address)
+                self.advance(job)
+            else:
+                self.fail(job, "glogin failed")
+
+class ConnectionHandoff:
+    """
+    Hands the connection info produced by the orchestrator's pipeline to the worker
+    process that drives the phone. Create in the parent, pass as a Process argument.
+    """
+
+    def __init__(self):
+        self._queue = multiprocessing.Queue(maxsize=1)
+
+    def set(self, connection_info: dict):
+        self._queue.put(connection_info or {})
+
+    def wait(self, timeout: float = None) -> dict:
+        """Returns the connection info, or {} if bring-up failed or timed out."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return {}
@@ -0,0 +1,224 @@
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from geelark_api import stop_phone
+from readiness import get_watcher
+from adbregistry import get_connection_registry
+from pipeline import BringUpPipeline
+
+class _Warm:
+    """A queued phone whose bring-up was started ahead of its turn."""
+
+    __slots__ = ("future", "submitted_at", "ready_at")
+
+    def __init__(self, future: Future):
+        self.future = future
+        self.submitted_at = time.monotonic()
+        self.ready_at = None
+
+def _succeeded(future: Future) -> bool:
+    """True if a finished bring-up produced connection info (not an exception, cancel or {})."""
+    return future.done() and not future.cancelled() and future.exception() is None and bool(future.result())
+
+class PrewarmScheduler:
+    """
+    Starts the next queued cloud phones ahead of time, so that a phone is already booted,
+    connected and logged in when a worker slot frees up for it.
+
+    How many phones to warm (K) is recomputed on every tick(): the queue is laid out over
+    the slots (queue position j takes slot j % slots in wave j // slots), each slot frees
+    up when its current session is expected to end, and every queued phone whose slot
+    frees up within the lead time is warmed. The lead time is the observed 90th percentile
+    of whole bring-ups (start to logged in) or, before any has finished, the readiness
+    watcher's boot-time percentile plus `connect_margin`.
+
+    The expected session length is `expected_session` if given, else the median of the
+    sessions that have finished; with neither, only the next phone beyond the free slots
+    is warmed. A warm phone that nobody claims within `idle_timeout` seconds of being ready
+    is stopped again, so a bad estimate costs at most that many boot-minutes per phone.
+
+    Args:
+        pipeline (BringUpPipeline): Pipeline used to bring phones up.
+        queue (list[str]): Device IDs in the order they will get a slot (local devices included).
+        slots (int): How many devices are driven at once.
+        remote_ids (set[str]): The IDs in `queue` that are cloud phones (defaults to all of them).
+        expected_session (float): Expected seconds a device keeps its slot, if known.
+        idle_timeout (float): Seconds a warm, unclaimed phone may keep running.
+        max_prewarm (int): Upper bound on phones warmed beyond the free slots (defaults to `slots`).
+        default_lead (float): Lead time used before anything has booted (seconds).
+        connect_margin (float): Seconds added to the boot-time percentile for adb info, connect and login.
+    """
+
+    def __init__(
+        self,
+        pipeline: BringUpPipeline,
+        queue: list[str],
+        slots: int,
+        remote_ids: set[str] = None,
+        expected_session: float = None,
+        idle_timeout: float = 120.0,
+        max_prewarm: int = None,
+        default_lead: float = 60.0,
+        connect_margin: float = 10.0):
+        self.pipeline = pipeline
+        self.queue = list(queue)
+        self.slots = max(1, slots)
+        self.remote_ids = set(queue) if remote_ids is None else set(remote_ids)
+        self.expected_session = expected_session
+        self.idle_timeout = idle_timeout
+        self.max_prewarm = self.slots if max_prewarm is None else max_prewarm
+        self.default_lead = default_lead
+        self.connect_margin = connect_margin
+        self.bring_up_times = deque(maxlen=50)
+        self.session_times = deque(maxlen=50)
+        self.slot_waits = []  # per claimed phone: seconds between claim and connection info
+        self.idle_seconds = 0.0  # phone-seconds warm phones spent ready but unclaimed (billed, unused)
+        self.counts = {"prewarmed": 0, "claimed_ready": 0, "claimed_warming": 0, "claimed_cold": 0, "idle_stopped": 0}
+        self._warm = {}
+        self._running = {}  # device ID -> session start (monotonic)
+        self._cooldown = {}  # device ID -> monotonic time before which it is not warmed again
+        self._lock = threading.Lock()
+
+    # --- Estimates ---
+
+    def lead_time(self) -> float:
+        """Seconds between starting a phone and it being usable."""
+        if self.bring_up_times:
+            ordered = sorted(self.bring_up_times)
+            return ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))]
+        boot = get_watcher().boot_time_percentile(0.9)
+        return boot + self.connect_margin if boot is not None else self.default_lead
+
+    def session_length(self) -> float | None:
+        if self.expected_session is not None:
+            return self.expected_session
+        return statistics.median(self.session_times) if self.session_times else None
+
+    def slot_free_times(self, now: float = None) -> list[float]:
+        """
+        Expected seconds from now until each queued device gets a slot, in queue order.
+        Empty if the session length is not known yet.
+        """
+        session = self.session_length()
+        if session is None:
+            return []
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            remaining = sorted(max(0.0, started + session - now) for started in self._running.values())
+            queued = len(self.queue)
+        free_at = ([0.0] * (self.slots - len(remaining)) + remaining)[:self.slots]
+        free_at.sort()
+        return [free_at[j % self.slots] + (j // self.slots) * session for j in range(queued)]
+
+    def target(self) -> int:
+        """
+        K: how many phones at the front of the queue should be warming or warm right now.
+        Phones that get a slot immediately always count; at most `max_prewarm` more are warmed ahead.
+        """
+        with self._lock:
+            free_now = max(0, self.slots - len(self._running))
+            queued = len(self.queue)
+        limit = min(queued, free_now + self.max_prewarm)
+        free_times = self.slot_free_times()
+        if not free_times:
+            return min(limit, free_now + 1)
+        lead = self.lead_time()
+        return min(limit, max(free_now, sum(1 for t in free_times if t <= lead)))
+
+    # --- Scheduling ---
+
+    def tick(self):
+        """Warm the phones that are due and stop the ones left idle too long."""
+        now = time.monotonic()
+        target = self.target()
+        with self._lock:
+            due = [
+                phone_id for phone_id in self.queue[:target]
+                if phone_id in self.remote_ids and phone_id not in self._warm and self._cooldown.get(phone_id, 0) <= now
+            ]
+            idle = [
+                phone_id for phone_id, warm in self._warm.items()
+                if warm.ready_at is not None and now - warm.ready_at > self.idle_timeout
+            ]
+            for phone_id in idle:
+                self.idle_seconds += now - self._warm.pop(phone_id).ready_at
+                self._cooldown[phone_id] = now + self.idle_timeout
+        for phone_id in idle:
+            print(f"Pre-warmed phone {phone_id} was idle for {self.idle_timeout:.0f}s; stopping it until its turn.")
+            stop_phone([phone_id])
+            get_connection_registry().forget_phone(phone_id)
+        with self._lock:
+            self.counts["idle_stopped"] += len(idle)
+        if due:
+            self._submit(due, prewarm=True)
+
+    def _submit(self, phone_ids: list[str], prewarm: bool) -> dict[str, _Warm]:
+        futures = self.pipeline.submit(phone_ids)
+        warms = {}
+        with self._lock:
+            for phone_id, future in futures.items():
+                warm = warms[phone_id] = self._warm[phone_id] = _Warm(future)
+                future.add_done_callback(lambda done, warm=warm: self._on_ready(warm, done))
+            if prewarm:
+                self.counts["prewarmed"] += len(phone_ids)
+        return warms
+
+    def _on_ready(self, warm: _Warm, future: Future):
+        # A failed bring-up is not "ready": it is retried on claim, not counted as idle
+        if not _succeeded(future):
+            return
+        warm.ready_at = time.monotonic()
+        with self._lock:
+            self.bring_up_times.append(warm.ready_at - warm.submitted_at)
+
+    def claim(self, phone_id: str) -> Future:
+        """
+        Hand a queued device its slot. For a cloud phone, returns a future resolving to its
+        connection info ({} on failure), started now if it was not warmed ahead of time.
+        """
+        claimed_at = time.monotonic()
+        with self._lock:
+            if phone_id in self.queue:
+                self.queue.remove(phone_id)
+            self._running[phone_id] = claimed_at
+            warm = self._warm.pop(phone_id, None)
+            if warm is not None and warm.future.done() and not _succeeded(warm.future):
+                warm = None  # the warm-up failed; try again now
+        if phone_id not in self.remote_ids:
+            future = Future()
+            future.set_result({})
+            return future
+
+        if warm is None:
+            warm = self._submit([phone_id], prewarm=False)[phone_id]
+            with self._lock:
+                self._warm.pop(phone_id, None)
+            key = "claimed_cold"
+        else:
+            key = "claimed_ready" if warm.future.done() else "claimed_warming"
+        with self._lock:
+            self.counts[key] += 1
+            if warm.ready_at is not None:
+                self.idle_seconds += claimed_at - warm.ready_at
+        warm.future.add_done_callback(lambda done: self.slot_waits.append(time.monotonic() - claimed_at))
+        return warm.future
+
+    def session_finished(self, phone_id: str):
+        """Record that a device gave its slot back."""
+        with self._lock:
+            started = self._running.pop(phone_id, None)
+            if started is not None:
+                self.session_times.append(time.monotonic() - started)
+
+    def stats(self) -> dict:
+        waits = sorted(self.slot_waits)
+        return dict(
+            self.counts,
+            idle_seconds=self.idle_seconds,
+            lead_time=self.lead_time(),
+            session_length=self.session_length(),
+            avg_slot_wait=statistics.mean(waits) if waits else 0.0,
+            max_slot_wait=waits[-1] if waits else 0.0,
+        )
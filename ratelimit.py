@@ -0,0 +1,209 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+class FileLock:
+    """
+    Exclusive inter-process lock backed by a lock file (msvcrt on Windows, flock elsewhere).
+    Also serialises threads of the same process.
+    """
+
+    _thread_locks = {}
+    _thread_locks_guard = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        with self._thread_locks_guard:
+            self._thread_lock = self._thread_locks.setdefault(path, threading.Lock())
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            self._file = open(self.path, "a+b")
+            if os.name == "nt":
+                while True:
+                    try:
+                        self._file.seek(0)
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.01)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            self._release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self._release()
+
+    def _release(self):
+        try:
+            if self._file is not None:
+                if os.name == "nt":
+                    try:
+                        self._file.seek(0)
+                        msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+                    except OSError:
+                        pass
+                else:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+                self._file.close()
+        finally:
+            self._file = None
+            self._thread_lock.release()
+
+class SharedRateLimiter:
+    """
+    Token-bucket rate limiter and retry budget shared by every process on the host.
+
+    State lives in a small JSON file guarded by a FileLock, so all worker processes
+    spawned for a fleet run draw from the same bucket and the same retry budget.
+
+    Args:
+        state_path (str): JSON file holding the shared state.
+        rate (float): Tokens (requests) added per second.
+        capacity (float): Maximum burst size.
+        retry_budget (int): Retries allowed across all processes per `budget_window`.
+        budget_window (float): Length of the retry-budget window in seconds.
+    """
+
+    METRIC_NAMES = ("acquired", "throttled", "wait_seconds", "retries", "retries_denied", "retry_after_honored")
+
+    def __init__(self, state_path: str, rate: float = 10.0, capacity: float = 20.0, retry_budget: int = 30, budget_window: float = 60.0):
+        self.state_path = state_path
+        self.rate = rate
+        self.capacity = capacity
+        self.retry_budget = retry_budget
+        self.budget_window = budget_window
+        self._lock = FileLock(state_path + ".lock")
+
+    def _load(self) -> dict:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            state = {}
+        state.setdefault("tokens", self.capacity)
+        state.setdefault("updated", time.time())
+        state.setdefault("budget_window_start", time.time())
+        state.setdefault("budget_used", 0)
+        metrics = state.setdefault("metrics", {})
+        for name in self.METRIC_NAMES:
+            metrics.setdefault(name, 0)
+        return state
+
+    def _save(self, state: dict):
+        tmp_path = f"{self.state_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _refill(self, state: dict):
+        now = time.time()
+        elapsed = max(0.0, now - state["updated"])
+        state["tokens"] = min(self.capacity, state["tokens"] + elapsed * self.rate)
+        state["updated"] = now
+
+    def acquire(self) -> float:
+        """
+        Block until a request may be sent.
+
+        Returns:
+            float: Seconds spent waiting for a token.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                state = self._load()
+                self._refill(state)
+                if state["tokens"] >= 1:
+                    state["tokens"] -= 1
+                    state["metrics"]["acquired"] += 1
+                    if waited:
+                        state["metrics"]["throttled"] += 1
+                        state["metrics"]["wait_seconds"] += waited
+                    self._save(state)
+                    return waited
+                wait = (1 - state["tokens"]) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def try_spend_retry(self) -> bool:
+        """
+        Take one retry from the global budget.
+
+        Returns:
+            bool: False if the budget for the current window is spent (the caller should give up).
+        """
+        with self._lock:
+            state = self._load()
+            now = time.time()
+            if now - state["budget_window_start"] >= self.budget_window:
+                state["budget_window_start"] = now
+                state["budget_used"] = 0
+            allowed = state["budget_used"] < self.retry_budget
+            if allowed:
+                state["budget_used"] += 1
+                state["metrics"]["retries"] += 1
+            else:
+                state["metrics"]["retries_denied"] += 1
+            self._save(state)
+            return allowed
+
+    def record(self, metric: str, amount: float = 1):
+        """Adds `amount` to one of the shared counters."""
+        with self._lock:
+            state = self._load()
+            state["metrics"][metric] = state["metrics"].get(metric, 0) + amount
+            self._save(state)
+
+    def metrics(self) -> dict:
+        """
+        Returns the shared throttling counters.
+
+        Returns:
+            dict: {"acquired", "throttled", "wait_seconds", "retries", "retries_denied", "retry_after_honored"}
+        """
+        with self._lock:
+            return dict(self._load()["metrics"])
+
+    def reset_metrics(self):
+        """Zero the counters and refill the retry budget, e.g. at the start of a fleet run."""
+        with self._lock:
+            state = self._load()
+            state["metrics"] = {name: 0 for name in self.METRIC_NAMES}
+            state["budget_window_start"] = time.time()
+            state["budget_used"] = 0
+            self._save(state)
+
+_limiter: SharedRateLimiter | None = None
+
+def get_rate_limiter() -> SharedRateLimiter:
+    """
+    Returns this process's handle on the host-wide limiter.
+    Rate, burst and retry budget can be tuned with the geelark_rate_limit,
+    geelark_rate_burst and geelark_retry_budget environment variables.
+    """
+    global _limiter
+    if _limiter is None:
+        state_path = os.getenv(
+            "geelark_ratelimit_path",
+            os.path.join(tempfile.gettempdir(), "geelark_ratelimit.json"),
+        )
+        _limiter = SharedRateLimiter(
+            state_path,
+            rate=float(os.getenv("geelark_rate_limit", "10")),
+            capacity=float(os.getenv("geelark_rate_burst", "20")),
+            retry_budget=int(os.getenv("geelark_retry_budget", "30")),
+        )
+    return _limiter
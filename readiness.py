@@ -0,0 +1,191 @@
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Callable
+from geelark_api import get_phone_status
+
+# Status codes: 0=Started, 1=Starting, 2=Shut down, 3=Expired
+FINAL_STATUSES = (0, 2, 3)
+# Extra seconds wait() allows past a phone's deadline before giving up on the poller
+WAIT_SLACK = 5.0
+
+class _PendingPhone:
+    """Book-keeping for one phone the watcher is waiting on."""
+
+    def __init__(self, phone_id: str, deadline: float, callbacks: list[Callable]):
+        self.phone_id = phone_id
+        self.watched_at = time.monotonic()
+        self.deadline = self.watched_at + deadline
+        self.event = threading.Event()
+        self.status = None
+        self.callbacks = callbacks
+
+class ReadinessWatcher:
+    """
+    Waits for many booting phones with one batched /phone/status call per tick.
+
+    Callers register phone IDs with watch() and block on wait() (or get a callback);
+    a single background thread polls all pending IDs together and wakes each caller
+    once its phone reaches status 0, 2 or 3, or its deadline passes.
+
+    The poll interval adapts to observed boot times: the watcher sleeps until the
+    first pending phone is expected to be up, clamped to [min_interval, max_interval].
+
+    Args:
+        default_interval (float): Poll interval used before any boot time has been observed.
+        min_interval (float): Never poll more often than this (seconds).
+        max_interval (float): Never wait longer than this between polls (seconds).
+        deadline (float): Default per-phone upper bound on the wait (seconds).
+    """
+
+    def __init__(self, default_interval: float = 3.0, min_interval: float = 1.0, max_interval: float = 10.0, deadline: float = 300.0):
+        self.default_interval = default_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.deadline = deadline
+        self.boot_times = deque(maxlen=50)
+        self.polls = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread = None
+        self._running = False
+
+    def watch(self, phone_id: str, deadline: float = None, callback: Callable[[str, int | None], None] = None) -> threading.Event:
+        """
+        Start waiting for a phone that has been (or is about to be) started.
+
+        Args:
+            phone_id (str): The phone to watch.
+            deadline (float): Give up after this many seconds (defaults to the watcher's deadline).
+            callback: Called as callback(phone_id, status) when the wait ends; status is None on timeout/failure.
+
+        Returns:
+            threading.Event: Set once the phone's final status is known.
+        """
+        with self._lock:
+            pending = self._pending.get(phone_id)
+            if pending is None:
+                pending = _PendingPhone(phone_id, deadline or self.deadline, [])
+                self._pending[phone_id] = pending
+            if callback:
+                pending.callbacks.append(callback)
+            self._ensure_running()
+            self._wakeup.notify()
+            return pending.event
+
+    def wait(self, phone_id: str, deadline: float = None) -> int | None:
+        """
+        Block until the phone is started, shut down or expired.
+
+        Returns:
+            int | None: The final status (0, 2 or 3), or None if the deadline passed or the status query failed.
+        """
+        results = {}
+        event = self.watch(phone_id, deadline, callback=lambda pid, status: results.setdefault(pid, status))
+        # The poller resolves overdue phones itself; the slack covers one poll interval on
+        # top of the deadline, so a stuck poller cannot block the caller forever
+        if not event.wait((deadline or self.deadline) + self.max_interval + WAIT_SLACK):
+            print(f"Gave up waiting for phone {phone_id}: the readiness poller did not answer in time.")
+            return None
+        return results.get(phone_id)
+
+    def expected_boot_time(self) -> float | None:
+        """Median of the recently observed boot times, or None if nothing has booted yet."""
+        if not self.boot_times:
+            return None
+        return statistics.median(self.boot_times)
+
+    def boot_time_percentile(self, q: float) -> float | None:
+        """The q-quantile (0..1) of the recently observed boot times, or None if nothing has booted yet."""
+        if not self.boot_times:
+            return None
+        ordered = sorted(self.boot_times)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stop(self):
+        with self._lock:
+            self._running = False
+            self._wakeup.notify()
+
+    # --- Background polling ---
+
+    def _ensure_running(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="readiness-watcher", daemon=True)
+            self._thread.start()
+
+    def _next_interval(self) -> float:
+        expected = self.expected_boot_time()
+        if expected is None:
+            return self.default_interval
+        now = time.monotonic()
+        with self._lock:
+            remaining = [p.watched_at + expected - now for p in self._pending.values()]
+        if not remaining:
+            return self.default_interval
+        # Phones already past the typical boot time are polled at the fastest rate
+        return max(self.min_interval, min(self.max_interval, min(remaining)))
+
+    def _resolve(self, phone_id: str, status: int | None):
+        with self._lock:
+            pending = self._pending.pop(phone_id, None)
+        if pending is None:
+            return
+        pending.status = status
+        if status == 0:
+            self.boot_times.append(time.monotonic() - pending.watched_at)
+        for callback in pending.callbacks:
+            try:
+                callback(phone_id, status)
+            except Exception as e:
+                print(f"Readiness callback for {phone_id} failed: {e}")
+        pending.event.set()
+
+    def _poll_once(self):
+        with self._lock:
+            phone_ids = list(self._pending)
+        self.polls += 1
+        # get_phone_status splits the IDs into concurrent chunks of 100 itself
+        status_info = get_phone_status(phone_ids)
+        for detail in status_info.get("successDetails", []):
+            if detail.get("status") in FINAL_STATUSES:
+                self._resolve(detail["id"], detail["status"])
+        for detail in status_info.get("failDetails", []):
+            print(f"Status query failed for phone {detail.get('id')}: {detail.get('msg')}")
+            self._resolve(detail.get("id"), None)
+
+    def _expire_overdue(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [p.phone_id for p in self._pending.values() if now >= p.deadline]
+        for phone_id in expired:
+            print(f"Phone {phone_id} did not finish booting before its deadline.")
+            self._resolve(phone_id, None)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while self._running and not self._pending:
+                    self._wakeup.wait()
+                if not self._running:
+                    return
+            # Give freshly started phones a moment before the first poll
+            time.sleep(self._next_interval())
+            try:
+                self._poll_once()
+            except Exception as e:
+                # Keep polling: a failed tick must not strand the phones still waiting
+                print(f"Readiness poll failed: {e}")
+            self._expire_overdue()
+
+_watcher: ReadinessWatcher | None = None
+
+def get_watcher() -> ReadinessWatcher:
+    """Returns the process-wide readiness watcher."""
+    global _watcher
+    if _watcher is None:
+        _watcher = ReadinessWatcher()
+    return _watcher
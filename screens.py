@@ -0,0 +1,271 @@
+import time
+import xml.etree.ElementTree as ElementTree
+from typing import Callable
+from geometry import get_geometry_cache
+
+NAV_BAR_ID = "com.bumble.app:id/mainApp_navigationTabBar"
+
+POPUP = "popup"
+MARKER = "marker"
+
+class Rule:
+    """
+    One recognisable element of a screen. A rule matches a snapshot if any node satisfies
+    all of its conditions; conditions left as None are not checked.
+
+    Args:
+        name (str): Name the match is reported under.
+        kind (str): POPUP (reported in ScreenState.popups) or MARKER (used to derive the state).
+        resource_id (str | tuple[str]): The node's resource-id, or one of several.
+        cls (str): The node's class (e.g. "android.widget.TextView").
+        text (str): Exact text.
+        text_contains (tuple[str]): Substrings that must all be in the text.
+        desc (str): Exact content-desc.
+    """
+
+    __slots__ = ("name", "kind", "resource_ids", "cls", "text", "text_contains", "desc")
+
+    def __init__(self, name: str, kind: str, resource_id: str | tuple[str] = None, cls: str = None, text: str = None, text_contains: tuple[str] = (), desc: str = None):
+        self.name = name
+        self.kind = kind
+        self.resource_ids = (resource_id,) if isinstance(resource_id, str) else resource_id
+        self.cls = cls
+        self.text = text
+        self.text_contains = text_contains
+        self.desc = desc
+
+    def matches(self, attrib: dict) -> bool:
+        if self.resource_ids is not None and attrib.get("resource-id") not in self.resource_ids:
+            return False
+        if self.cls is not None and attrib.get("class") != self.cls:
+            return False
+        if self.desc is not None and attrib.get("content-desc") != self.desc:
+            return False
+        text = attrib.get("text", "")
+        if self.text is not None and text != self.text:
+            return False
+        return all(part in text for part in self.text_contains)
+
+# Everything the classifier recognises. Popups are reported in this order, so a caller
+# handling only the first popup handles the one listed first.
+RULES = (
+    # Popups and interstitials (the locators the swipe/chat/cli handlers wait for)
+    Rule("its_a_match", POPUP, resource_id="com.bumble.app:id/match_explanationTitle", text="What a match!"),
+    Rule("opening_moves_info", POPUP, cls="android.widget.TextView", text="Kick things off with Opening Moves"),
+    Rule("interested_confirmation", POPUP, resource_id="com.bumble.app:id/parentPanel"),
+    Rule("adjust_filters", POPUP, cls="android.widget.TextView", text_contains=("You’ve seen everyone nearby",)),
+    Rule("out_of_likes", POPUP, cls="android.widget.TextView", text="You’re all out of likes"),
+    Rule("premium_ad", POPUP, cls="android.widget.TextView", text="Find who you're looking for, faster"),
+    Rule("superswipe_info", POPUP, cls="android.widget.TextView", text="Supercharge your chance to match"),
+    Rule("first_move_info", POPUP, cls="android.widget.TextView", text_contains=("It's time to", "make your move")),
+    Rule("best_photo", POPUP, cls="android.widget.TextView", text="Put your best photo first"),
+    Rule("spotlight_promo", POPUP, text_contains=("Spotlight is the easiest way",)),
+    Rule("opening_moves_promo", POPUP, text_contains=("Get to good conversation, faster",)),
+    Rule("update_prompt", POPUP, resource_id="com.bumble.app:id/ctaBox_header"),
+    # Screen markers
+    Rule("nav_bar", MARKER, resource_id=NAV_BAR_ID),
+    Rule("profile_card", MARKER, resource_id=(
+        "com.bumble.app:id/encountersGridItem_summaryContainer",
+        "com.bumble.app:id/encountersGridItem_aboutContainer",
+    )),
+    Rule("chat_list", MARKER, resource_id="com.bumble.app:id/connections_connectionsList"),
+    Rule("matches_row", MARKER, resource_id="com.bumble.app:id/connections_expiringConnectionsTitle"),
+    Rule("chat_input", MARKER, resource_id="com.bumble.app:id/chatInput_text"),
+    Rule("chat_toolbar", MARKER, resource_id="com.bumble.app:id/chatToolbar_title"),
+    Rule("opening_move", MARKER, resource_id="com.bumble.app:id/initialChatV3_container"),
+    Rule("age_slider", MARKER, resource_id="com.bumble.app:id/range_bar_item"),
+    Rule("higher_age_thumb", MARKER, cls="com.badoo.mobile.component.rangebar.RangeBarItem", desc="Higher age"),
+    Rule("filters_apply", MARKER, text="Apply"),
+    Rule("filters_apply", MARKER, text="APPLY"),
+)
+
+def _index_rules(rules: tuple[Rule]) -> tuple[dict, dict, list]:
+    """
+    Rules keyed by resource-id or, without one, by content-desc (one dict lookup per node),
+    and the rest, which need the node's text.
+    """
+    by_id, by_desc, by_text = {}, {}, []
+    for rule in rules:
+        if rule.resource_ids is not None:
+            for resource_id in rule.resource_ids:
+                by_id.setdefault(resource_id, []).append(rule)
+        elif rule.desc is not None:
+            by_desc.setdefault(rule.desc, []).append(rule)
+        else:
+            by_text.append(rule)
+    return by_id, by_desc, by_text
+
+_RULES_BY_ID, _RULES_BY_DESC, _TEXT_RULES = _index_rules(RULES)
+
+def parse_bounds(bounds: str) -> tuple[int, int, int, int] | None:
+    """UiAutomator bounds "[x1,y1][x2,y2]" as (x1, y1, x2, y2); None if malformed."""
+    try:
+        first, second = bounds.strip("[]").split("][")
+        x1, y1 = first.split(",")
+        x2, y2 = second.split(",")
+        return int(x1), int(y1), int(x2), int(y2)
+    except (AttributeError, ValueError):
+        return None
+
+class ScreenState:
+    """
+    What one page_source snapshot shows.
+
+    Attributes:
+        tab (str): content-desc of the selected navigation tab (e.g. "People"), None if there is none.
+        tabs (dict[str, tuple]): content-desc -> bounds of every tab in the navigation bar.
+        nav_bar (tuple): Bounds of the navigation bar, None if it is not displayed.
+        popups (tuple[str]): Names of the popups showing, in RULES order.
+        profile (str): On the People tab, "loaded" once a profile card is shown, else "loading"; None elsewhere.
+        chat_list (bool): The chat list (Chats tab) is showing.
+        chat (bool): An individual chat is open.
+        opening_move (bool): The open chat shows an Opening Move prompt.
+        filters (bool): The filter screen (age slider) is showing.
+        matched (frozenset[str]): Names of all rules that matched.
+        elements (dict[str, dict]): Rule name -> attributes of the first node it matched.
+        rotation (int): Display rotation reported by the dump (0-3), None if missing.
+    """
+
+    __slots__ = ("tab", "tabs", "nav_bar", "popups", "profile", "chat_list", "chat", "opening_move", "filters",
+                 "matched", "elements", "rotation")
+
+    def __init__(self, tab: str = None, tabs: dict = None, nav_bar: tuple = None, popups: tuple = (),
+                 profile: str = None, chat_list: bool = False, chat: bool = False, opening_move: bool = False,
+                 filters: bool = False, matched: frozenset = frozenset(), elements: dict = None, rotation: int = None):
+        self.tab = tab
+        self.tabs = tabs or {}
+        self.nav_bar = nav_bar
+        self.popups = popups
+        self.profile = profile
+        self.chat_list = chat_list
+        self.chat = chat
+        self.opening_move = opening_move
+        self.filters = filters
+        self.matched = matched
+        self.elements = elements or {}
+        self.rotation = rotation
+
+    @property
+    def screen_id(self) -> str:
+        """The identifier helper.get_current_screen_by_tab has always returned (e.g. "PEOPLE_SCREEN")."""
+        if self.nav_bar is None:
+            return "NAV_BAR_NOT_FOUND"
+        if self.tab is None:
+            return "UNKNOWN_SCREEN_SELECTED_TAB_NOT_FOUND_IN_NAV_BAR"
+        return self.tab.upper().replace(" ", "_") + "_SCREEN"
+
+    def has_popup(self, name: str = None) -> bool:
+        """True if popup `name` (or, without a name, any known popup) is showing."""
+        return bool(self.popups) if name is None else name in self.popups
+
+    def bounds(self, name: str) -> tuple[int, int, int, int] | None:
+        """Bounds of the node rule `name` matched, None if it did not match."""
+        attrib = self.elements.get(name)
+        return parse_bounds(attrib.get("bounds", "")) if attrib is not None else None
+
+    def is_enabled(self, name: str) -> bool:
+        """True if rule `name` matched a node that is enabled."""
+        attrib = self.elements.get(name)
+        return attrib is not None and attrib.get("enabled") != "false"
+
+    def __repr__(self):
+        return (f"ScreenState(tab={self.tab!r}, popups={self.popups!r}, profile={self.profile!r}, "
+                f"chat_list={self.chat_list!r}, chat={self.chat!r})")
+
+def classify_page_source(page_source: str | bytes) -> ScreenState | None:
+    """
+    Classify a UiAutomator2 page_source dump in a single pass over its nodes.
+
+    Returns:
+        ScreenState | None: The screen state, or None if the dump could not be parsed.
+    """
+    try:
+        root = ElementTree.fromstring(page_source)
+    except ElementTree.ParseError as e:
+        print(f"Could not parse the page source: {e}")
+        return None
+
+    elements = {}
+    nav_node = None
+    for node in root.iter():
+        attrib = node.attrib
+        for rule in _RULES_BY_ID.get(attrib.get("resource-id"), ()):
+            if rule.name not in elements and rule.matches(attrib):
+                elements[rule.name] = attrib
+                if rule.name == "nav_bar" and nav_node is None and attrib.get("displayed") != "false":
+                    nav_node = node
+        for rule in _RULES_BY_DESC.get(attrib.get("content-desc"), ()):
+            if rule.name not in elements and rule.matches(attrib):
+                elements[rule.name] = attrib
+        if "text" in attrib and attrib["text"]:
+            for rule in _TEXT_RULES:
+                if rule.name not in elements and rule.matches(attrib):
+                    elements[rule.name] = attrib
+    matched = set(elements)
+
+    tab, tabs, nav_bounds = None, {}, None
+    if nav_node is not None:
+        nav_bounds = parse_bounds(nav_node.get("bounds", ""))
+        for node in nav_node.iter("android.view.ViewGroup"):
+            desc = node.get("content-desc")
+            if not desc:
+                continue
+            tabs.setdefault(desc, parse_bounds(node.get("bounds", "")))
+            if tab is None and node.get("selected") == "true":
+                tab = desc
+    else:
+        matched.discard("nav_bar")
+        elements.pop("nav_bar", None)
+
+    return ScreenState(
+        tab=tab,
+        tabs=tabs,
+        nav_bar=nav_bounds if nav_node is not None else None,
+        popups=tuple(rule.name for rule in RULES if rule.kind == POPUP and rule.name in matched),
+        profile=("loaded" if "profile_card" in matched else "loading") if tab == "People" else None,
+        chat_list="chat_list" in matched and "matches_row" in matched,
+        chat="chat_input" in matched or "chat_toolbar" in matched,
+        opening_move="opening_move" in matched,
+        filters="age_slider" in matched,
+        matched=frozenset(matched),
+        elements=elements,
+        rotation=int(root.get("rotation")) if root.get("rotation", "").isdigit() else None,
+    )
+
+def classify_screen(driver) -> ScreenState | None:
+    """
+    Classify what the device shows with one round trip (driver.page_source). The
+    session's geometry cache is updated from the snapshot on the way.
+
+    Returns:
+        ScreenState | None: The screen state, or None if the snapshot failed.
+    """
+    try:
+        page_source = driver.page_source
+    except Exception as e:
+        print(f"Could not get the page source: {e}")
+        return None
+    state = classify_page_source(page_source)
+    if state is not None:
+        get_geometry_cache().observe(driver, state)
+    return state
+
+def wait_for_screen(driver, predicate: Callable[[ScreenState], bool], timeout: float = 5.0, poll: float = 0.25) -> ScreenState | None:
+    """
+    Take snapshots until `predicate(state)` holds or `timeout` seconds pass (at least one snapshot).
+
+    Returns:
+        ScreenState | None: The first state satisfying the predicate, else the last state seen
+                            (check it with the predicate), or None if no snapshot succeeded.
+    """
+    deadline = time.monotonic() + timeout
+    state = None
+    while True:
+        current = classify_screen(driver)
+        if current is not None:
+            state = current
+            if predicate(state):
+                return state
+        if time.monotonic() + poll > deadline:
+            return state
+        time.sleep(poll)
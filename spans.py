@@ -0,0 +1,156 @@
+import contextlib
+import json
+import os
+import tempfile
+import time
+import uuid
+from ratelimit import FileLock
+
+# Order in which the phases of a device run happen (used to sort reports)
+PHASES = (
+    "bring_up_wait", "start", "status_wait", "adb_info", "adb_connect", "login",
+    "appium_service", "driver_session", "driver_settle", "app_foreground", "open_page",
+)
+
+def get_spans_path() -> str:
+    """JSON-lines file the device run records are appended to (geelark_spans_path)."""
+    return os.getenv("geelark_spans_path", os.path.join(tempfile.gettempdir(), "geelark_device_runs.jsonl"))
+
+def new_run_id() -> str:
+    """Identifier shared by the device runs of one fleet run."""
+    return f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+class SpanRecorder:
+    """
+    Times the phases of one device run and writes them as a single structured record.
+
+    Phases are timed with span() (nested or repeated spans of the same name add up);
+    phases measured elsewhere, such as the orchestrator's bring-up stages, are added
+    with add(). mark("first_action") records the time-to-first-action, measured from
+    when the recorder was created.
+
+    Args:
+        device_id (str): ID of the device (cloud phone ID or adb serial).
+        device_name (str): Display name of the device.
+        run_id (str): Fleet run this device run belongs to.
+    """
+
+    def __init__(self, device_id: str, device_name: str = None, run_id: str = None):
+        self.device_id = device_id
+        self.device_name = device_name
+        self.run_id = run_id
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.spans = []
+        self.marks = {}
+        self.outcome = None
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._t0
+
+    @contextlib.contextmanager
+    def span(self, name: str):
+        """Time the body of a with-block as phase `name`; a raising body is recorded as not ok."""
+        start = self._now()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.spans.append({"name": name, "start": round(start, 4), "duration": round(self._now() - start, 4), "ok": ok})
+
+    def add(self, name: str, duration: float):
+        """Record a phase that was timed elsewhere (start is unknown)."""
+        self.spans.append({"name": name, "start": None, "duration": round(duration, 4), "ok": True})
+
+    def mark(self, name: str):
+        """Record the first time `name` happened, in seconds since the recorder was created."""
+        self.marks.setdefault(name, round(self._now(), 4))
+
+    def phases(self) -> dict[str, float]:
+        """Total seconds per phase name."""
+        totals = {}
+        for span in self.spans:
+            totals[span["name"]] = totals.get(span["name"], 0.0) + span["duration"]
+        return totals
+
+    def record(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "device_id": self.device_id,
+            "device_name": self.device_name,
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "total": round(self._now(), 4),
+            "outcome": self.outcome,
+            "time_to_first_action": self.marks.get("first_action"),
+            "phases": {name: round(total, 4) for name, total in self.phases().items()},
+            "spans": self.spans,
+            "marks": self.marks,
+        }
+
+    def write(self, path: str = None) -> dict:
+        """Append the record as one JSON line (safe across worker processes). Returns the record."""
+        path = path or get_spans_path()
+        record = self.record()
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        try:
+            with FileLock(path + ".lock"):
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write(line)
+        except OSError as e:
+            print(f"Could not write the timing record of {self.device_id}: {e}")
+        return record
+
+def span(recorder: SpanRecorder | None, name: str):
+    """recorder.span(name), or a no-op context when there is no recorder."""
+    return recorder.span(name) if recorder is not None else contextlib.nullcontext()
+
+def read_records(path: str = None, run_id: str = None) -> list[dict]:
+    """Device run records from the spans file, optionally only those of one fleet run."""
+    path = path or get_spans_path()
+    records = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a torn line from a killed process
+                if run_id is None or record.get("run_id") == run_id:
+                    records.append(record)
+    except FileNotFoundError:
+        pass
+    return records
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def aggregate(records: list[dict]) -> dict[str, dict]:
+    """
+    Per-phase statistics across device runs.
+
+    Returns:
+        dict[str, dict]: {phase: {"runs", "p50", "p95", "max", "total"}} in PHASES order (unknown
+                         phases last), plus "time_to_first_action" and "total" entries.
+    """
+    samples = {}
+    for record in records:
+        for name, duration in record.get("phases", {}).items():
+            samples.setdefault(name, []).append(duration)
+        if record.get("time_to_first_action") is not None:
+            samples.setdefault("time_to_first_action", []).append(record["time_to_first_action"])
+        samples.setdefault("total", []).append(record.get("total", 0.0))
+
+    order = {name: index for index, name in enumerate(PHASES + ("time_to_first_action", "total"))}
+    stats = {}
+    for name in sorted(samples, key=lambda name: (order.get(name, len(PHASES) - 0.5), name)):
+        ordered = sorted(samples[name])
+        stats[name] = {
+            "runs": len(ordered),
+            "p50": _percentile(ordered, 0.5),
+            "p95": _percentile(ordered, 0.95),
+            "max": ordered[-1],
+            "total": sum(ordered),
+        }
+    return stats
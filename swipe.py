@@ -1,113 +1,77 @@
 import random
 import time
+from typing import Callable
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.actions import interaction
 from selenium.webdriver.common.actions.action_builder import ActionBuilder
 from selenium.webdriver.common.actions.pointer_input import PointerInput
-from appium.webdriver.common.appiumby import AppiumBy
 from selenium.common.exceptions import NoSuchElementException, TimeoutException # Added TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from helper import handle_adjust_filters_prompt
 from helper import adjust_age_filter_and_apply
 from helper import get_screen_dimensions
+from locators import LOCATORS, locator
+from screens import classify_screen
 from rich import print as rprint
 import logging
 
 log = rprint
 
 # Using a distinctive text on the ad screen for initial detection
-PREMIUM_AD_IDENTIFIER_TEXT_LOCATOR = (AppiumBy.XPATH, "//android.widget.TextView[@text=\"Find who you're looking for, faster\"]")
+PREMIUM_AD_IDENTIFIER_TEXT_LOCATOR = locator("premium_ad_title")
 
-# The "Maybe later" button is a clickable View containing a TextView with text "Maybe later"
-PREMIUM_AD_MAYBE_LATER_BUTTON_LOCATOR = (
-    AppiumBy.XPATH, 
-    "//android.view.View[@clickable='true' and .//android.widget.TextView[@text=\"Maybe later\"]]"
-)
+# The "Maybe later" label; tapping it lands on the clickable View that contains it
+PREMIUM_AD_MAYBE_LATER_BUTTON_LOCATOR = locator("maybe_later_button")
 # --- Locators for the SuperSwipe Info Popup ---
 # Using a distinctive text on the popup for initial detection
-SUPERSWIPE_POPUP_IDENTIFIER_TEXT_LOCATOR = (
-    AppiumBy.XPATH, 
-    "//android.widget.TextView[@text=\"Supercharge your chance to match\"]"
-)
+SUPERSWIPE_POPUP_IDENTIFIER_TEXT_LOCATOR = locator("superswipe_title")
 
-# The "Got it" button is a clickable View containing a TextView with text "Got it"
-SUPERSWIPE_POPUP_GOT_IT_BUTTON_LOCATOR = (
-    AppiumBy.XPATH, 
-    "//android.view.View[@clickable='true' and .//android.widget.TextView[@text=\"Got it\"]]"
-)
+# The "Got it" label; tapping it lands on the clickable View that contains it
+SUPERSWIPE_POPUP_GOT_IT_BUTTON_LOCATOR = locator("superswipe_got_it")
 
 # Alternative: Close button at the top right of the popup content area
-SUPERSWIPE_POPUP_CLOSE_BUTTON_LOCATOR = (
-    AppiumBy.XPATH,
-    "//android.widget.ImageView[@content-desc='Close' and @clickable='true']"
-)
-
-FIRST_MOVE_SCREEN_IDENTIFIER_TEXT_LOCATOR = (
-    AppiumBy.XPATH, 
-    "//android.widget.TextView[contains(@text, \"It's time to\") and contains(@text, \"make your move\")]"
-) 
-FIRST_MOVE_SCREEN_CLOSE_BUTTON_LOCATOR = (
-    AppiumBy.ID, "com.bumble.app:id/navbar_button_navigation"
-)
-
-ITS_A_MATCH_SCREEN_IDENTIFIER_TEXT = (AppiumBy.XPATH, "//*[@resource-id='com.bumble.app:id/match_explanationTitle' and @text='What a match!']")
+SUPERSWIPE_POPUP_CLOSE_BUTTON_LOCATOR = locator("superswipe_close")
+
+FIRST_MOVE_SCREEN_IDENTIFIER_TEXT_LOCATOR = locator("first_move_title")
+FIRST_MOVE_SCREEN_CLOSE_BUTTON_LOCATOR = locator("first_move_close")
+
+ITS_A_MATCH_SCREEN_IDENTIFIER_TEXT = locator("its_a_match_title")
 # Or by container ID if more stable:
 # ITS_A_MATCH_SCREEN_CONTAINER_ID = (AppiumBy.ID, "com.bumble.app:id/mutualAttraction_topContainer")
 
 # "Opening Moves" info box elements (if present on the "It's a Match!" screen)
-OPENING_MOVES_INFO_BOX_TEXT_LOCATOR = (AppiumBy.XPATH, "//android.widget.TextView[@text='Kick things off with Opening Moves']")
-OPENING_MOVES_INFO_BOX_GOT_IT_BUTTON_LOCATOR = (
-    AppiumBy.XPATH,
-    "//androidx.compose.ui.platform.ComposeView[.//android.widget.TextView[@text='Kick things off with Opening Moves']]//android.view.View[@clickable='true' and .//android.widget.TextView[@text='Got it']]"
-) # This XPath is more specific to the "Got it" within the "Opening Moves" box
+OPENING_MOVES_INFO_BOX_TEXT_LOCATOR = locator("opening_moves_info_title")
+OPENING_MOVES_INFO_BOX_GOT_IT_BUTTON_LOCATOR = locator("opening_moves_info_got_it")
 
 # Main "Close" button for the entire "It's a Match!" screen (top left)
-ITS_A_MATCH_MAIN_CLOSE_BUTTON_LOCATOR = (AppiumBy.ID, "com.bumble.app:id/match_close")
+ITS_A_MATCH_MAIN_CLOSE_BUTTON_LOCATOR = locator("its_a_match_close")
 
-MATCH_SCREEN_MINI_COMPOSER_INPUT_LOCATOR = (AppiumBy.ID, "com.bumble.app:id/composerMini_text")
-MATCH_SCREEN_MINI_COMPOSER_SEND_ICON_LOCATOR = (AppiumBy.ID, "com.bumble.app:id/composerMini_icon")
+MATCH_SCREEN_MINI_COMPOSER_INPUT_LOCATOR = locator("mini_composer_input")
+MATCH_SCREEN_MINI_COMPOSER_SEND_ICON_LOCATOR = locator("mini_composer_send")
 
-BEST_PHOTO_POPUP_IDENTIFIER_TEXT_LOCATOR = (
-    AppiumBy.XPATH, 
-    "//android.widget.TextView[@text='Put your best photo first']"
-)
+# "They saw you, they're into you" Premium upsell
+THEY_SAW_YOU_POPUP_IDENTIFIER_TEXT_LOCATOR = locator("they_saw_you_title")
+THEY_SAW_YOU_POPUP_MAYBE_LATER_BUTTON_LOCATOR = locator("maybe_later_button")
+
+BEST_PHOTO_POPUP_IDENTIFIER_TEXT_LOCATOR = locator("best_photo_title")
 # The "Save and close" button
-BEST_PHOTO_POPUP_SAVE_AND_CLOSE_BUTTON_LOCATOR = (
-    AppiumBy.XPATH, 
-    "//android.widget.Button[@text='Save and close']"
-)
+BEST_PHOTO_POPUP_SAVE_AND_CLOSE_BUTTON_LOCATOR = locator("best_photo_save")
 
-PROFILE_CARD_LOADED_INDICATOR_XPATH = (
-    "//*[@resource-id='com.bumble.app:id/encountersGridItem_summaryContainer' or "
-    "@resource-id='com.bumble.app:id/encountersGridItem_aboutContainer']"
-)
+PROFILE_CARD_LOADED_INDICATOR_XPATH = LOCATORS["profile_loaded"].reference[1]
 
-NAV_BAR_LOCATOR = (AppiumBy.ID, "com.bumble.app:id/mainApp_navigationTabBar")
+NAV_BAR_LOCATOR = locator("nav_bar")
 # Bumble logo, typical of the swipe screen
-NAVBAR_LOGO_LOCATOR = (AppiumBy.ID, "com.bumble.app:id/navbar_logo")
-
-PROFILE_SCROLL_CONTAINER_LOCATOR = (
+NAVBAR_LOGO_LOCATOR = locator("navbar_logo")
 
-    AppiumBy.ID,
-    "com.bumble.app:id/encountersGridProfile_list"
-)
-SELECTED_PEOPLE_TAB_LOCATOR = (
-    AppiumBy.XPATH,
-    "//android.view.ViewGroup[@content-desc='People' and @selected='true']"
-)
+PROFILE_SCROLL_CONTAINER_LOCATOR = locator("profile_list")
+SELECTED_PEOPLE_TAB_LOCATOR = locator("people_tab_selected")
 
-OUT_OF_LIKES_HEADER_LOCATOR = (
-    AppiumBy.XPATH,
-    "//android.widget.TextView[@text='You’re all out of likes']"
-)
+OUT_OF_LIKES_HEADER_LOCATOR = locator("out_of_likes_title")
 
-LOADING_SKELETON_LOCATOR = (
-    AppiumBy.XPATH, 
-    "//androidx.compose.ui.platform.ComposeView/android.view.View/android.view.View"
-)
+LOADING_SKELETON_LOCATOR = locator("loading_skeleton")
 
-PROFILE_SUMMARY_CONTAINER_LOCATOR = (AppiumBy.ID, "com.bumble.app:id/encountersGridItem_summaryContainer")
+PROFILE_SUMMARY_CONTAINER_LOCATOR = locator("profile_summary")
 
 def is_profile_loading(driver, timeout_sec=0.5):
     """
@@ -307,7 +271,7 @@ def handle_they_saw_you_premium_popup(driver, timeout=1):
             # The XML structure for the close button is: clickable View -> (View content-desc="Close", Button)
             # We target the clickable View that contains the "Close" element.
             # Let's refine the close button XPath for this specific structure:
-            actual_close_button_locator = (AppiumBy.XPATH, "//android.view.View[@clickable='true' and .//android.view.View[@content-desc='Close']]")
+            actual_close_button_locator = locator("they_saw_you_close")
             # This looks for a clickable View that has a descendant View with content-desc="Close".
 
             close_button = WebDriverWait(driver, timeout).until(
@@ -637,8 +601,12 @@ def handle_premium_ad_popup(driver, timeout=1):
         return False
 
 def is_popup_present(driver):
-    popup = driver.find_elements(AppiumBy.XPATH, "//android.view.ViewGroup/android.view.View/android.view.View/android.view.View")
-    return len(popup) > 0
+    """
+    True if one of the popups the screen classifier knows (screens.RULES) is showing.
+    Takes one page_source snapshot; a failed snapshot counts as no popup.
+    """
+    state = classify_screen(driver)
+    return state is not None and state.has_popup()
 
 def handle_interested_confirmation_popup(driver, timeout=1):
     """
@@ -653,14 +621,14 @@ def handle_interested_confirmation_popup(driver, timeout=1):
         bool: True if the popup was detected and "YES" was clicked, False otherwise.
     """
     # Locators based on the provided XML for the "Interested?" popup
-    popup_panel_locator = (AppiumBy.ID, "com.bumble.app:id/parentPanel") # Main dialog panel
-    yes_button_locator = (AppiumBy.ID, "android:id/button1") # Standard Android dialog "positive" button ID
+    popup_panel_locator = locator("interested_panel") # Main dialog panel
+    yes_button_locator = locator("dialog_positive_button") # Standard Android dialog "positive" button ID
     # More specific XPath for YES button if needed:
     # yes_button_locator_xpath = (AppیمBy.XPATH, "//android.widget.Button[@resource-id='android:id/button1' and @text='YES']")
 
     try:
         yes_button = WebDriverWait(driver, timeout).until(
-            EC.element_to_be_clickable((AppiumBy.ID, "android:id/button1"))
+            EC.element_to_be_clickable(yes_button_locator)
         )
         action_delay = random.uniform(0.2, 0.4)
         log(f"[yellow]Popup 'Interested?' detected. Clicking YES in {action_delay:.2f}s...[/yellow]")
@@ -848,7 +816,7 @@ def ensure_bumble_app_running(driver):
             return None
     return True
     # App is in foreground, continue with rest of function...
-def realistic_swipe(driver, right_swipe_probability=5, duration_minutes=5,logger_func: logging.Logger = rprint,messaging_probability=4):
+def realistic_swipe(driver, right_swipe_probability=5, duration_minutes=5,logger_func: logging.Logger = rprint,messaging_probability=4, device_guard: Callable[[], bool] = None):
     """
     Perform realistic swipes on Bumble with profile checking behavior.
     
@@ -856,12 +824,15 @@ def realistic_swipe(driver, right_swipe_probability=5, duration_minutes=5,logger
         driver: Appium WebDriver instance
         right_swipe_probability: Probability of swiping right (0-10)
         duration_minutes: How long to run the swiping session
+        device_guard: Checked before every profile; returning False (device detached) ends the session
     """
     global log
     log = logger_func
     end_time = time.time() + (duration_minutes * 60)
     
     while time.time() < end_time:
+        if device_guard is not None and not device_guard():
+            return
         # Random delay between profiles (2-3 seconds)
         loading_start_time = time.time()
         if not ensure_bumble_app_running(driver):
@@ -888,7 +859,6 @@ def realistic_swipe(driver, right_swipe_probability=5, duration_minutes=5,logger
             log(f"[grey50]Time taken for its a match popup check: {time.time() - start_time:.3f} seconds[/grey50]")
 
             # 3. "Out of likes" or other critical blocking popups
-            # IMPORTANT: Ensure is_popup_present uses SPECIFIC locators for the "out of likes" popup.
 
             start_time = time.time()
             if is_popup_present(driver): 
@@ -1022,7 +992,6 @@ def realistic_swipe(driver, right_swipe_probability=5, duration_minutes=5,logger
 if __name__ == "__main__":
     # Test configuration
     from appium import webdriver
-    from appium.webdriver.common.appiumby import AppiumBy
     from appium.options.android import UiAutomator2Options
     options = UiAutomator2Options()
     options.platform_name = "Android"
@@ -0,0 +1,73 @@
+import socket
+import threading
+import time
+import pytest
+from adb_stub import AdbStubServer
+from adbclient import AdbClient, AdbError
+
+@pytest.fixture
+def stub():
+    with AdbStubServer(devices={"emulator-5554": {"ro.product.model": "Pixel 6"}}) as stub:
+        yield stub
+
+class RecordingServer:
+    """Accepts one connection, records the request bytes and answers with a canned reply."""
+
+    def __init__(self, reply: bytes):
+        self.reply = reply
+        self.received = b""
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self._listener.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        conn, _ = self._listener.accept()
+        with conn:
+            length = conn.recv(4)
+            self.received = length + conn.recv(int(length, 16))
+            conn.sendall(self.reply)
+        self._listener.close()
+
+def test_request_is_length_prefixed_and_reply_string_is_read():
+    server = RecordingServer(b"OKAY" + b"0004" + b"0029")
+    assert AdbClient(port=server.port, pool_size=0).version() == 0x29
+    assert server.received == b"000chost:version"
+
+def test_fail_reply_raises_with_the_server_message():
+    server = RecordingServer(b"FAIL" + b"0010" + b"device not found")
+    with pytest.raises(AdbError, match="device not found"):
+        AdbClient(port=server.port, pool_size=0).connect("10.0.0.1:5555")
+
+def test_track_devices_parses_every_update(stub):
+    client = AdbClient(port=stub.port, pool_size=0)
+    tracker = client.track_devices(idle_timeout=2)
+    try:
+        first = next(tracker)
+        assert [(device["serial"], device["state"], device["transport_id"]) for device in first] == [("emulator-5554", "device", "1")]
+        stub.attach("10.0.0.1:5555", {"ro.product.model": "Stub"})
+        update = next(tracker)
+        assert [device["serial"] for device in update] == ["emulator-5554", "10.0.0.1:5555"]
+        assert update[1]["model"] == "Stub" and update[1]["transport_id"] == "2"
+    finally:
+        tracker.close()
+
+def test_shell_returns_output_and_exit_status(stub):
+    client = AdbClient(port=stub.port, pool_size=0)
+    assert client.shell("emulator-5554", "getprop ro.product.model") == ("Pixel 6\n", 0)
+    assert client.shell("emulator-5554", "no_such_tool") == ("/system/bin/sh: no_such_tool: not found\n", 127)
+    with pytest.raises(AdbError, match="not found"):
+        client.shell("missing", "true")
+
+def test_kill_server_leaves_no_idle_connections(stub):
+    client = AdbClient(port=stub.port, pool_size=3)
+    client.version()
+    deadline = time.monotonic() + 2
+    while len(client._idle) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(client._idle) == 3
+
+    client.kill_server()
+    time.sleep(0.2)  # let a refill that was woken up before the kill run
+    assert len(client._idle) == 0
+    assert stub.stopped
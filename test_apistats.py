@@ -0,0 +1,43 @@
+import json
+import os
+import pytest
+from apistats import ApiStats, RUN_ENV
+
+@pytest.fixture
+def stats(tmp_path, monkeypatch) -> ApiStats:
+    monkeypatch.delenv(RUN_ENV, raising=False)
+    return ApiStats(str(tmp_path / "stats"))
+
+def write_snapshot(stats: ApiStats, name: str, snapshot):
+    os.makedirs(stats.stats_dir, exist_ok=True)
+    with open(os.path.join(stats.stats_dir, name), "w", encoding="utf-8") as f:
+        json.dump(snapshot, f)
+
+def test_latencies_land_in_their_buckets(stats):
+    stats.record_attempt("/phone/status", 0.04, 200, 10, 100)
+    stats.record_attempt("/phone/status", 0.3, 500, 10, 0)
+    stats.record_call("/phone/status", attempts=2, succeeded=True, api_code=0)
+
+    report = stats.merged()["/phone/status"]
+    assert report["histogram"][0] == 1 and report["histogram"][3] == 1
+    assert report["retries"] == 1
+    assert report["http_status"] == {"200": 1, "500": 1}
+
+def test_snapshots_of_other_runs_are_not_merged(stats):
+    write_snapshot(stats, "1.json", {"run_id": "earlier", "endpoints": {"/phone/list": {"calls": 100}}})
+    write_snapshot(stats, "2.json", {"/phone/list": {"calls": 100}})  # written before snapshots had a run ID
+    write_snapshot(stats, "3.json", {"run_id": stats.run_id, "endpoints": {"/phone/list": {"calls": 2}}})
+    stats.record_call("/phone/list", attempts=1, succeeded=True)
+
+    assert stats.merged()["/phone/list"]["calls"] == 3
+
+def test_reset_starts_a_run_inherited_by_new_processes(stats):
+    old_run = stats.run_id
+    stats.record_call("/phone/list", attempts=1, succeeded=True)
+    stats.flush()
+    stats.reset()
+
+    assert stats.run_id != old_run
+    assert os.environ[RUN_ENV] == stats.run_id
+    assert ApiStats(stats.stats_dir).run_id == stats.run_id
+    assert stats.merged() == {}
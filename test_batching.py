@@ -0,0 +1,72 @@
+import threading
+import pytest
+import geelark_api
+from geelark_api import BATCH_ID_LIMIT, _batched_call, _chunked
+
+@pytest.fixture(autouse=True)
+def no_retry_pause(monkeypatch):
+    monkeypatch.setattr(geelark_api.time, "sleep", lambda seconds: None)
+
+class FakeBatchEndpoint:
+    """A batch endpoint answering per chunk; `fail_once` IDs fail with a retryable code the first time."""
+
+    def __init__(self, fail_once=(), reject=(), unanswered_chunks=0):
+        self.fail_once = set(fail_once)
+        self.reject = set(reject)
+        self.unanswered_chunks = unanswered_chunks
+        self.chunks = []
+        self._lock = threading.Lock()
+
+    def __call__(self, chunk: list[str]) -> dict | None:
+        with self._lock:
+            self.chunks.append(list(chunk))
+            if self.unanswered_chunks:
+                self.unanswered_chunks -= 1
+                return None
+            success, fail = [], []
+            for phone_id in chunk:
+                if phone_id in self.reject:
+                    fail.append({"code": 42001, "id": phone_id, "msg": "cloud phone does not exist"})
+                elif phone_id in self.fail_once:
+                    self.fail_once.discard(phone_id)
+                    fail.append({"code": 42002, "id": phone_id, "msg": "cloud phone failed to start"})
+                else:
+                    success.append({"id": phone_id})
+        return {"code": 0, "msg": "success", "data": {"successDetails": success, "failDetails": fail}}
+
+def test_ids_are_chunked_to_the_batch_limit():
+    ids = [f"p{index}" for index in range(250)]
+    assert [len(chunk) for chunk in _chunked(ids)] == [BATCH_ID_LIMIT, BATCH_ID_LIMIT, 50]
+
+def test_every_chunk_is_sent_and_merged():
+    endpoint = FakeBatchEndpoint()
+    ids = [f"p{index}" for index in range(250)]
+    result = _batched_call(endpoint, ids + ids[:10])  # duplicates are sent once
+
+    assert sorted(len(chunk) for chunk in endpoint.chunks) == [50, 100, 100]
+    assert result["code"] == 0
+    assert result["data"]["totalAmount"] == 250
+    assert result["data"]["successAmount"] == 250
+
+def test_only_retryable_failures_are_resent():
+    endpoint = FakeBatchEndpoint(fail_once={"p3", "p150"}, reject={"p7"})
+    ids = [f"p{index}" for index in range(200)]
+    result = _batched_call(endpoint, ids)
+
+    assert sorted(endpoint.chunks[-1]) == ["p150", "p3"]  # neither the successes nor the rejected p7
+    assert result["data"]["successAmount"] == 199
+    assert [detail["id"] for detail in result["data"]["failDetails"]] == ["p7"]
+
+def test_unanswered_chunks_are_retried_and_marked_undelivered():
+    endpoint = FakeBatchEndpoint(unanswered_chunks=3)
+    result = _batched_call(endpoint, ["p1", "p2"], retry_rounds=1)
+
+    assert len(endpoint.chunks) == 2
+    assert result["code"] == -1
+    assert {detail["code"] for detail in result["data"]["failDetails"]} == {-1}
+
+def test_rejected_chunks_keep_the_api_code():
+    result = _batched_call(lambda chunk: {"code": 40001, "msg": "signature error"}, ["p1", "p2"])
+
+    assert result["code"] == 40001
+    assert {detail["code"] for detail in result["data"]["failDetails"]} == {40001}
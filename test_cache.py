@@ -0,0 +1,67 @@
+import multiprocessing
+import geelark_api
+import cache
+from cache import TTLCache
+
+def _fill(path: str, worker: int):
+    shared = TTLCache(path, {})
+    for index in range(25):
+        shared.set("adb", f"{worker}-{index}", index)
+
+def test_entries_expire_after_their_namespace_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    phone_cache = TTLCache(None, {"adb": 10, "inventory": 60})
+    phone_cache.set("adb", "p1", {"code": 0})
+    phone_cache.set("inventory", "phones", [])
+
+    now[0] += 11
+    assert phone_cache.get("adb", "p1") is None
+    assert phone_cache.get("inventory", "phones") == []
+    assert phone_cache.stats()["adb"] == {"hits": 0, "misses": 1}
+
+def test_invalidate_drops_keys_or_whole_namespace():
+    phone_cache = TTLCache(None, {})
+    phone_cache.set_many("adb", {"p1": 1, "p2": 2})
+    phone_cache.set("equipment", "p1", {})
+
+    phone_cache.invalidate("adb", ["p1"])
+    assert phone_cache.get_many("adb", ["p1", "p2"]) == {"p2": 2}
+    phone_cache.invalidate("equipment")
+    assert phone_cache.get("equipment", "p1") is None
+
+def test_invalidation_is_seen_by_other_instances_of_the_file(tmp_path):
+    path = str(tmp_path / "cache.json")
+    first, second = TTLCache(path, {}), TTLCache(path, {})
+    first.set("adb", "p1", {"port": "1"})
+    assert second.get("adb", "p1") == {"port": "1"}
+
+    second.invalidate("adb", ["p1"])
+    first.set("adb", "p2", {"port": "2"})  # must not write p1 back from its stale copy
+    assert TTLCache(path, {}).get_many("adb", ["p1", "p2"]) == {"p2": {"port": "2"}}
+
+def test_concurrent_writers_keep_each_others_entries(tmp_path):
+    path = str(tmp_path / "cache.json")
+    workers = [multiprocessing.Process(target=_fill, args=(path, worker)) for worker in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    keys = [f"{worker}-{index}" for worker in range(4) for index in range(25)]
+    assert len(TTLCache(path, {}).get_many("adb", keys)) == 100
+
+def test_adb_information_is_cached_only_once_ready(monkeypatch):
+    monkeypatch.setattr(geelark_api, "phone_cache", TTLCache(None, geelark_api.CACHE_TTLS))
+    answers = [49002, 0]
+    requests_sent = []
+
+    def post_ids(endpoint, ids, action):
+        requests_sent.append(list(ids))
+        code = answers.pop(0) if answers else 0
+        return {"code": 0, "data": {"items": [{"id": ids[0], "code": code}]}}
+    monkeypatch.setattr(geelark_api, "_post_ids", post_ids)
+
+    assert geelark_api.get_adb_information(["p1"])[0]["code"] == 49002
+    assert geelark_api.get_adb_information(["p1"])[0]["code"] == 0  # not served from the cache
+    assert geelark_api.get_adb_information(["p1"])[0]["code"] == 0
+    assert len(requests_sent) == 2
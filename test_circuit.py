@@ -0,0 +1,106 @@
+import pytest
+import circuit
+import geelark_api
+from cache import TTLCache
+from circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, StopQueue
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def stop_queue(tmp_path, monkeypatch) -> StopQueue:
+    queue = StopQueue(str(tmp_path / "stop_queue.json"))
+    monkeypatch.setattr(geelark_api, "get_stop_queue", lambda: queue)
+    monkeypatch.setattr(geelark_api, "phone_cache", TTLCache(None, geelark_api.CACHE_TTLS))
+    monkeypatch.setattr(geelark_api.time, "sleep", lambda seconds: None)
+    return queue
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(circuit, "time", clock)
+    return clock
+
+def test_breaker_opens_after_consecutive_failures(tmp_path, clock):
+    breaker = CircuitBreaker(str(tmp_path / "circuit.json"), "/phone/stop", failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()  # resets the count
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+
+    assert breaker.status()["state"] == OPEN
+    assert not breaker.allow()
+    assert breaker.status()["fail_fast"] == 1
+
+def test_half_open_probe_closes_or_reopens(tmp_path, clock):
+    breaker = CircuitBreaker(str(tmp_path / "circuit.json"), "/phone/stop", failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.allow()  # the probe
+    assert breaker.status()["state"] == HALF_OPEN
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.status()["state"] == OPEN
+
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.record_success()
+    assert breaker.status()["state"] == CLOSED
+
+def test_breaker_state_is_shared_through_the_file(tmp_path, clock):
+    path = str(tmp_path / "circuit.json")
+    CircuitBreaker(path, "/phone/stop", failure_threshold=1).record_failure()
+    assert not CircuitBreaker(path, "/phone/stop").allow()
+    assert CircuitBreaker(path, "/phone/start").allow()
+
+def test_stop_queue_deduplicates_and_removes_delivered_ids(tmp_path):
+    queue = StopQueue(str(tmp_path / "stop_queue.json"))
+    queue.add(["p1", "p2"])
+    queue.add(["p2", "p3"])
+
+    assert StopQueue(queue.path).pending() == ["p1", "p2", "p3"]
+    queue.remove(["p1", "p3", "p4"])
+    assert queue.pending() == ["p2"]
+
+def test_stop_phone_requeues_only_undelivered_ids(stop_queue, monkeypatch):
+    stop_queue.add(["queued"])
+    sent = []
+
+    def post_ids(endpoint, ids, action):
+        sent.extend(ids)
+        if "down" in ids:
+            return None  # transport failure or open circuit
+        if "unknown" in ids:
+            return {"code": 0, "data": {"successDetails": [], "failDetails": [{"code": 42001, "id": "unknown", "msg": "cloud phone does not exist"}]}}
+        if "forbidden" in ids:
+            return {"code": 40001, "msg": "signature error"}
+        return {"code": 0, "data": {"successDetails": [{"id": phone_id} for phone_id in ids], "failDetails": []}}
+    monkeypatch.setattr(geelark_api, "_post_ids", post_ids)
+
+    geelark_api.stop_phone(["p1"])
+    assert "queued" in sent  # stops queued earlier go out with the next call
+    for phone_id in ("unknown", "forbidden", "down"):
+        geelark_api.stop_phone([phone_id])
+
+    assert stop_queue.pending() == ["down"]
+
+def test_queued_ids_survive_a_send_that_raises(stop_queue, monkeypatch):
+    stop_queue.add(["q1", "q2"])
+    def post_ids(endpoint, ids, action):
+        raise RuntimeError("interpreter shutting down")
+    monkeypatch.setattr(geelark_api, "_post_ids", post_ids)
+
+    assert geelark_api.stop_phone(["p1"]) is None
+    assert stop_queue.pending() == ["q1", "q2", "p1"]
+
+    monkeypatch.setattr(geelark_api, "_post_ids", lambda endpoint, ids, action: {
+        "code": 0, "data": {"successDetails": [{"id": phone_id} for phone_id in ids], "failDetails": []}})
+    assert geelark_api.flush_stop_queue()["code"] == 0
+    assert stop_queue.pending() == []
@@ -0,0 +1,44 @@
+import glob
+import os
+import xml.etree.ElementTree as ElementTree
+import pytest
+import locators
+from benchmarks.locators import select
+from screens import parse_bounds
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "fixtures", "screens")
+SCREENS = {
+    os.path.splitext(os.path.basename(path))[0]: ElementTree.parse(path).getroot()
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.xml")))
+}
+
+def _inside(inner: tuple, outer: tuple) -> bool:
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and inner[2] <= outer[2] and inner[3] <= outer[3]
+
+@pytest.mark.parametrize("name", [name for name, entry in locators.LOCATORS.items() if len(entry.strategies) > 1])
+def test_every_strategy_finds_what_the_reference_finds(name):
+    entry = locators.LOCATORS[name]
+    for screen, root in SCREENS.items():
+        reference = [parse_bounds(node.get("bounds", "")) for node in select(root, *entry.reference)]
+        for by, value in entry.strategies[:-1]:
+            found = select(root, by, value)
+            assert bool(found) == bool(reference), f"{by} on {screen}"
+            if found:
+                # The element itself or one inside it (e.g. a button's label)
+                assert any(_inside(parse_bounds(found[0].get("bounds", "")), bounds) for bounds in reference), f"{by} on {screen}"
+
+def test_ui_builds_child_and_sibling_selectors():
+    assert locators.ui(className="android.widget.TextView", text="Got it", clickable=True) == \
+        'new UiSelector().className("android.widget.TextView").text("Got it").clickable(true)'
+    assert locators.ui(text="Title", sibling=dict(text="Got it"), child=dict(text="x")) == \
+        'new UiSelector().text("Title").childSelector(new UiSelector().text("x")).fromParent(new UiSelector().text("Got it"))'
+
+def test_preferences_pick_the_strategy_and_ignore_unknown_entries(tmp_path):
+    entry = locators.LOCATORS["higher_age_thumb"]
+    path = str(tmp_path / "prefs.json")
+    try:
+        locators.save_preferences({"higher_age_thumb": locators.ACCESSIBILITY_ID, "no_such_locator": locators.XPATH}, path)
+        locators.load_preferences(path)
+        assert entry.preferred == (locators.ACCESSIBILITY_ID, "Higher age")
+    finally:
+        entry.chosen = None
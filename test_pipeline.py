@@ -0,0 +1,60 @@
+import time
+from concurrent.futures import Future
+import pipeline
+from pipeline import BringUpPipeline
+
+class RecordingHandoff:
+    def __init__(self):
+        self.values = []
+
+    def set(self, connection_info: dict):
+        self.values.append(connection_info)
+
+class RecordingTracker:
+    def __init__(self):
+        self.serials = []
+
+    def subscribe(self, serial: str, device_watch):
+        self.serials.append(serial)
+
+def test_phase_durations_come_from_the_latest_submission(monkeypatch):
+    start_delays = [0.0, 0.5]
+    def start_phone(ids):
+        time.sleep(start_delays.pop(0))
+        return None  # fail the start, ending the bring-up
+    monkeypatch.setattr(pipeline, "start_phone", start_phone)
+    bring_up = BringUpPipeline()
+    try:
+        first = bring_up.submit(["p1"])["p1"]
+        assert first.result(5) == {}
+        second = bring_up.submit(["p1"])["p1"]
+        assert second.result(5) == {}
+
+        assert bring_up.phase_durations("p1")["start"] >= 0.5
+        assert bring_up.phase_durations("p1", first)["start"] < 0.5
+        assert bring_up.phase_durations("p2") == {}
+    finally:
+        bring_up.close()
+
+def test_handoff_is_set_whatever_the_bring_up_outcome():
+    from cli import hand_off_connection
+
+    class Pipeline:
+        def phase_durations(self, phone_id, future=None):
+            return {"start": 1.0}
+
+    outcomes = [
+        lambda future: future.set_exception(RuntimeError("stage crashed")),
+        lambda future: future.cancel(),
+        lambda future: future.set_result({}),
+        lambda future: future.set_result({"ip": "10.0.0.1", "port": "5555", "pwd": "x"}),
+    ]
+    handoff, tracker = RecordingHandoff(), RecordingTracker()
+    for outcome in outcomes:
+        future = Future()
+        future.add_done_callback(lambda done: hand_off_connection(done, "p1", handoff, Pipeline(), tracker, None))
+        outcome(future)
+
+    assert handoff.values[:3] == [{}, {}, {}]
+    assert handoff.values[3]["bring_up_phases"] == {"start": 1.0}
+    assert tracker.serials == ["10.0.0.1:5555"]
@@ -0,0 +1,44 @@
+from concurrent.futures import Future
+import prewarm
+from prewarm import PrewarmScheduler
+
+class FakePipeline:
+    """Hands out futures the test resolves itself."""
+
+    def __init__(self):
+        self.futures = {}
+
+    def submit(self, phone_ids: list[str]) -> dict[str, Future]:
+        futures = {phone_id: Future() for phone_id in phone_ids}
+        self.futures.update(futures)
+        return futures
+
+def test_only_successful_bring_ups_count_as_ready(monkeypatch):
+    stopped = []
+    monkeypatch.setattr(prewarm, "stop_phone", lambda ids: stopped.extend(ids))
+    pipeline = FakePipeline()
+    scheduler = PrewarmScheduler(pipeline, ["crashed", "empty", "ok"], slots=3, idle_timeout=-1)
+    scheduler.tick()
+
+    pipeline.futures["crashed"].set_exception(RuntimeError("adb info failed"))
+    pipeline.futures["empty"].set_result({})
+    pipeline.futures["ok"].set_result({"ip": "10.0.0.1", "port": "5555"})
+
+    assert scheduler._warm["crashed"].ready_at is None
+    assert scheduler._warm["empty"].ready_at is None
+    assert scheduler._warm["ok"].ready_at is not None
+    assert len(scheduler.bring_up_times) == 1
+
+    scheduler.tick()  # only the phone that really came up can sit idle
+    assert stopped == ["ok"]
+
+def test_claiming_a_failed_warm_up_starts_the_phone_again():
+    pipeline = FakePipeline()
+    scheduler = PrewarmScheduler(pipeline, ["p1"], slots=1)
+    scheduler.tick()
+    first = pipeline.futures["p1"]
+    first.set_exception(RuntimeError("start failed"))
+
+    claimed = scheduler.claim("p1")
+    assert claimed is not first
+    assert scheduler.stats()["claimed_cold"] == 1
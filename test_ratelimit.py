@@ -0,0 +1,48 @@
+import ratelimit
+from ratelimit import SharedRateLimiter
+
+class FakeClock:
+    """Stands in for time.time/time.sleep so the bucket can be tested without waiting."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+
+def test_burst_is_served_then_requests_wait_for_refill(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+    limiter = SharedRateLimiter(str(tmp_path / "state.json"), rate=2.0, capacity=3.0)
+
+    assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire() == 0.5  # one token at 2 per second
+    metrics = limiter.metrics()
+    assert metrics["acquired"] == 4
+    assert metrics["throttled"] == 1
+
+def test_bucket_is_shared_through_the_state_file(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+    path = str(tmp_path / "state.json")
+    first = SharedRateLimiter(path, rate=1.0, capacity=2.0)
+    second = SharedRateLimiter(path, rate=1.0, capacity=2.0)
+
+    first.acquire()
+    first.acquire()
+    assert second.acquire() == 1.0
+
+def test_retry_budget_is_spent_and_refilled_per_window(tmp_path, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+    limiter = SharedRateLimiter(str(tmp_path / "state.json"), retry_budget=2, budget_window=60)
+
+    assert [limiter.try_spend_retry() for _ in range(3)] == [True, True, False]
+    assert limiter.metrics()["retries_denied"] == 1
+    clock.now += 60
+    assert limiter.try_spend_retry()
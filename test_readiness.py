@@ -0,0 +1,51 @@
+import threading
+import time
+import pytest
+import readiness
+from readiness import ReadinessWatcher
+
+@pytest.fixture
+def watcher():
+    watcher = ReadinessWatcher(default_interval=0.01, min_interval=0.01, max_interval=0.01, deadline=5)
+    yield watcher
+    watcher.stop()
+
+def statuses(status: int):
+    return lambda ids: {"successDetails": [{"id": phone_id, "status": status} for phone_id in ids], "failDetails": []}
+
+def test_phone_that_never_boots_times_out_at_its_deadline(watcher, monkeypatch):
+    monkeypatch.setattr(readiness, "get_phone_status", statuses(1))
+    started = time.monotonic()
+
+    assert watcher.wait("p1", deadline=0.2) is None
+    assert 0.2 <= time.monotonic() - started < 2
+
+def test_poller_keeps_going_after_a_failed_query(watcher, monkeypatch):
+    calls = []
+    def get_phone_status(ids):
+        calls.append(ids)
+        if len(calls) < 3:
+            raise ConnectionError("connection reset")
+        return statuses(0)(ids)
+    monkeypatch.setattr(readiness, "get_phone_status", get_phone_status)
+
+    assert watcher.wait("p1") == 0
+    assert len(calls) == 3
+
+def test_poller_that_always_fails_still_expires_phones(watcher, monkeypatch):
+    def get_phone_status(ids):
+        raise ConnectionError("connection reset")
+    monkeypatch.setattr(readiness, "get_phone_status", get_phone_status)
+
+    assert watcher.wait("p1", deadline=0.1) is None
+
+def test_wait_gives_up_on_a_stuck_poller(watcher, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(readiness, "WAIT_SLACK", 0.1)
+    monkeypatch.setattr(readiness, "get_phone_status", lambda ids: release.wait(5) and statuses(1)(ids))
+    started = time.monotonic()
+    try:
+        assert watcher.wait("p1", deadline=0.1) is None
+        assert time.monotonic() - started < 2
+    finally:
+        release.set()
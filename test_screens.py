@@ -0,0 +1,104 @@
+import os
+import pytest
+import screens
+from geometry import get_geometry_cache
+from screens import classify_page_source, classify_screen, parse_bounds, wait_for_screen
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "fixtures", "screens")
+
+def fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name + ".xml"), encoding="utf-8") as f:
+        return f.read()
+
+@pytest.mark.parametrize("name, screen_id, popups, profile", [
+    ("people_loaded", "PEOPLE_SCREEN", (), "loaded"),
+    ("people_loading", "PEOPLE_SCREEN", (), "loading"),
+    ("people_adjust_filters", "PEOPLE_SCREEN", ("adjust_filters",), "loading"),
+    ("people_out_of_likes", "PEOPLE_SCREEN", ("out_of_likes",), "loaded"),
+    ("people_interested", "PEOPLE_SCREEN", ("interested_confirmation",), "loaded"),
+    ("people_superswipe_info", "PEOPLE_SCREEN", ("superswipe_info",), "loaded"),
+    ("liked_you", "LIKED_YOU_SCREEN", (), None),
+    ("chats_list", "CHATS_SCREEN", (), None),
+    ("its_a_match", "NAV_BAR_NOT_FOUND", ("its_a_match", "opening_moves_info"), None),
+    ("premium_ad", "NAV_BAR_NOT_FOUND", ("premium_ad",), None),
+    ("chat_open", "NAV_BAR_NOT_FOUND", (), None),
+])
+def test_fixture_screens_are_classified(name, screen_id, popups, profile):
+    state = classify_page_source(fixture(name))
+    assert state.screen_id == screen_id
+    assert state.popups == popups
+    assert state.profile == profile
+
+def test_tabs_and_chat_markers():
+    chats = classify_page_source(fixture("chats_list"))
+    assert chats.chat_list and not chats.chat
+    assert {"People", "Chats"} <= set(chats.tabs)
+
+    chat = classify_page_source(fixture("chat_open"))
+    assert chat.chat and not chat.opening_move
+    assert classify_page_source(fixture("chat_opening_move")).opening_move
+
+def test_filter_screen_bounds_and_state():
+    state = classify_page_source(fixture("filters"))
+    assert state.filters and state.nav_bar is None
+    assert state.bounds("higher_age_thumb") == (690, 650, 770, 730)
+    assert state.bounds("age_slider") == (48, 620, 1032, 760)
+    assert state.is_enabled("filters_apply")
+    assert not classify_page_source(fixture("people_loaded")).filters
+
+def test_malformed_input():
+    assert classify_page_source("<hierarchy") is None
+    assert parse_bounds("[1,2][3,4]") == (1, 2, 3, 4)
+    assert parse_bounds("") is None
+
+class SnapshotDriver:
+    """Serves page_source snapshots in order, repeating the last one."""
+
+    def __init__(self, *names: str):
+        self.session_id = f"test-{id(self)}"
+        self.sources = [fixture(name) for name in names]
+        self.snapshots = 0
+
+    @property
+    def page_source(self) -> str:
+        self.snapshots += 1
+        return self.sources[min(self.snapshots, len(self.sources)) - 1]
+
+def test_classify_screen_is_one_snapshot_and_learns_tab_bounds():
+    driver = SnapshotDriver("people_loaded")
+    try:
+        assert classify_screen(driver).tab == "People"
+        assert driver.snapshots == 1
+        assert get_geometry_cache().tab_center(driver, "Chats") is not None
+    finally:
+        get_geometry_cache().invalidate(driver)
+
+def test_wait_for_screen_polls_until_the_predicate_holds(monkeypatch):
+    monkeypatch.setattr(screens.time, "sleep", lambda seconds: None)
+    driver = SnapshotDriver("people_loading", "people_loading", "people_loaded")
+    try:
+        state = wait_for_screen(driver, lambda s: s.profile == "loaded", timeout=5)
+        assert state.profile == "loaded" and driver.snapshots == 3
+
+        state = wait_for_screen(driver, lambda s: s.tab == "Chats", timeout=0)
+        assert state.tab == "People"  # the last state seen when the wait runs out
+    finally:
+        get_geometry_cache().invalidate(driver)
+
+@pytest.mark.parametrize("name, expected", [
+    ("people_out_of_likes", True),
+    ("people_interested", True),
+    ("premium_ad", True),
+    ("people_loaded", False),
+    ("people_loading", False),
+    ("chats_list", False),
+])
+def test_is_popup_present_uses_the_classifier(name, expected):
+    from swipe import is_popup_present
+
+    driver = SnapshotDriver(name)
+    try:
+        assert is_popup_present(driver) is expected
+        assert driver.snapshots == 1
+    finally:
+        get_geometry_cache().invalidate(driver)
@@ -0,0 +1,45 @@
+import threading
+import pytest
+import geelark_api
+from cache import TTLCache
+
+@pytest.fixture(autouse=True)
+def fake_api(monkeypatch):
+    monkeypatch.setattr(geelark_api, "phone_cache", TTLCache(None, geelark_api.CACHE_TTLS))
+    monkeypatch.setattr(geelark_api.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(geelark_api, "_post_ids", lambda endpoint, ids, action: {
+        "code": 0,
+        "data": {"successDetails": [{"id": phone_id, "url": f"https://phone/{phone_id}"} for phone_id in ids], "failDetails": []},
+    })
+
+def test_headless_start_opens_no_browser(monkeypatch):
+    opened = []
+    monkeypatch.setattr(geelark_api.webbrowser, "open", opened.append)
+
+    response = geelark_api.start_phone(["p1", "p2"])
+
+    assert [detail["id"] for detail in response["data"]["successDetails"]] == ["p1", "p2"]
+    assert opened == []
+
+def test_browser_tabs_open_in_the_background(monkeypatch):
+    release = threading.Event()
+    opened = []
+
+    def slow_open(url):
+        release.wait(5)
+        opened.append(url)
+    monkeypatch.setattr(geelark_api.webbrowser, "open", slow_open)
+    threads = []
+    monkeypatch.setattr(geelark_api, "open_phone_urls", lambda details, opener=geelark_api.open_phone_urls: threads.append(opener(details)))
+
+    response = geelark_api.start_phone(["p1", "p2"], headless=False)
+
+    assert response["code"] == 0 and opened == []  # returned while the first tab is still opening
+    release.set()
+    threads[0].join(5)
+    assert opened == ["https://phone/p1", "https://phone/p2"]
+
+def test_start_invalidates_cached_adb_data():
+    geelark_api.phone_cache.set("adb", "p1", {"id": "p1", "code": 0})
+    geelark_api.start_phone(["p1"])
+    assert geelark_api.phone_cache.get("adb", "p1") is None